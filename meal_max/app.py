@@ -1,8 +1,9 @@
 from dotenv import load_dotenv
 import os
-from flask import Flask, app, jsonify, make_response, Response, request
+from flask import Flask, app, jsonify, make_response, Response, request, stream_with_context
 from werkzeug.exceptions import BadRequest, Unauthorized
 import requests
+from sqlalchemy.exc import IntegrityError
 
 from meal_max.utils.logger import configure_logger
 
@@ -14,14 +15,22 @@ dsf
 
 dsf
 """
+from meal_max.clients.tmdb_client import (get_movie_recommendations, get_tmdb_cache, get_tmdb_cache_stats,
+                                          get_watch_providers, movie_summaries, search_movies)
 from meal_max.db import db
 from meal_max.models import kitchen_model #Used as template
-from meal_max.models.battle_model import BattleModel #Used as template
-from meal_max.utils.sql_utils import check_database_connection, check_table_exists
-from meal_max.models.mongo_session_model import login_user, logout_user 
+from meal_max.models.battle_session_model import get_battle_session_registry
+from meal_max.utils.http_client import get_http_stats
+from meal_max.utils.random_providers import get_random_provider_stats
+from meal_max.utils.random_utils import get_random_pool_stats, warm_random_pool
+from meal_max.utils.streaming import stream_rows
+from meal_max.utils.sql_utils import check_database_connection, check_database_pragmas, check_table_exists
+from meal_max.models.mongo_session_model import (SESSION_WRITE_BEHIND, enable_session_write_behind,
+                                                 ensure_session_indexes)
+from meal_max.models.movie_model import Movie
 
 from meal_max.models.user_model import Users
-from meal_max.models.watchlist_model import Watchlist
+from meal_max.models.watchlist_model import Watchlist, ensure_watchlist_indexes, is_duplicate_entry
 
 # Load environment variables from .env file
 load_dotenv()
@@ -38,8 +47,39 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 
 with app.app_context():
-    db.init_app(app)  
     db.create_all()
+    # Add the watchlist indexes to tables created before they existed. Startup fails without
+    # them: watchlist inserts rely on the unique index to reject duplicates.
+    ensure_watchlist_indexes()
+
+# Build the TMDB response cache now, so an invalid TMDB_CACHE_BACKEND stops startup
+# instead of failing every TMDB request
+get_tmdb_cache()
+
+# Report the journal/sync settings the meals database is running with
+try:
+    check_database_pragmas()
+except Exception as e:
+    app.logger.warning("Could not read meals database settings: %s", str(e))
+
+# Make sure the leaderboard indexes exist on databases created before they were added
+try:
+    kitchen_model.ensure_meal_indexes()
+except Exception as e:
+    app.logger.warning("Could not create meal indexes: %s", str(e))
+
+# One session document per user; also serves the login upsert
+try:
+    ensure_session_indexes()
+except Exception as e:
+    app.logger.warning("Could not create session indexes: %s", str(e))
+
+# Buffered logouts are only visible to this process, so keep this off with several workers
+if SESSION_WRITE_BEHIND:
+    enable_session_write_behind()
+
+# Start filling the random number pool so the first battle does not wait on random.org
+warm_random_pool()
 
 #Ensures TMDB are loaded into the environment 
 TMDB_READ_ACCESS_TOKEN = os.getenv("TMDB_READ_ACCESS_TOKEN")
@@ -91,10 +131,93 @@ def db_check() -> Response:
         app.logger.info("Checking if meals table exists...")
         check_table_exists("meals")
         app.logger.info("meals table exists.")
-        return make_response(jsonify({'database_status': 'healthy'}), 200)
+        settings = check_database_pragmas()
+        return make_response(jsonify({'database_status': 'healthy', 'database_settings': settings}), 200)
     except Exception as e:
         return make_response(jsonify({'error': str(e)}), 404)
 
+@app.route('/api/leaderboard/export', methods=['GET'])
+def export_leaderboard() -> Response:
+    """
+    Route to stream the whole leaderboard straight from the database.
+
+    Query Parameters:
+        - sort_by (str, optional): 'wins' or 'win_pct'. Defaults to 'wins'.
+        - cuisine (str, optional): Only include meals of this cuisine.
+        - difficulty (str, optional): Only include meals of this difficulty ('LOW', 'MED' or 'HIGH').
+        - format (str, optional): 'ndjson' (one meal per line) or 'json' (an array). Defaults to 'ndjson'.
+
+    Returns:
+        A streamed response with the ranked meals and their stats.
+    """
+    try:
+        stream_format = request.args.get('format', 'ndjson')
+        entries = kitchen_model.iter_leaderboard(
+            sort_by=request.args.get('sort_by', 'wins'),
+            cuisine=request.args.get('cuisine'),
+            difficulty=request.args.get('difficulty'),
+        )
+        chunks, mimetype = stream_rows(entries, stream_format)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+    app.logger.info("Exporting leaderboard as %s", stream_format)
+    return Response(chunks, mimetype=mimetype)
+
+@app.route('/api/random-pool-stats', methods=['GET'])
+def random_pool_stats() -> Response:
+    """
+    Route to report the depth and refill latency of the random number pool.
+
+    Returns:
+        JSON response with the pool metrics.
+    """
+    app.logger.info('Reporting random pool stats')
+    return make_response(jsonify(get_random_pool_stats()), 200)
+
+@app.route('/api/random-provider-stats', methods=['GET'])
+def random_provider_stats() -> Response:
+    """
+    Route to report the configured random backend and the circuit breaker state of its fallbacks.
+
+    Returns:
+        JSON response with the backend metrics.
+    """
+    app.logger.info('Reporting random provider stats')
+    return make_response(jsonify(get_random_provider_stats()), 200)
+
+@app.route('/api/http-stats', methods=['GET'])
+def http_stats() -> Response:
+    """
+    Route to report call counts and latencies of outbound HTTP calls, per host.
+
+    Returns:
+        JSON response with the HTTP client metrics.
+    """
+    app.logger.info('Reporting HTTP client stats')
+    return make_response(jsonify(get_http_stats()), 200)
+
+@app.route('/api/tmdb-cache-stats', methods=['GET'])
+def tmdb_cache_stats() -> Response:
+    """
+    Route to report the hit rate of the TMDB response cache.
+
+    Returns:
+        JSON response with the cache metrics.
+    """
+    app.logger.info('Reporting TMDB cache stats')
+    return make_response(jsonify(get_tmdb_cache_stats()), 200)
+
+@app.route('/api/battle-session-stats', methods=['GET'])
+def battle_session_stats() -> Response:
+    """
+    Route to report how many battle sessions this worker holds and how many were evicted.
+
+    Returns:
+        JSON response with the session registry metrics.
+    """
+    app.logger.info('Reporting battle session stats')
+    return make_response(jsonify(get_battle_session_registry().stats()), 200)
+
 
 @app.route('/api/create-user', methods=['POST'])
 def create_user() -> Response:
@@ -202,8 +325,8 @@ def login():
         # Get user ID
         user_id = Users.get_id_by_username(username)
 
-        # Load user's combatants into the battle model
-        login_user(user_id, battle_model)
+        # Load user's combatants into their own battle session
+        get_battle_session_registry().login(user_id)
 
         app.logger.info("User %s logged in successfully.", username)
         return jsonify({"message": f"User {username} logged in successfully."}), 200
@@ -241,8 +364,8 @@ def logout():
         # Get user ID
         user_id = Users.get_id_by_username(username)
 
-        # Save user's combatants and clear the battle model
-        logout_user(user_id, battle_model)
+        # Save user's combatants and close their battle session
+        get_battle_session_registry().logout(user_id)
 
         app.logger.info("User %s logged out successfully.", username)
         return jsonify({"message": f"User {username} logged out successfully."}), 200
@@ -262,6 +385,16 @@ def logout():
 ##########################################################
 
 
+def _remember_movies(data: dict) -> None:
+    """
+    Stores the movies of a TMDB search or recommendation response for local watchlist validation.
+    Failures are logged and otherwise ignored, as they do not affect the response.
+    """
+    try:
+        Movie.upsert_many(data.get("results", []))
+    except Exception as e:
+        app.logger.warning("Could not store movie metadata: %s", str(e))
+
 @app.route('/api/search-movie/<string:query>', methods=['GET'])
 def search_movie(query):
     """
@@ -277,32 +410,12 @@ def search_movie(query):
         app.logger.error("TMDB read access not found.")
         return jsonify({"error": "TMDB read access token not configured"}), 500
 
-    url = f"{BASE_URL}/search/movie"
-    headers = {
-    "accept": "application/json",
-        "Authorization": f"Bearer {TMDB_READ_ACCESS_TOKEN}"
-    }
-    params = {
-        "query": query,
-        "include_adult": "false",
-        "language": "en-US",
-        "page": 1
-    }
     try:
-        response = requests.get(url, headers=headers, params=params)  # API request
-        response.raise_for_status()  # Raise HTTP errors, if any
-        data = response.json()
+        data = search_movies(query)  # API request, served from the cache when possible
+        _remember_movies(data)
 
         # Filter the results to include only required fields
-        filtered_results = [
-            {
-                "title": movie.get("title"),
-                "release_date": movie.get("release_date"),
-                "overview": movie.get("overview"),
-                "vote_average": movie.get("vote_average")
-            }
-            for movie in data.get("results", [])
-        ]
+        filtered_results = movie_summaries(data)
 
         # Return filtered results
         return jsonify(filtered_results)
@@ -313,56 +426,31 @@ def search_movie(query):
     
 @app.route('/api/movie/<int:movie_id>/providers', methods=['GET'])
 def get_movie_providers(movie_id):
-    # Construct the URL using the movie_id from the route
-    url = f"{BASE_URL}/movie/{movie_id}/watch/providers"
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {TMDB_READ_ACCESS_TOKEN}"
-    }
-
-    # Send a GET request to the TMDB API
-    response = requests.get(url, headers=headers)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        data = response.json()
+    try:
+        # Send a GET request to the TMDB API, or reuse a recent response
+        data = get_watch_providers(movie_id)
         # 'data' now contains all the watch provider information.
         # You can directly return this to the user, or filter it as needed.
         return jsonify(data), 200
-    else:
+    except requests.exceptions.RequestException as e:
         # If not successful, maybe the movie doesn't exist or TMDB is down.
+        app.logger.error(f"Error calling TMDB API: {e}")
         return jsonify({"error": "Failed to get watch providers"}), 500
     
 @app.route('/api/movie/<int:movie_id>/recommendations', methods=['GET'])
 def get_recommendations(movie_id):
-    url = f"{BASE_URL}/movie/{movie_id}/recommendations"
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {TMDB_READ_ACCESS_TOKEN}"
-    }
-
-    response = requests.get(url, headers=headers)
-
-    if response.status_code == 200:
-        data = response.json()
-        # 'data["results"]' usually contains a list of recommended movies.
-        recommendations = data.get("results", [])
-
-        # For clarity, we might return a simplified list of recommended movies:
-        simplified_recs = [
-            {
-                "title": rec.get("title"),
-                "overview": rec.get("overview"),
-                "release_date": rec.get("release_date"),
-                "vote_average": rec.get("vote_average")
-            }
-            for rec in recommendations
-        ]
-
-        return jsonify(simplified_recs), 200
-    else:
+    try:
+        data = get_movie_recommendations(movie_id)
+        _remember_movies(data)
+    except requests.exceptions.RequestException as e:
+        app.logger.error(f"Error calling TMDB API: {e}")
         return jsonify({"error": "Failed to get recommendations"}), 500
 
+    # 'data["results"]' usually contains a list of recommended movies.
+    # For clarity, we return a simplified list of recommended movies:
+    simplified_recs = movie_summaries(data)
+
+    return jsonify(simplified_recs), 200
 
 
 ##########################################################
@@ -397,36 +485,32 @@ def add_to_watchlist():
     user_id = data['user_id']
     movie_id = data['movie_id']
 
-    # Validate if the movie exists on TMDB
-    url = f"{BASE_URL}/movie/{movie_id}"
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {TMDB_READ_ACCESS_TOKEN}"
-    }
-    response = requests.get(url, headers=headers)
-    
-    if response.status_code != 200:
+    # Validate the movie against the local metadata store; TMDB is only called on a miss or stale entry
+    try:
+        movie = Movie.get_or_fetch(movie_id)
+    except ValueError:
         return jsonify({"error": "Invalid movie ID"}), 400
+    except requests.exceptions.RequestException as e:
+        app.logger.error(f"Error calling TMDB API: {e}")
+        return jsonify({"error": "Failed to fetch movie data"}), 500
 
-    movie_data = response.json()
-
-    # Check if the movie is already in the watchlist
-    existing_entry = Watchlist.query.filter_by(user_id=user_id, movie_id=movie_id).first()
-    if existing_entry:
-        return jsonify({"message": "Movie is already in your watchlist!"}), 400
-
-    # Add the movie to the watchlist
+    # Add the movie to the watchlist; the unique (user_id, movie_id) index rejects duplicates
     watchlist_entry = Watchlist(
         user_id=user_id, 
         movie_id=movie_id, 
-        title=movie_data.get('title'), 
-        overview=movie_data.get('overview'),
-        release_date=movie_data.get('release_date'), 
-        vote_average=movie_data.get('vote_average'),
-        popularity=movie_data.get('popularity', 0.0) )
-        
+        movie_title=movie.title, 
+        overview=movie.overview,
+        popularity=movie.popularity or 0.0)
+
     db.session.add(watchlist_entry)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_duplicate_entry(e):
+            return jsonify({"message": "Movie is already in your watchlist!"}), 400
+        app.logger.warning("Rejected watchlist entry for user %s: %s", user_id, str(e))
+        return jsonify({"error": "Invalid watchlist entry"}), 400
 
     return jsonify({"message": "Movie added to watchlist!"}), 201
 
@@ -450,6 +534,66 @@ def get_watchlist(user_id):
     return jsonify(movie_details), 200
 '''
 
+@app.route('/watchlist/<int:user_id>', methods=['GET'])
+def list_watchlist(user_id):
+    """
+    Route to get one page of a user's watchlist.
+
+    Query Parameters:
+        - page (int, optional): The page, starting at 1. Defaults to 1.
+        - per_page (int, optional): Entries per page. Defaults to 50.
+        - sort_by (str, optional): 'added_on', 'popularity' or 'movie_title'. Defaults to 'added_on'.
+        - order (str, optional): 'asc' or 'desc'. Defaults to 'desc'.
+        - watched (str, optional): 'true' or 'false' to only list watched or unwatched movies.
+
+    Returns:
+        JSON response with the entries of the page and the page count.
+    """
+    try:
+        page = Watchlist.list_watchlist(
+            user_id,
+            page=request.args.get('page', 1, type=int),
+            per_page=request.args.get('per_page', 50, type=int),
+            sort_by=request.args.get('sort_by', 'added_on'),
+            order=request.args.get('order', 'desc'),
+            watched=_watched_filter(),
+        )
+        return make_response(jsonify(page), 200)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Failed to list watchlist: %s", str(e))
+        return make_response(jsonify({'error': 'Failed to list watchlist'}), 500)
+
+@app.route('/watchlist/<int:user_id>/export', methods=['GET'])
+def export_watchlist(user_id):
+    """
+    Route to stream a user's whole watchlist, oldest first.
+
+    Rows are read from the database in batches and written as they are produced, so memory
+    use does not depend on the size of the watchlist.
+
+    Query Parameters:
+        - format (str, optional): 'ndjson' (one entry per line) or 'json' (an array). Defaults to 'ndjson'.
+        - watched (str, optional): 'true' or 'false' to only export watched or unwatched movies.
+
+    Returns:
+        A streamed response with the entries.
+    """
+    try:
+        stream_format = request.args.get('format', 'ndjson')
+        chunks, mimetype = stream_rows(Watchlist.iter_entries(user_id, watched=_watched_filter()), stream_format)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+    app.logger.info("Exporting watchlist of user %s as %s", user_id, stream_format)
+    return Response(stream_with_context(chunks), mimetype=mimetype)
+
+def _watched_filter():
+    watched = request.args.get('watched')
+    if watched not in (None, 'true', 'false'):
+        raise ValueError(f"Invalid watched filter: {watched}. Must be 'true' or 'false'.")
+    return None if watched is None else watched == 'true'
+
 @app.route('/mark-watched', methods=['PUT'])
 def mark_watched():
     data = request.json
@@ -484,6 +628,64 @@ def remove_from_watchlist():
 
     return jsonify({"message": "Movie removed from watchlist!"}), 200
 
+@app.route('/add-to-watchlist/bulk', methods=['POST'])
+def add_to_watchlist_bulk():
+    """
+    Route to add several movies to a user's watchlist in one transaction.
+
+    Expected JSON Input:
+        - user_id (int): The ID of the user.
+        - movie_ids (List[int]): The TMDB IDs of the movies.
+
+    Returns:
+        JSON response with the status of each movie ('added', 'already_in_watchlist' or 'invalid').
+    """
+    return _watchlist_bulk(Watchlist.add_many)
+
+@app.route('/mark-watched/bulk', methods=['PUT'])
+def mark_watched_bulk():
+    """
+    Route to mark several movies of a user's watchlist as watched in one transaction.
+
+    Expected JSON Input:
+        - user_id (int): The ID of the user.
+        - movie_ids (List[int]): The TMDB IDs of the movies.
+
+    Returns:
+        JSON response with the status of each movie ('marked_watched' or 'not_found').
+    """
+    return _watchlist_bulk(Watchlist.mark_watched_many)
+
+@app.route('/remove-from-watchlist/bulk', methods=['DELETE'])
+def remove_from_watchlist_bulk():
+    """
+    Route to remove several movies from a user's watchlist in one transaction.
+
+    Expected JSON Input:
+        - user_id (int): The ID of the user.
+        - movie_ids (List[int]): The TMDB IDs of the movies.
+
+    Returns:
+        JSON response with the status of each movie ('removed' or 'not_found').
+    """
+    return _watchlist_bulk(Watchlist.remove_many)
+
+def _watchlist_bulk(operation) -> Response:
+    data = request.get_json(silent=True) or {}
+    user_id = data.get('user_id')
+    movie_ids = data.get('movie_ids')
+    if user_id is None or movie_ids is None:
+        return make_response(jsonify({'error': 'user_id and movie_ids are required'}), 400)
+
+    try:
+        results = operation(user_id, movie_ids)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Bulk watchlist update failed: %s", str(e))
+        return make_response(jsonify({'error': 'Failed to update watchlist'}), 500)
+    return make_response(jsonify({'results': results}), 200)
+
 
 
 
@@ -0,0 +1,112 @@
+"""
+ASGI entrypoint: serves the TMDB proxy routes on the event loop and everything else through Flask
+
+Run it with an ASGI server, e.g. `uvicorn asgi:application --host 0.0.0.0 --port 5000`.
+The TMDB routes await their upstream calls instead of holding a thread, so one worker keeps
+many of them in flight. Their responses match the Flask routes of the same paths, each call
+is bounded by TMDB_ASYNC_TIMEOUT, and it is cancelled when the client disconnects.
+"""
+import asyncio
+import logging
+import re
+import sys
+from typing import Any, Awaitable, Callable
+
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+import httpx
+
+from app import TMDB_READ_ACCESS_TOKEN, _remember_movies, app
+from meal_max.clients.tmdb_client import (get_movie_recommendations_async, get_watch_providers_async,
+                                          movie_summaries, search_movies_async)
+from meal_max.utils.asgi_utils import ClientDisconnected, cancel_on_disconnect, run_lifespan, send_json
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+def _wsgi_app(environ: dict, start_response: Callable) -> Any:
+    # asgiref passes a bytes stream as wsgi.errors; Flask's log handler writes text to it
+    environ["wsgi.errors"] = sys.stderr
+    return app(environ, start_response)
+
+_flask = WsgiToAsgi(_wsgi_app)
+
+
+def _tmdb_errors(message: str) -> Callable:
+    # the async counterpart of the Flask routes' `except requests.exceptions.RequestException`
+    def decorator(handler: Callable[..., Awaitable[tuple[Any, int]]]) -> Callable[..., Awaitable[tuple[Any, int]]]:
+        async def wrapper(**params: str) -> tuple[Any, int]:
+            try:
+                return await handler(**params)
+            except (httpx.HTTPError, asyncio.TimeoutError) as e:
+                logger.error(f"Error calling TMDB API: {e!r}")
+                return {"error": message}, 500
+        return wrapper
+    return decorator
+
+async def _remember_movies_async(data: dict) -> None:
+    # the metadata store is synchronous SQLAlchemy; keep it off the event loop
+    def remember() -> None:
+        with app.app_context():
+            _remember_movies(data)
+    await asyncio.get_running_loop().run_in_executor(None, remember)
+
+@_tmdb_errors("Failed to fetch movie data")
+async def search_movie(query: str) -> tuple[Any, int]:
+    if not TMDB_READ_ACCESS_TOKEN:
+        logger.error("TMDB read access not found.")
+        return {"error": "TMDB read access token not configured"}, 500
+    data = await search_movies_async(query)
+    await _remember_movies_async(data)
+    return movie_summaries(data), 200
+
+@_tmdb_errors("Failed to get watch providers")
+async def get_movie_providers(movie_id: str) -> tuple[Any, int]:
+    return await get_watch_providers_async(int(movie_id)), 200
+
+@_tmdb_errors("Failed to get recommendations")
+async def get_recommendations(movie_id: str) -> tuple[Any, int]:
+    data = await get_movie_recommendations_async(int(movie_id))
+    await _remember_movies_async(data)
+    return movie_summaries(data), 200
+
+# same paths as the Flask routes they stand in for
+ASYNC_ROUTES = [
+    (re.compile(r"/api/search-movie/(?P<query>[^/]+)"), search_movie),
+    (re.compile(r"/api/movie/(?P<movie_id>\d+)/providers"), get_movie_providers),
+    (re.compile(r"/api/movie/(?P<movie_id>\d+)/recommendations"), get_recommendations),
+]
+
+
+async def application(scope: dict, receive: Callable, send: Callable) -> None:
+    """
+    The ASGI application
+
+    Args:
+        scope (dict): The connection scope
+        receive (Callable): Awaits the next message from the client
+        send (Callable): Sends a message to the client
+    """
+    if scope["type"] == "lifespan":
+        await run_lifespan(receive, send)
+        return
+    if scope["type"] == "http" and scope["method"] == "GET":
+        for pattern, handler in ASYNC_ROUTES:
+            match = pattern.fullmatch(scope["path"])
+            if match is None:
+                continue
+            try:
+                data, status = await cancel_on_disconnect(handler(**match.groupdict()), receive)
+            except ClientDisconnected:
+                return
+            # serialized by Flask, so the body is byte-for-byte what jsonify returns
+            with app.app_context():
+                body = app.json.response(data).get_data()
+            await send_json(send, body, status)
+            return
+    # every other route is a plain Flask view; each request gets its own thread
+    async with ThreadSensitiveContext():
+        await _flask(scope, receive, send)
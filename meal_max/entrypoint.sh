@@ -13,5 +13,8 @@ else
     echo "Skipping database creation."
 fi
 
-# Start the Python application
+# Start the Python application. With ASGI=true the TMDB routes are served asynchronously (see asgi.py)
+if [ "$ASGI" = "true" ]; then
+    exec uvicorn asgi:application --host 0.0.0.0 --port 5000
+fi
 exec python app.py
@@ -0,0 +1,17 @@
+import logging
+import os
+
+import redis
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
+# Connections are opened lazily, on the first command
+logger.info("Using Redis at %s", REDIS_URL)
+redis_client = redis.Redis.from_url(REDIS_URL, socket_timeout=1.0, socket_connect_timeout=1.0)
@@ -0,0 +1,269 @@
+import logging
+import os
+import threading
+from typing import Any, List, Optional
+
+from meal_max.utils.cache import TTLCache
+from meal_max.utils.http_client import get_async_http_client, http_get
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.response_cache import RedisCacheBackend, ResponseCache
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+TMDB_BASE_URL = "https://api.themoviedb.org/3"
+
+TMDB_CACHE_BACKENDS = ("memory", "redis", "none")
+TMDB_CACHE_BACKEND = os.getenv("TMDB_CACHE_BACKEND", "memory")
+TMDB_CACHE_SIZE = int(os.getenv("TMDB_CACHE_SIZE", 2048))  # entries of the in-process cache
+TMDB_SEARCH_TTL = float(os.getenv("TMDB_SEARCH_TTL", 600))  # seconds
+TMDB_PROVIDERS_TTL = float(os.getenv("TMDB_PROVIDERS_TTL", 6 * 3600))
+TMDB_RECOMMENDATIONS_TTL = float(os.getenv("TMDB_RECOMMENDATIONS_TTL", 24 * 3600))
+TMDB_DETAILS_TTL = float(os.getenv("TMDB_DETAILS_TTL", 24 * 3600))
+TMDB_STALE_TTL = float(os.getenv("TMDB_STALE_TTL", 300))  # seconds a stale response is served while it is refreshed
+TMDB_ASYNC_TIMEOUT = float(os.getenv("TMDB_ASYNC_TIMEOUT", 10))  # seconds an async call may take, retries included
+
+SEARCH_ENDPOINT = "/search/movie"
+PROVIDERS_ENDPOINT = "/movie/{movie_id}/watch/providers"
+RECOMMENDATIONS_ENDPOINT = "/movie/{movie_id}/recommendations"
+DETAILS_ENDPOINT = "/movie/{movie_id}"
+
+
+def _request_args(endpoint: str, params: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    # path parameters are filled from `params`; the rest go in the query string
+    query = {name: value for name, value in params.items() if "{%s}" % name not in endpoint}
+    headers = {
+        "accept": "application/json",
+        "Authorization": f"Bearer {os.getenv('TMDB_READ_ACCESS_TOKEN')}"
+    }
+    return f"{TMDB_BASE_URL}{endpoint.format(**params)}", {"headers": headers, "params": query or None}
+
+def _get(endpoint: str, params: dict[str, Any]) -> Any:
+    url, kwargs = _request_args(endpoint, params)
+    response = http_get(url, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+async def _aget(endpoint: str, params: dict[str, Any]) -> Any:
+    url, kwargs = _request_args(endpoint, params)
+    response = await get_async_http_client().get(url, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def create_tmdb_cache(backend: str) -> Optional[ResponseCache]:
+    """
+    Builds the TMDB response cache
+
+    Args:
+        backend (str): 'memory' for an in-process LRU, 'redis' to share responses between
+                       processes, or 'none' to disable caching
+
+    Returns:
+        Optional[ResponseCache]: The cache, or None if caching is disabled
+
+    Raises:
+        ValueError: If the backend name is not supported
+    """
+    if backend == "none":
+        return None
+    if backend == "memory":
+        store = TTLCache(maxsize=TMDB_CACHE_SIZE, ttl=TMDB_SEARCH_TTL)
+    elif backend == "redis":
+        from meal_max.clients.redis_client import redis_client
+        store = RedisCacheBackend(redis_client, prefix="tmdb:")
+    else:
+        raise ValueError(f"Invalid TMDB cache backend: {backend}. Must be one of {list(TMDB_CACHE_BACKENDS)}.")
+    ttls = {
+        SEARCH_ENDPOINT: TMDB_SEARCH_TTL,
+        PROVIDERS_ENDPOINT: TMDB_PROVIDERS_TTL,
+        RECOMMENDATIONS_ENDPOINT: TMDB_RECOMMENDATIONS_TTL,
+        DETAILS_ENDPOINT: TMDB_DETAILS_TTL,
+    }
+    return ResponseCache(store, ttls, default_ttl=TMDB_SEARCH_TTL, stale_ttl=TMDB_STALE_TTL)
+
+def get_tmdb_cache() -> Optional[ResponseCache]:
+    """
+    Returns the process-wide TMDB response cache, built from TMDB_CACHE_BACKEND on first use
+
+    Returns:
+        Optional[ResponseCache]: The cache, or None if caching is disabled
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None and TMDB_CACHE_BACKEND != "none":
+            _cache = create_tmdb_cache(TMDB_CACHE_BACKEND)
+            logger.info("Caching TMDB responses in %s", TMDB_CACHE_BACKEND)
+        return _cache
+
+def _cached_get(endpoint: str, params: dict[str, Any]) -> Any:
+    cache = get_tmdb_cache()
+    if cache is None:
+        return _get(endpoint, params)
+    return cache.get_or_fetch(endpoint, params, lambda: _get(endpoint, params))
+
+async def _cached_aget(endpoint: str, params: dict[str, Any]) -> Any:
+    # runs on the async HTTP client's event loop, where the cache tracks in-flight fetches
+    cache = get_tmdb_cache()
+    if cache is None:
+        return await _aget(endpoint, params)
+    return await cache.aget_or_fetch(endpoint, params, lambda: _aget(endpoint, params))
+
+async def _run_async(endpoint: str, params: dict[str, Any]) -> Any:
+    return await get_async_http_client().run(_cached_aget(endpoint, params), timeout=TMDB_ASYNC_TIMEOUT)
+
+def _search_params(query: str, page: int) -> dict[str, Any]:
+    return {
+        "query": " ".join(query.split()).lower(),
+        "include_adult": "false",
+        "language": "en-US",
+        "page": page
+    }
+
+def movie_summaries(data: dict[str, Any]) -> List[dict[str, Any]]:
+    """
+    Reduces a TMDB list of movies (search results or recommendations) to the fields the API returns
+
+    Args:
+        data (dict[str, Any]): TMDB's response, with the movies under 'results'
+
+    Returns:
+        List[dict[str, Any]]: The title, release date, overview and vote average of each movie
+    """
+    return [
+        {
+            "title": movie.get("title"),
+            "release_date": movie.get("release_date"),
+            "overview": movie.get("overview"),
+            "vote_average": movie.get("vote_average")
+        }
+        for movie in data.get("results", [])
+    ]
+
+def search_movies(query: str, page: int = 1) -> dict[str, Any]:
+    """
+    Searches TMDB for movies by title
+
+    The query is normalized (trimmed, whitespace collapsed, lower-cased) so that searches
+    differing only in case or spacing share a cache entry; TMDB matches case-insensitively.
+
+    Args:
+        query (str): The search query
+        page (int, optional): The page of results
+
+    Returns:
+        dict[str, Any]: TMDB's response, with the movies under 'results'
+
+    Raises:
+        requests.exceptions.RequestException: If the TMDB call fails
+    """
+    return _cached_get(SEARCH_ENDPOINT, _search_params(query, page))
+
+async def search_movies_async(query: str, page: int = 1) -> dict[str, Any]:
+    """
+    Searches TMDB for movies by title without blocking a thread. See `search_movies`.
+
+    Raises:
+        httpx.HTTPError: If the TMDB call fails
+        asyncio.TimeoutError: If it takes longer than TMDB_ASYNC_TIMEOUT
+    """
+    return await _run_async(SEARCH_ENDPOINT, _search_params(query, page))
+
+def get_watch_providers(movie_id: int) -> dict[str, Any]:
+    """
+    Returns where a movie can be streamed, rented or bought, per country
+
+    Args:
+        movie_id (int): The TMDB ID of the movie
+
+    Returns:
+        dict[str, Any]: TMDB's response, with the providers under 'results'
+
+    Raises:
+        requests.exceptions.RequestException: If the TMDB call fails
+    """
+    return _cached_get(PROVIDERS_ENDPOINT, {"movie_id": int(movie_id)})
+
+async def get_watch_providers_async(movie_id: int) -> dict[str, Any]:
+    """
+    Returns where a movie can be watched without blocking a thread. See `get_watch_providers`.
+
+    Raises:
+        httpx.HTTPError: If the TMDB call fails
+        asyncio.TimeoutError: If it takes longer than TMDB_ASYNC_TIMEOUT
+    """
+    return await _run_async(PROVIDERS_ENDPOINT, {"movie_id": int(movie_id)})
+
+def get_movie_recommendations(movie_id: int) -> dict[str, Any]:
+    """
+    Returns TMDB's recommendations for a movie
+
+    Args:
+        movie_id (int): The TMDB ID of the movie
+
+    Returns:
+        dict[str, Any]: TMDB's response, with the movies under 'results'
+
+    Raises:
+        requests.exceptions.RequestException: If the TMDB call fails
+    """
+    return _cached_get(RECOMMENDATIONS_ENDPOINT, {"movie_id": int(movie_id)})
+
+async def get_movie_recommendations_async(movie_id: int) -> dict[str, Any]:
+    """
+    Returns TMDB's recommendations for a movie without blocking a thread. See `get_movie_recommendations`.
+
+    Raises:
+        httpx.HTTPError: If the TMDB call fails
+        asyncio.TimeoutError: If it takes longer than TMDB_ASYNC_TIMEOUT
+    """
+    return await _run_async(RECOMMENDATIONS_ENDPOINT, {"movie_id": int(movie_id)})
+
+def get_movie_details(movie_id: int) -> dict[str, Any]:
+    """
+    Returns TMDB's metadata of a movie
+
+    Args:
+        movie_id (int): The TMDB ID of the movie
+
+    Returns:
+        dict[str, Any]: TMDB's response: id, title, overview, release_date, popularity, vote_average, ...
+
+    Raises:
+        requests.exceptions.HTTPError: If TMDB does not know the movie
+        requests.exceptions.RequestException: If the TMDB call fails
+    """
+    return _cached_get(DETAILS_ENDPOINT, {"movie_id": int(movie_id)})
+
+async def get_movie_details_async(movie_id: int) -> dict[str, Any]:
+    """
+    Returns TMDB's metadata of a movie without blocking a thread. See `get_movie_details`.
+
+    Raises:
+        httpx.HTTPStatusError: If TMDB does not know the movie
+        httpx.HTTPError: If the TMDB call fails
+        asyncio.TimeoutError: If it takes longer than TMDB_ASYNC_TIMEOUT
+    """
+    return await _run_async(DETAILS_ENDPOINT, {"movie_id": int(movie_id)})
+
+def get_tmdb_cache_stats() -> dict[str, Any]:
+    """
+    Returns the TMDB cache backend and its counters
+
+    Returns:
+        dict[str, Any]: The backend and the hit, stale hit, miss, coalesced, revalidation and error counts
+    """
+    cache = get_tmdb_cache()
+    if cache is None:
+        return {"backend": "none"}
+    stats: dict[str, Any] = {"backend": TMDB_CACHE_BACKEND, **cache.stats()}
+    if isinstance(cache.backend, TTLCache):
+        stats["size"] = len(cache.backend)
+        stats["maxsize"] = cache.backend.maxsize
+    return stats
@@ -0,0 +1,197 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import json
+import logging
+import os
+from typing import Any, Iterator, List, Optional
+
+import numpy as np
+
+from meal_max.models.kitchen_model import Meal, get_all_meals, get_meals_by_ids
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.random_providers import RANDOM_DECIMALS
+from meal_max.utils.scoring import battle_scores, meal_columns
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+ANALYTICS_WORKERS = int(os.getenv("ANALYTICS_WORKERS", os.cpu_count() or 1))
+# matrix cells (rows x meals) per task; each task allocates a few arrays of this many 8-byte values
+ANALYTICS_CHUNK_CELLS = int(os.getenv("ANALYTICS_CHUNK_CELLS", 1 << 20))
+
+WIN_PROBABILITY_METHODS = ("exact", "monte_carlo")
+
+
+def win_probabilities(deltas: np.ndarray, decimals: Optional[int] = RANDOM_DECIMALS) -> np.ndarray:
+    """
+    Computes the probability that the first meal wins, in closed form
+
+    `BattleModel.battle` lets the first meal win when delta > random. With a uniform
+    random number on [0, 1) that is min(delta, 1). With random numbers rounded to
+    `decimals` places it is the share of the grid 0, 10^-decimals, ... that lies below delta.
+
+    Args:
+        deltas (np.ndarray): Normalized score deltas, abs(score_1 - score_2) / 100
+        decimals (int, optional): The resolution of the random numbers, or None for a continuous draw
+
+    Returns:
+        np.ndarray: The win probabilities of the first meal
+    """
+    deltas = np.asarray(deltas, dtype=np.float64)
+    if decimals is None:
+        return np.minimum(deltas, 1.0)
+    steps = 10 ** decimals
+    grid = np.arange(steps) / steps
+    return np.searchsorted(grid, deltas, side="left") / steps
+
+def _probability_rows(scores: np.ndarray, start: int, stop: int, method: str, trials: int,
+                      decimals: Optional[int], seed: Optional[np.random.SeedSequence]) -> np.ndarray:
+    # runs in a worker process: rows start..stop of the matrix, NaN where a meal meets itself
+    deltas = np.abs(scores[start:stop, None] - scores[None, :]) / 100
+    if method == "exact":
+        probabilities = win_probabilities(deltas, decimals)
+    else:
+        rng = np.random.default_rng(seed)
+        wins = np.zeros(deltas.shape, dtype=np.int64)
+        for _ in range(trials):
+            random_numbers = rng.random(deltas.shape)
+            if decimals is not None:
+                random_numbers = np.floor(random_numbers * 10 ** decimals) / 10 ** decimals
+            wins += deltas > random_numbers
+        probabilities = wins / trials
+    rows = np.arange(stop - start)
+    probabilities[rows, rows + start] = np.nan
+    return probabilities
+
+def iter_win_probability_rows(meals: List[Meal], method: str = "exact", trials: int = 1000,
+                              decimals: Optional[int] = RANDOM_DECIMALS, seed: Optional[int] = None,
+                              workers: Optional[int] = None,
+                              chunk_rows: Optional[int] = None,
+                              chunk_cells: int = ANALYTICS_CHUNK_CELLS) -> Iterator[tuple[Meal, np.ndarray]]:
+    """
+    Yields the win-probability matrix of a set of meals one row at a time
+
+    Row i holds the probability that meal i wins when it is prepped first against each
+    other meal; the diagonal is NaN. Chunks of rows are computed in a process pool and
+    yielded in order, with at most two chunks per worker in flight. A chunk holds about
+    `chunk_cells` cells, so the memory of a task does not grow with the size of the catalog.
+
+    Args:
+        meals (List[Meal]): The meals, in matrix order
+        method (str, optional): 'exact' for the closed form or 'monte_carlo' to simulate battles
+        trials (int, optional): Simulated battles per pairing for 'monte_carlo'
+        decimals (int, optional): The resolution of the random numbers, or None for a continuous draw
+        seed (int, optional): Seeds 'monte_carlo' so results do not depend on the number of workers
+        workers (int, optional): Worker processes. 0 or 1 computes in this process. Defaults to
+                                 ANALYTICS_WORKERS for 'monte_carlo' and 0 for 'exact'.
+        chunk_rows (int, optional): Matrix rows per task. Defaults to chunk_cells // len(meals), at least 1.
+        chunk_cells (int, optional): Matrix cells per task, when chunk_rows is not given
+
+    Yields:
+        tuple[Meal, np.ndarray]: A meal and its row of win probabilities
+
+    Raises:
+        ValueError: If the method, the number of trials or the chunk size is invalid
+    """
+    if method not in WIN_PROBABILITY_METHODS:
+        raise ValueError(f"Invalid method: {method}. Must be one of {list(WIN_PROBABILITY_METHODS)}.")
+    if trials < 1:
+        raise ValueError(f"Invalid number of trials: {trials}. Must be at least 1.")
+    if chunk_rows is None:
+        if chunk_cells < 1:
+            raise ValueError(f"Invalid chunk size: {chunk_cells} cells. Must be at least 1.")
+        chunk_rows = max(1, chunk_cells // max(1, len(meals)))
+    if chunk_rows < 1:
+        raise ValueError(f"Invalid chunk size: {chunk_rows}. Must be at least 1.")
+
+    scores = battle_scores(*meal_columns(meals))
+    starts = range(0, len(meals), chunk_rows)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    tasks = [(scores, start, min(start + chunk_rows, len(meals)), method, trials, decimals, chunk_seed)
+             for start, chunk_seed in zip(starts, seeds)]
+    if workers is None:
+        # the closed form is cheaper to compute than to ship between processes
+        workers = ANALYTICS_WORKERS if method == "monte_carlo" else 0
+    workers = min(workers, len(tasks))
+    logger.info("Computing %s win probabilities for %d meals in %d chunks with %d workers",
+                method, len(meals), len(tasks), workers)
+
+    def rows(chunks: Iterator[np.ndarray]) -> Iterator[tuple[Meal, np.ndarray]]:
+        position = 0
+        for chunk in chunks:
+            for row in chunk:
+                yield meals[position], row
+                position += 1
+
+    if workers <= 1:
+        yield from rows(_probability_rows(*task) for task in tasks)
+        return
+
+    def results(executor: ProcessPoolExecutor) -> Iterator[np.ndarray]:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(_probability_rows, *task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from rows(results(executor))
+
+def _load_meals(meal_ids: Optional[List[int]]) -> List[Meal]:
+    meals = get_all_meals() if meal_ids is None else get_meals_by_ids(meal_ids)
+    if len(meals) < 2:
+        raise ValueError("At least two meals are needed to compute win probabilities.")
+    return meals
+
+def _as_json_row(row: np.ndarray) -> list:
+    return [None if np.isnan(value) else float(value) for value in row]
+
+def get_win_probability_matrix(meal_ids: Optional[List[int]] = None, **options: Any) -> dict[str, Any]:
+    """
+    Computes the win-probability matrix for some meals or the whole catalog
+
+    Args:
+        meal_ids (List[int], optional): The meals to compare. Defaults to every meal that is not deleted.
+        **options: Passed on to `iter_win_probability_rows`
+
+    Returns:
+        dict[str, Any]: The meal IDs in matrix order and the matrix, where matrix[i][j] is the
+                        probability that meal i beats meal j when prepped first (None on the diagonal)
+
+    Raises:
+        ValueError: If fewer than two meals are given or an option is invalid
+        MealLookupError: If any meal does not exist or has already been marked as deleted
+        sqlite3.Error: For any database errors
+    """
+    meals = _load_meals(meal_ids)
+    matrix = [_as_json_row(row) for _, row in iter_win_probability_rows(meals, **options)]
+    return {"meal_ids": [meal.id for meal in meals], "matrix": matrix}
+
+def stream_win_probabilities(meal_ids: Optional[List[int]] = None, **options: Any) -> Iterator[str]:
+    """
+    Streams the win-probability matrix as newline-delimited JSON
+
+    The first line lists the meal IDs in column order. Each following line holds one meal's
+    row: {"id": ..., "meal": ..., "win_probability": [...]}. Only a few chunks of rows are in
+    memory at a time, so this works for catalogs whose matrix would not fit in memory.
+
+    Args:
+        meal_ids (List[int], optional): The meals to compare. Defaults to every meal that is not deleted.
+        **options: Passed on to `iter_win_probability_rows`
+
+    Yields:
+        str: One JSON document per line, including the trailing newline
+
+    Raises:
+        ValueError: If fewer than two meals are given or an option is invalid
+        MealLookupError: If any meal does not exist or has already been marked as deleted
+        sqlite3.Error: For any database errors
+    """
+    meals = _load_meals(meal_ids)
+    yield json.dumps({"meal_ids": [meal.id for meal in meals]}) + "\n"
+    for meal, row in iter_win_probability_rows(meals, **options):
+        yield json.dumps({"id": meal.id, "meal": meal.meal, "win_probability": _as_json_row(row)}) + "\n"
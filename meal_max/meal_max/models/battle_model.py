@@ -1,9 +1,10 @@
 import logging
-from typing import List
+from typing import List, Optional
 
-from meal_max.models.kitchen_model import Meal, update_meal_stats
+from meal_max.models.kitchen_model import Meal, record_battle_result
 from meal_max.utils.logger import configure_logger
-from meal_max.utils.random_utils import get_random
+from meal_max.utils.random_providers import RandomProvider, get_random
+from meal_max.utils.scoring import DIFFICULTY_MODIFIERS, battle_scores, meal_columns
 
 
 logger = logging.getLogger(__name__)
@@ -16,14 +17,20 @@ class BattleModel:
 
     Attributes:
         combatants (List[Meal]): A list of Meal objects representing the combatants in the battle
+        random_provider (Optional[RandomProvider]): The source of randomness for battles, or None
+                                                    to use the backend configured by RANDOM_BACKEND
 
     """
 
-    def __init__(self):
+    def __init__(self, random_provider: Optional[RandomProvider] = None):
         """
         Initializes the BattleModel with an empty list of combatants.
+
+        Args:
+            random_provider (RandomProvider, optional): The source of randomness for battles
         """
         self.combatants: List[Meal] = []
+        self.random_provider = random_provider
 
     def battle(self) -> str:
         """
@@ -61,11 +68,11 @@ class BattleModel:
         # Log the delta and normalized delta
         logger.info("Delta between scores: %.3f", delta)
 
-        # Get random number from random.org
-        random_number = get_random()
+        # Get random number from the configured backend (random.org by default)
+        random_number = self.random_provider.random() if self.random_provider is not None else get_random()
 
         # Log the random number
-        logger.info("Random number from random.org: %.3f", random_number)
+        logger.info("Random number: %.3f", random_number)
 
         # Determine the winner based on the normalized delta
         if delta > random_number:
@@ -78,9 +85,8 @@ class BattleModel:
         # Log the winner
         logger.info("The winner is: %s", winner.meal)
 
-        # Update stats for both combatants
-        update_meal_stats(winner.id, 'win')
-        update_meal_stats(loser.id, 'loss')
+        # Update stats for both combatants in one transaction
+        record_battle_result(winner.id, loser.id)
 
         # Remove the losing combatant from combatants
         self.combatants.remove(loser)
@@ -104,20 +110,37 @@ class BattleModel:
         Returns:
             float: The calculated battle score for the combatant
         """
-        difficulty_modifier = {"HIGH": 1, "MED": 2, "LOW": 3}
-
         # Log the calculation process
         logger.info("Calculating battle score for %s: price=%.3f, cuisine=%s, difficulty=%s",
                     combatant.meal, combatant.price, combatant.cuisine, combatant.difficulty)
 
         # Calculate score
-        score = (combatant.price * len(combatant.cuisine)) - difficulty_modifier[combatant.difficulty]
+        score = (combatant.price * len(combatant.cuisine)) - DIFFICULTY_MODIFIERS[combatant.difficulty]
 
         # Log the calculated score
         logger.info("Battle score for %s: %.3f", combatant.meal, score)
 
         return score
 
+    def get_battle_scores(self, combatants: List[Meal]) -> List[float]:
+        """
+        Calculates the battle scores for many combatants at once
+
+        Uses the vectorized scoring in `meal_max.utils.scoring`, which gives the same
+        results as `get_battle_score` and logs once for the whole batch.
+
+        Args:
+            combatants (List[Meal]): The Meal objects to score
+
+        Returns:
+            List[float]: The battle scores, in the order of `combatants`
+        """
+        scores = battle_scores(*meal_columns(combatants)).tolist()
+
+        logger.info("Calculated battle scores for %d combatants", len(scores))
+
+        return scores
+
     def get_combatants(self) -> List[Meal]:
         """
         Retrieves the current list of combatants
@@ -128,6 +151,23 @@ class BattleModel:
         logger.info("Retrieving current list of combatants.")
         return self.combatants
 
+    def load_combatants(self, combatants: List[Meal]):
+        """
+        Replaces the combatants with a saved list in one step, e.g. when a session is restored
+
+        Args:
+            combatants (List[Meal]): The Meal objects to battle, at most two
+
+        Raises:
+            ValueError: If more than two combatants are given
+        """
+        if len(combatants) > 2:
+            logger.error("Attempted to load %d combatants", len(combatants))
+            raise ValueError("Combatant list is full, cannot add more combatants.")
+
+        self.combatants[:] = combatants
+        logger.info("Loaded combatants: %s", [combatant.meal for combatant in self.combatants])
+
     def prep_combatant(self, combatant_data: Meal):
         """
         Adds a combatant to the list of combatants, logs the addition, and logs the current state of combatants
@@ -0,0 +1,276 @@
+import atexit
+import heapq
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.mongo_session_model import login_user, logout_user, session_exists
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+BATTLE_SESSION_MAX = int(os.getenv("BATTLE_SESSION_MAX", 10000))  # sessions kept in memory per worker
+BATTLE_SESSION_IDLE_TIMEOUT = float(os.getenv("BATTLE_SESSION_IDLE_TIMEOUT", 1800))  # seconds before an idle session is written back
+BATTLE_SESSION_SWEEP_INTERVAL = float(os.getenv("BATTLE_SESSION_SWEEP_INTERVAL", 60))  # seconds between idle sweeps
+
+
+class _Session:
+    # a user's battle state and when a request last used it
+    __slots__ = ("battle_model", "last_used")
+
+    def __init__(self, battle_model: BattleModel):
+        self.battle_model = battle_model
+        self.last_used = time.monotonic()
+
+
+class BattleSessionRegistry:
+    """
+    Keeps a BattleModel per logged-in user, so concurrent users never share combatants
+
+    A user's model is loaded from the Mongo sessions collection on login and written back
+    on logout. In between it lives in memory: looking it up is a plain dict read that takes
+    no lock, and only logins and evictions take the registry lock, for a few dict operations.
+    Mongo is never called with the lock held.
+
+    Sessions are written back and dropped when they have been idle for `idle_timeout`
+    seconds (checked every `sweep_interval` seconds by a background thread), and the least
+    recently used ones are when more than `max_sessions` are resident. A user who comes
+    back after an eviction logs in again and gets the saved state.
+
+    Attributes:
+        max_sessions (int): The maximum number of sessions kept in memory
+        idle_timeout (float): Seconds of inactivity after which a session is evicted
+        sweep_interval (float): Seconds between idle sweeps
+    """
+
+    def __init__(self, max_sessions: int = BATTLE_SESSION_MAX, idle_timeout: float = BATTLE_SESSION_IDLE_TIMEOUT,
+                 sweep_interval: float = BATTLE_SESSION_SWEEP_INTERVAL,
+                 load: Callable[[int, BattleModel], None] = login_user,
+                 save: Callable[[int, BattleModel], None] = logout_user,
+                 exists: Callable[[int], bool] = session_exists):
+        if max_sessions <= 0:
+            raise ValueError(f"Invalid session limit: {max_sessions}. Limit must be positive.")
+        if idle_timeout <= 0:
+            raise ValueError(f"Invalid idle timeout: {idle_timeout}. Timeout must be positive.")
+
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self._load = load
+        self._save = save
+        self._exists = exists
+
+        self._sessions: dict[int, _Session] = {}
+        self._saving: dict[int, threading.Event] = {}  # users whose state is being written back
+        self._lock = threading.Lock()
+        self._stats = {"logins": 0, "logouts": 0, "evictions": 0, "expirations": 0, "write_back_errors": 0}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="battle-session-sweeper", daemon=True)
+        self._thread.start()
+
+    def get(self, user_id: int) -> BattleModel:
+        """
+        Returns a logged-in user's BattleModel and marks the session as used
+
+        Args:
+            user_id (int): The ID of the user
+
+        Returns:
+            BattleModel: The user's battle state
+
+        Raises:
+            ValueError: If the user has no session in memory, i.e. is not logged in or was evicted
+        """
+        session = self._sessions.get(user_id)
+        if session is None:
+            raise ValueError(f"No battle session for user with ID {user_id}. Please log in.")
+        session.last_used = time.monotonic()
+        return session.battle_model
+
+    def login(self, user_id: int) -> BattleModel:
+        """
+        Opens a user's session, loading their saved combatants from MongoDB
+
+        Logging in again while the session is in memory keeps the current state.
+
+        Args:
+            user_id (int): The ID of the user
+
+        Returns:
+            BattleModel: The user's battle state
+        """
+        self._wait_for_write_back(user_id)
+        session = self._sessions.get(user_id)
+        if session is not None:
+            session.last_used = time.monotonic()
+            return session.battle_model
+
+        battle_model = BattleModel()
+        self._load(user_id, battle_model)
+
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is None:
+                session = self._sessions[user_id] = _Session(battle_model)
+                self._stats["logins"] += 1
+            victims = self._pop_least_recent(len(self._sessions) - self.max_sessions, keep=user_id)
+        session.last_used = time.monotonic()
+
+        if victims:
+            logger.info("Evicting %d least recently used battle sessions", len(victims))
+            self._write_back(victims, "evictions")
+        return session.battle_model
+
+    def logout(self, user_id: int) -> None:
+        """
+        Closes a user's session, saving their combatants to MongoDB
+
+        A user whose session was already written back, by an eviction or an earlier logout,
+        has nothing left to save and is logged out without a write.
+
+        Args:
+            user_id (int): The ID of the user
+
+        Raises:
+            ValueError: If no session document exists for the user in MongoDB
+        """
+        with self._lock:
+            victims = self._pop([user_id]) if user_id in self._sessions else []
+        if not victims:
+            # evicted sessions were already written back
+            self._wait_for_write_back(user_id)
+            if not self._exists(user_id):
+                logger.error("No session found for user ID %d. Logout failed.", user_id)
+                raise ValueError(f"User with ID {user_id} not found for logout.")
+            logger.info("No battle session in memory for user ID %d; nothing to save.", user_id)
+            return
+
+        _, session, saved = victims[0]
+        try:
+            self._save(user_id, session.battle_model)
+            with self._lock:
+                self._stats["logouts"] += 1
+        finally:
+            self._release(user_id, saved)
+
+    def evict_idle(self) -> int:
+        """
+        Writes back and drops every session idle for longer than `idle_timeout`
+
+        Returns:
+            int: The number of sessions evicted
+        """
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            idle = [user_id for user_id, session in self._sessions.items() if session.last_used < cutoff]
+            victims = self._pop(idle)
+
+        if victims:
+            logger.info("Evicting %d idle battle sessions", len(victims))
+            self._write_back(victims, "expirations")
+        return len(victims)
+
+    def close(self) -> None:
+        """
+        Stops the idle sweeper and writes back every session still in memory
+        """
+        self._stopped.set()
+        self._thread.join()
+        with self._lock:
+            victims = self._pop(list(self._sessions))
+        self._write_back(victims, None)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the registry's counters
+
+        Returns:
+            dict[str, int]: sessions (currently in memory), logins, logouts, evictions (least
+                            recently used), expirations (idle) and write_back_errors
+        """
+        with self._lock:
+            return {"sessions": len(self._sessions), **self._stats}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _pop_least_recent(self, count: int, keep: int) -> list[tuple[int, _Session, threading.Event]]:
+        # called with the lock held
+        if count <= 0:
+            return []
+        candidates = ((session.last_used, user_id) for user_id, session in self._sessions.items() if user_id != keep)
+        return self._pop([user_id for _, user_id in heapq.nsmallest(count, candidates)])
+
+    def _pop(self, user_ids: list[int]) -> list[tuple[int, _Session, threading.Event]]:
+        # called with the lock held; logins for these users wait until their state is saved
+        victims = []
+        for user_id in user_ids:
+            saved = self._saving[user_id] = threading.Event()
+            victims.append((user_id, self._sessions.pop(user_id), saved))
+        return victims
+
+    def _write_back(self, victims: list[tuple[int, _Session, threading.Event]], stat: Optional[str]) -> None:
+        for user_id, session, saved in victims:
+            try:
+                self._save(user_id, session.battle_model)
+            except Exception as e:
+                logger.error("Could not save the battle session of user ID %d: %s", user_id, str(e))
+                with self._lock:
+                    self._stats["write_back_errors"] += 1
+            finally:
+                if stat is not None:
+                    with self._lock:
+                        self._stats[stat] += 1
+                self._release(user_id, saved)
+
+    def _release(self, user_id: int, saved: threading.Event) -> None:
+        # lets logins waiting on this user's write-back load the saved state
+        with self._lock:
+            if self._saving.get(user_id) is saved:
+                del self._saving[user_id]
+        saved.set()
+
+    def _wait_for_write_back(self, user_id: int) -> None:
+        saved = self._saving.get(user_id)
+        if saved is not None:
+            saved.wait()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.sweep_interval):
+            self.evict_idle()
+
+
+_registry: Optional[BattleSessionRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_battle_session_registry() -> BattleSessionRegistry:
+    """
+    Returns the process-wide battle session registry, creating it on first use
+
+    Returns:
+        BattleSessionRegistry: The shared registry
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = BattleSessionRegistry()
+        return _registry
+
+def close_battle_session_registry() -> None:
+    """
+    Writes back every session in memory and stops the registry's sweeper
+    """
+    global _registry
+    with _registry_lock:
+        registry, _registry = _registry, None
+    if registry is not None:
+        registry.close()
+
+atexit.register(close_battle_session_registry)
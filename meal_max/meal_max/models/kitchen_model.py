@@ -1,10 +1,20 @@
+import atexit
+import base64
+import binascii
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass
+import json
 import logging
 import os
 import sqlite3
-from typing import Any
+import threading
+import time
+from typing import Any, Iterable, Iterator, Mapping, Optional
 
-from meal_max.utils.sql_utils import get_db_connection
+from meal_max.models.leaderboard_model import Leaderboard
+from meal_max.utils.cache import TTLCache
+from meal_max.utils.sql_utils import SQL_IN_CHUNK_SIZE, get_db_connection
+from meal_max.utils.streaming import STREAM_BATCH_ROWS
 from meal_max.utils.logger import configure_logger
 
 
@@ -12,20 +22,430 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# write-behind settings for battle stats (opt-in)
+STATS_WRITE_BEHIND = os.getenv("MEAL_STATS_WRITE_BEHIND", "false").lower() == "true"
+STATS_FLUSH_SIZE = int(os.getenv("MEAL_STATS_FLUSH_SIZE", 1000))  # buffered results before a flush
+STATS_FLUSH_INTERVAL = float(os.getenv("MEAL_STATS_FLUSH_INTERVAL", 1.0))  # seconds between flushes
+
+# the materialized leaderboard is reloaded from the database after this many seconds,
+# which picks up results recorded by other processes (0 disables reloading)
+LEADERBOARD_REFRESH_INTERVAL = float(os.getenv("LEADERBOARD_REFRESH_INTERVAL", 60.0))
+
+# read-through cache for get_meal_by_id / get_meal_by_name (size 0 disables it)
+MEAL_CACHE_SIZE = int(os.getenv("MEAL_CACHE_SIZE", 1024))
+MEAL_CACHE_TTL = float(os.getenv("MEAL_CACHE_TTL", 300.0))
+
+# rows per transaction in create_meals_bulk
+BULK_INSERT_CHUNK_SIZE = int(os.getenv("MEAL_BULK_INSERT_CHUNK_SIZE", 500))
+
+# Indexes backing the leaderboard queries. They are partial on battles > 0 like the
+# queries themselves, so meals that have never battled cost nothing to index.
+MEAL_INDEXES = [
+    """
+    CREATE INDEX IF NOT EXISTS idx_meals_leaderboard_wins
+    ON meals (deleted, wins) WHERE battles > 0
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_meals_leaderboard_win_pct
+    ON meals (deleted, (wins * 1.0 / battles)) WHERE battles > 0
+    """,
+]
+
+
+MEAL_FIELDS = ("id", "meal", "cuisine", "price", "difficulty")
+
+
+class _MealBase:
+    # Shared behaviour of Meal and FrozenMeal. Both are slotted, so instances carry no __dict__.
+    __slots__ = ()
+
+    def __post_init__(self):
+        if self.price < 0:
+            raise ValueError("Price must be a positive value.")
+        if self.difficulty not in ['LOW', 'MED', 'HIGH']:
+            raise ValueError("Difficulty must be 'LOW', 'MED', or 'HIGH'.")
+
+    @classmethod
+    def from_row(cls, row: tuple):
+        """
+        Builds a meal from a database row without validating it
+
+        Rows in the meals table were validated when they were inserted, so reads skip
+        `__post_init__`. Use the regular constructor for user input.
+
+        Args:
+            row (tuple): An (id, meal, cuisine, price, difficulty, ...) row. Extra trailing columns are ignored.
+
+        Returns:
+            The meal
+        """
+        meal = object.__new__(cls)
+        for name, value in zip(MEAL_FIELDS, row):
+            object.__setattr__(meal, name, value)
+        return meal
+
+    # slotted instances have no __dict__ to pickle, and frozen ones cannot be restored with setattr
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, name) for name in MEAL_FIELDS)
+
+    def __setstate__(self, state: tuple) -> None:
+        for name, value in zip(MEAL_FIELDS, state):
+            object.__setattr__(self, name, value)
+
+
 @dataclass
-class Meal:
+class Meal(_MealBase):
+    __slots__ = MEAL_FIELDS
+
     id: int
     meal: str
     cuisine: str
     price: float
     difficulty: str
 
-    def __post_init__(self):
-        if self.price < 0:
-            raise ValueError("Price must be a positive value.")
-        if self.difficulty not in ['LOW', 'MED', 'HIGH']:
-            raise ValueError("Difficulty must be 'LOW', 'MED', or 'HIGH'.")
 
+@dataclass(frozen=True)
+class FrozenMeal(_MealBase):
+    """
+    An immutable, hashable Meal for snapshots such as tournament brackets
+    """
+    __slots__ = MEAL_FIELDS
+
+    id: int
+    meal: str
+    cuisine: str
+    price: float
+    difficulty: str
+
+
+def meal_row_factory(cursor: sqlite3.Cursor, row: tuple) -> Meal:
+    """
+    A sqlite3 row factory that builds Meal objects straight from the result rows
+
+    The query must select id, meal, cuisine, price and difficulty first, in that order.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor the row came from
+        row (tuple): The raw row
+
+    Returns:
+        Meal: The meal, built without re-validating the stored values
+    """
+    return Meal.from_row(row)
+
+
+class MealLookupError(ValueError):
+    """
+    Raised by the batched meal lookups when some meals are missing or deleted
+
+    The message joins the per-key messages, so a single failing key reads exactly
+    like the error from the single-meal lookup.
+
+    Attributes:
+        errors (dict[Any, str]): The error message for each failing key, in request order
+    """
+
+    def __init__(self, errors: dict[Any, str]):
+        super().__init__("; ".join(errors.values()))
+        self.errors = errors
+
+
+class MealStatsBuffer:
+    """
+    Aggregates battle results in memory and writes them to the meals table in bulk
+
+    Results are kept as per-meal (battles, wins) deltas and flushed in one transaction
+    when `flush_size` results are pending, every `flush_interval` seconds, on demand,
+    and at interpreter shutdown.
+
+    Attributes:
+        flush_size (int): The number of buffered results that triggers a flush
+        flush_interval (float): The maximum time between flushes, in seconds
+    """
+
+    def __init__(self, flush_size: int = STATS_FLUSH_SIZE, flush_interval: float = STATS_FLUSH_INTERVAL):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: dict[int, list[int]] = {}
+        self._flushing: dict[int, list[int]] = {}
+        self._pending_results = 0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="meal-stats-flusher", daemon=True)
+        self._thread.start()
+
+    def add(self, meal_id: int, battles: int, wins: int) -> None:
+        """
+        Buffers a stats delta for a meal
+
+        Args:
+            meal_id (int): The ID of the meal
+            battles (int): The number of battles to add
+            wins (int): The number of wins to add
+        """
+        with self._lock:
+            delta = self._pending.setdefault(meal_id, [0, 0])
+            delta[0] += battles
+            delta[1] += wins
+            self._pending_results += 1
+            full = self._pending_results >= self.flush_size
+        if full:
+            self._wakeup.set()
+
+    def pending(self) -> dict[int, tuple[int, int]]:
+        """
+        Returns the deltas that are not yet committed, including any flush in progress
+
+        Returns:
+            dict[int, tuple[int, int]]: (battles, wins) deltas keyed by meal ID
+        """
+        with self._lock:
+            merged = {meal_id: tuple(delta) for meal_id, delta in self._flushing.items()}
+            for meal_id, (battles, wins) in self._pending.items():
+                old_battles, old_wins = merged.get(meal_id, (0, 0))
+                merged[meal_id] = (old_battles + battles, old_wins + wins)
+        return merged
+
+    def flush(self) -> int:
+        """
+        Writes all buffered deltas to the meals table in one transaction
+
+        Returns:
+            int: The number of meals updated
+
+        Raises:
+            sqlite3.Error: If the write fails. The deltas stay buffered for the next flush.
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+
+        # the connection is taken before the flush lock, matching the order used by
+        # leaderboard loads, which hold a connection while pausing flushes
+        try:
+            with get_db_connection() as conn, self._flush_lock:
+                with self._lock:
+                    self._flushing, self._pending = self._pending, {}
+                    self._pending_results = 0
+                    updates = [(battles, wins, meal_id) for meal_id, (battles, wins) in self._flushing.items()]
+                if not updates:
+                    return 0
+
+                try:
+                    cursor = conn.cursor()
+                    cursor.executemany("UPDATE meals SET battles = battles + ?, wins = wins + ? WHERE id = ?", updates)
+                    conn.commit()
+                except sqlite3.Error:
+                    with self._lock:
+                        for meal_id, (battles, wins) in self._flushing.items():
+                            delta = self._pending.setdefault(meal_id, [0, 0])
+                            delta[0] += battles
+                            delta[1] += wins
+                        self._flushing = {}
+                    raise
+
+                with self._lock:
+                    self._flushing = {}
+
+        except sqlite3.Error as e:
+            logger.error("Database error while flushing meal stats: %s", str(e))
+            raise e
+
+        logger.info("Flushed buffered stats for %d meals", len(updates))
+        return len(updates)
+
+    def discard(self) -> None:
+        """
+        Drops the buffered deltas without writing them, e.g. because their meals no longer exist
+        """
+        with self._lock:
+            self._pending, self._flushing = {}, {}
+            self._pending_results = 0
+
+    @contextmanager
+    def paused(self):
+        """
+        Holds off flushes so the database and the pending deltas can be read consistently
+        """
+        with self._flush_lock:
+            yield
+
+    def close(self) -> None:
+        """
+        Stops the background flusher and writes any remaining deltas
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass  # already logged, deltas are retried on the next pass
+
+
+_stats_buffer: Optional[MealStatsBuffer] = None
+_stats_buffer_lock = threading.Lock()
+
+
+def enable_write_behind(flush_size: int = STATS_FLUSH_SIZE, flush_interval: float = STATS_FLUSH_INTERVAL) -> None:
+    """
+    Switches battle stat updates to write-behind mode
+
+    In this mode `update_meal_stats` and `record_battle_result` still validate the meals,
+    but buffer the stat changes instead of committing them immediately.
+
+    Args:
+        flush_size (int, optional): The number of buffered results that triggers a flush
+        flush_interval (float, optional): The maximum time between flushes, in seconds
+    """
+    global _stats_buffer
+    with _stats_buffer_lock:
+        if _stats_buffer is not None:
+            return
+        _stats_buffer = MealStatsBuffer(flush_size=flush_size, flush_interval=flush_interval)
+    logger.info("Write-behind enabled for meal stats (flush_size=%d, flush_interval=%.2fs)", flush_size, flush_interval)
+
+def disable_write_behind() -> None:
+    """
+    Flushes any buffered stats and switches back to committing each update immediately
+    """
+    global _stats_buffer
+    with _stats_buffer_lock:
+        buffer, _stats_buffer = _stats_buffer, None
+    if buffer is not None:
+        buffer.close()
+        logger.info("Write-behind disabled for meal stats")
+
+def flush_meal_stats() -> int:
+    """
+    Writes any buffered battle stats to the database now
+
+    Returns:
+        int: The number of meals updated (0 when write-behind is disabled)
+
+    Raises:
+        sqlite3.Error: If the write fails
+    """
+    buffer = _stats_buffer
+    return buffer.flush() if buffer is not None else 0
+
+def _pending_stats() -> dict[int, tuple[int, int]]:
+    buffer = _stats_buffer
+    return buffer.pending() if buffer is not None else {}
+
+def _paused_stats_flush():
+    buffer = _stats_buffer
+    return buffer.paused() if buffer is not None else nullcontext()
+
+def _discard_pending_stats() -> None:
+    buffer = _stats_buffer
+    if buffer is not None:
+        buffer.discard()
+
+def _chunks(items: list, size: int = SQL_IN_CHUNK_SIZE) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+atexit.register(disable_write_behind)
+
+
+# Materialized leaderboard. It reflects committed stats plus buffered write-behind deltas.
+# Stat changes are applied while holding its lock, together with the commit or buffer
+# write, so a concurrent reload never counts a result twice or misses it.
+_leaderboard = Leaderboard()
+# meals whose stats changed while they were not ranked; loaded on the next read
+_leaderboard_missing: set[int] = set()
+
+
+def _apply_to_leaderboard(meal_id: int, battles: int, wins: int) -> None:
+    # must be called with _leaderboard.lock held
+    if _leaderboard.loaded_at is not None and not _leaderboard.apply(meal_id, battles, wins):
+        _leaderboard_missing.add(meal_id)
+
+# Meals are cached under ("id", id) and ("name", name). Entries are only ever positive
+# lookups; deleted and missing meals always go to the database. Invalidations bump the
+# generation so a lookup that raced with a delete does not cache what it read.
+# The cache holds FrozenMeals and every caller gets its own Meal copy, so a caller
+# changing its meal cannot change what other callers are served.
+_meal_cache = TTLCache(maxsize=MEAL_CACHE_SIZE, ttl=MEAL_CACHE_TTL)
+_meal_cache_generation = 0
+_meal_cache_lock = threading.Lock()
+# names of the meals cached since the last clear, so an invalidation by ID can delete the
+# name key directly even when the ID key has been evicted on its own
+_meal_cache_names: dict[int, str] = {}
+
+
+def _cache_meal(meal: Meal, generation: int) -> None:
+    frozen = FrozenMeal.from_row(_meal_row(meal))
+    with _meal_cache_lock:
+        if generation == _meal_cache_generation:
+            _meal_cache.set(("id", meal.id), frozen)
+            _meal_cache.set(("name", meal.meal), frozen)
+            _meal_cache_names[meal.id] = meal.meal
+
+def _cached_meal(kind: str, key: Any) -> Optional[Meal]:
+    frozen = _meal_cache.get((kind, key))
+    return Meal.from_row(_meal_row(frozen)) if frozen is not None else None
+
+def _meal_row(meal: _MealBase) -> tuple:
+    return tuple(getattr(meal, name) for name in MEAL_FIELDS)
+
+def _invalidate_cached_meal(meal_id: int) -> None:
+    global _meal_cache_generation
+    with _meal_cache_lock:
+        _meal_cache_generation += 1
+        _meal_cache.delete(("id", meal_id))
+        meal_name = _meal_cache_names.pop(meal_id, None)
+        if meal_name is not None:
+            _meal_cache.delete(("name", meal_name))
+
+def clear_meal_cache() -> None:
+    """
+    Empties the meal lookup cache
+    """
+    global _meal_cache_generation
+    with _meal_cache_lock:
+        _meal_cache_generation += 1
+        _meal_cache.clear()
+        _meal_cache_names.clear()
+
+def get_meal_cache_stats() -> dict[str, int]:
+    """
+    Returns the counters of the meal lookup cache
+
+    Returns:
+        dict[str, int]: hits, misses, evictions, expirations, current size and maxsize
+    """
+    return _meal_cache.stats()
+
+def invalidate_leaderboard() -> None:
+    """
+    Drops the materialized leaderboard so the next read reloads it from the database
+    """
+    with _leaderboard.lock:
+        _leaderboard.invalidate()
+        _leaderboard_missing.clear()
+
+if STATS_WRITE_BEHIND:
+    enable_write_behind()
+
+
+def _validate_meal_fields(price: float, difficulty: str) -> None:
+    if not isinstance(price, (int, float)) or price <= 0:
+        raise ValueError(f"Invalid price: {price}. Price must be a positive number.")
+    if difficulty not in ['LOW', 'MED', 'HIGH']:
+        raise ValueError(f"Invalid difficulty level: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'.")
 
 def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
     """
@@ -42,10 +462,7 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
         sqlite3.InegrityError: if the meal name already exists in the database
         sqlite3.Error: For any other database errors
     """
-    if not isinstance(price, (int, float)) or price <= 0:
-        raise ValueError(f"Invalid price: {price}. Price must be a positive number.")
-    if difficulty not in ['LOW', 'MED', 'HIGH']:
-        raise ValueError(f"Invalid difficulty level: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'.")
+    _validate_meal_fields(price, difficulty)
 
     try:
         with get_db_connection() as conn:
@@ -66,6 +483,122 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
         logger.error("Database error: %s", str(e))
         raise e
 
+def _bulk_meal_fields(row: Any) -> tuple:
+    if isinstance(row, Mapping):
+        try:
+            fields = (row['meal'], row['cuisine'], row['price'], row['difficulty'])
+        except KeyError as e:
+            raise ValueError(f"Missing field: {e.args[0]}")
+    elif isinstance(row, (list, tuple)) and len(row) == 4:
+        fields = tuple(row)
+    else:
+        raise ValueError(f"Malformed row: {row!r}")
+
+    meal, cuisine, price, difficulty = fields
+    if not isinstance(meal, str) or not meal or not isinstance(cuisine, str) or not cuisine:
+        raise ValueError("Meal and cuisine must be non-empty strings.")
+    _validate_meal_fields(price, difficulty)
+    return fields
+
+def _insert_meal_chunk(chunk: list[tuple[int, Any]], report: dict[str, Any]) -> None:
+    valid = {}
+    for row_number, row in chunk:
+        try:
+            fields = _bulk_meal_fields(row)
+        except ValueError as e:
+            report['invalid'].append({'row': row_number, 'error': str(e)})
+            continue
+        if fields[0] in valid:
+            report['duplicates'].append({'row': row_number, 'meal': fields[0]})
+            continue
+        valid[fields[0]] = (row_number, fields)
+
+    if not valid:
+        return
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        # take the write lock up front so no other writer can add a name between the check and the insert
+        cursor.execute("BEGIN IMMEDIATE")
+        # the insert chunk can be larger than one IN (...) query may be
+        for names in _chunks(list(valid)):
+            placeholders = ", ".join("?" * len(names))
+            cursor.execute(f"SELECT meal FROM meals WHERE meal IN ({placeholders})", names)
+            for (name,) in cursor.fetchall():
+                row_number, _ = valid.pop(name)
+                report['duplicates'].append({'row': row_number, 'meal': name})
+
+        cursor.executemany("""
+            INSERT INTO meals (meal, cuisine, price, difficulty)
+            VALUES (?, ?, ?, ?)
+        """, [fields for _, fields in valid.values()])
+        conn.commit()
+
+    report['inserted'] += len(valid)
+
+def create_meals_bulk(meals: Iterable[Any], chunk_size: int = BULK_INSERT_CHUNK_SIZE) -> dict[str, Any]:
+    """
+    Creates many meals, inserting them in chunked transactions
+
+    Rows are consumed lazily, so generators over large files can be passed in directly.
+    Each row is either a mapping with 'meal', 'cuisine', 'price' and 'difficulty' keys or a
+    (meal, cuisine, price, difficulty) tuple, and is validated like `create_meal`. Invalid
+    rows and duplicate names are reported and skipped without aborting the batch.
+
+    Args:
+        meals (Iterable[Any]): The meals to create
+        chunk_size (int, optional): The number of rows per transaction. Defaults to BULK_INSERT_CHUNK_SIZE.
+
+    Returns:
+        dict[str, Any]: The number of rows 'inserted', the 'duplicates' (row number and meal name)
+                        and the 'invalid' rows (row number and error). Row numbers start at 1.
+
+    Raises:
+        ValueError: If the chunk size is not a positive integer
+        sqlite3.Error: For any database errors. Chunks committed before the error are kept.
+    """
+    if not isinstance(chunk_size, int) or chunk_size <= 0:
+        raise ValueError(f"Invalid chunk size: {chunk_size}. Must be a positive integer.")
+
+    report = {'inserted': 0, 'duplicates': [], 'invalid': []}
+    chunk = []
+    try:
+        for row_number, row in enumerate(meals, start=1):
+            chunk.append((row_number, row))
+            if len(chunk) >= chunk_size:
+                _insert_meal_chunk(chunk, report)
+                chunk = []
+        if chunk:
+            _insert_meal_chunk(chunk, report)
+
+    except sqlite3.Error as e:
+        logger.error("Database error during bulk meal import: %s", str(e))
+        raise e
+
+    logger.info("Bulk meal import finished: %d inserted, %d duplicates, %d invalid",
+                report['inserted'], len(report['duplicates']), len(report['invalid']))
+    return report
+
+def ensure_meal_indexes() -> None:
+    """
+    Creates the indexes used by the leaderboard queries if they do not exist yet
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            for statement in MEAL_INDEXES:
+                cursor.execute(statement)
+            conn.commit()
+
+            logger.info("Meal indexes are in place.")
+
+    except sqlite3.Error as e:
+        logger.error("Database error while creating meal indexes: %s", str(e))
+        raise e
+
 def clear_meals() -> None:
     """
     Recreates the meals table, effectively deleting all meals.
@@ -76,10 +609,18 @@ def clear_meals() -> None:
     try:
         with open(os.getenv("SQL_CREATE_TABLE_PATH", "/app/sql/create_meal_table.sql"), "r") as fh:
             create_table_script = fh.read()
-        with get_db_connection() as conn:
+        # buffered stats belong to the dropped meals; flushing them later would credit
+        # the new meals that reuse their IDs
+        with get_db_connection() as conn, _leaderboard.lock, _paused_stats_flush():
             cursor = conn.cursor()
             cursor.executescript(create_table_script)
+            for statement in MEAL_INDEXES:
+                cursor.execute(statement)
             conn.commit()
+            _discard_pending_stats()
+            _leaderboard.invalidate()
+            _leaderboard_missing.clear()
+            clear_meal_cache()
 
             logger.info("Meals cleared successfully.")
 
@@ -112,7 +653,11 @@ def delete_meal(meal_id: int) -> None:
                 raise ValueError(f"Meal with ID {meal_id} not found")
 
             cursor.execute("UPDATE meals SET deleted = TRUE WHERE id = ?", (meal_id,))
-            conn.commit()
+            with _leaderboard.lock:
+                conn.commit()
+                _leaderboard.remove(meal_id)
+                _leaderboard_missing.discard(meal_id)
+            _invalidate_cached_meal(meal_id)
 
             logger.info("Meal with ID %s marked as deleted.", meal_id)
 
@@ -120,55 +665,308 @@ def delete_meal(meal_id: int) -> None:
         logger.error("Database error: %s", str(e))
         raise e
 
-def get_leaderboard(sort_by: str="wins") -> dict[str, Any]:
+# SQL expressions of the leaderboard sort keys
+LEADERBOARD_SORT_KEYS = {"wins": "wins", "win_pct": "(wins * 1.0 / battles)"}
+
+def _leaderboard_query(sort_by: str, conditions: Iterable[str] = (), order_by_id: bool = False,
+                       limit: bool = False) -> str:
+    # conditions are extra WHERE clauses with ? placeholders; order_by_id breaks ties like the
+    # in-memory board, and limit adds a LIMIT ? placeholder
+    query = """
+        SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
+        FROM meals WHERE deleted = false AND battles > 0
+    """
+    for condition in conditions:
+        query += f" AND {condition}"
+
+    if sort_by == "win_pct":
+        query += " ORDER BY win_pct DESC"
+    elif sort_by == "wins":
+        query += " ORDER BY wins DESC"
+    else:
+        logger.error("Invalid sort_by parameter: %s", sort_by)
+        raise ValueError("Invalid sort_by parameter: %s" % sort_by)
+    if order_by_id:
+        query += ", id"
+    if limit:
+        query += " LIMIT ?"
+    return query
+
+def _leaderboard_filter(cuisine: Optional[str], difficulty: Optional[str]):
+    if difficulty is not None and difficulty not in ['LOW', 'MED', 'HIGH']:
+        raise ValueError(f"Invalid difficulty level: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'.")
+    if cuisine is None and difficulty is None:
+        return None
+    return lambda entry: ((cuisine is None or entry['cuisine'] == cuisine)
+                          and (difficulty is None or entry['difficulty'] == difficulty))
+
+def _validate_limit(limit: Optional[int]) -> None:
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit <= 0):
+        raise ValueError(f"Invalid limit: {limit}. Limit must be a positive integer.")
+
+def _with_win_pct(leaderboard: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    for meal in leaderboard:
+        meal['win_pct'] = round(meal['wins'] * 1.0 / meal['battles'] * 100, 1)  # Convert to percentage
+    return leaderboard
+
+def _encode_cursor(sort_by: str, key: tuple) -> str:
+    payload = json.dumps([sort_by, key[0], key[1]]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def _decode_cursor(sort_by: str, cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort_by, key, meal_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if cursor_sort_by != sort_by or not isinstance(key, (int, float)) or not isinstance(meal_id, int):
+            raise ValueError
+    except (binascii.Error, TypeError, ValueError):
+        logger.error("Invalid leaderboard cursor: %s", cursor)
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return (key, meal_id)
+
+def get_leaderboard(sort_by: str="wins", limit: Optional[int] = None, cuisine: Optional[str] = None,
+                    difficulty: Optional[str] = None) -> dict[str, Any]:
     """
     Retrieves the leaderboard of meals based on the specified sort order.
 
+    Results are served from a materialized leaderboard that is loaded from the database on
+    first use (and every LEADERBOARD_REFRESH_INTERVAL seconds) and updated incrementally as
+    battle results are recorded. When write-behind is enabled, battle results that have not
+    been flushed yet are included.
+
     Args:
         sort_by (str, optional): The field to sort the leaderboard by. Can be 'wins' or 'win_pct'. Defaults to 'wins'.
+        limit (int, optional): Only return the top `limit` meals. Defaults to all meals.
+        cuisine (str, optional): Only include meals of this cuisine.
+        difficulty (str, optional): Only include meals of this difficulty ('LOW', 'MED' or 'HIGH').
 
     Returns:
         dict[str, Any]: A list of meals with their corresponding stats
 
     Raises:
         ValueError: If the sort_by parameter is not 'wins' or 'win_pct'
+        ValueError: If the limit is not a positive integer or the difficulty is invalid
         sqlite3.Error: For any other database errors
     """
-    query = """
-        SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
-        FROM meals WHERE deleted = false AND battles > 0
+    query = _leaderboard_query(sort_by)
+    _validate_limit(limit)
+    predicate = _leaderboard_filter(cuisine, difficulty)
+
+    try:
+        _sync_leaderboard(query, sort_by)
+
+        if predicate is None:
+            leaderboard = _leaderboard.top(sort_by, limit)
+        else:
+            leaderboard, _ = _leaderboard.page(sort_by, limit or len(_leaderboard), predicate=predicate)
+
+        logger.info("Leaderboard retrieved successfully")
+        return _with_win_pct(leaderboard)
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def get_leaderboard_page(sort_by: str = "wins", limit: int = 10, cursor: Optional[str] = None,
+                         cuisine: Optional[str] = None, difficulty: Optional[str] = None) -> dict[str, Any]:
     """
+    Retrieves one page of the leaderboard, continuing after a keyset cursor
 
-    if sort_by == "win_pct":
-        query += " ORDER BY win_pct DESC"
-    elif sort_by == "wins":
-        query += " ORDER BY wins DESC"
-    else:
-        logger.error("Invalid sort_by parameter: %s", sort_by)
-        raise ValueError("Invalid sort_by parameter: %s" % sort_by)
+    Cursors encode the sort key and ID of the last meal returned, so pages stay stable
+    while stats change and fetching a page costs the same no matter how deep it is.
+
+    Args:
+        sort_by (str, optional): The field to sort the leaderboard by. Can be 'wins' or 'win_pct'. Defaults to 'wins'.
+        limit (int, optional): The maximum number of meals on the page. Defaults to 10.
+        cursor (str, optional): The `next_cursor` of the previous page. Defaults to the first page.
+        cuisine (str, optional): Only include meals of this cuisine.
+        difficulty (str, optional): Only include meals of this difficulty ('LOW', 'MED' or 'HIGH').
+
+    Returns:
+        dict[str, Any]: The page's meals under 'leaderboard' and the cursor of the next page
+                        under 'next_cursor' (None on the last page)
+
+    Raises:
+        ValueError: If sort_by, limit, difficulty or cursor is invalid
+        sqlite3.Error: For any other database errors
+    """
+    query = _leaderboard_query(sort_by)
+    if limit is None:
+        raise ValueError(f"Invalid limit: {limit}. Limit must be a positive integer.")
+    _validate_limit(limit)
+    predicate = _leaderboard_filter(cuisine, difficulty)
+    after = _decode_cursor(sort_by, cursor) if cursor is not None else None
 
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
+        _sync_leaderboard(query, sort_by)
+        leaderboard, last_key = _leaderboard.page(sort_by, limit, after=after, predicate=predicate)
+
+        logger.info("Leaderboard page retrieved successfully")
+        return {
+            "leaderboard": _with_win_pct(leaderboard),
+            "next_cursor": _encode_cursor(sort_by, last_key) if last_key is not None else None,
+        }
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def iter_leaderboard(sort_by: str = "wins", cuisine: Optional[str] = None, difficulty: Optional[str] = None,
+                     batch_size: int = STREAM_BATCH_ROWS) -> Iterator[dict[str, Any]]:
+    """
+    Streams the whole leaderboard from the database, for exports
+
+    Unlike get_leaderboard this reads the meals table directly, `batch_size` rows at a
+    time, so memory does not grow with the number of meals. Buffered battle stats are
+    flushed first. Entries are ordered like the materialized leaderboard (sort key
+    descending, then ID) and shaped like get_leaderboard's.
+
+    Arguments are validated immediately; the database is only read as the iterator is
+    consumed. Each batch is a separate query that continues after the last row sent
+    (keyset pagination), and its pooled connection is returned before the rows are
+    yielded, so a slow download neither holds a connection nor keeps a read transaction
+    open. Stats that change during the export can therefore move a meal past the point
+    already sent; each meal is still exported at most once.
+
+    Args:
+        sort_by (str, optional): The field to sort the leaderboard by. Can be 'wins' or 'win_pct'. Defaults to 'wins'.
+        cuisine (str, optional): Only include meals of this cuisine.
+        difficulty (str, optional): Only include meals of this difficulty ('LOW', 'MED' or 'HIGH').
+        batch_size (int, optional): Rows fetched at a time
+
+    Returns:
+        Iterator[dict[str, Any]]: The ranked meals with their stats
+
+    Raises:
+        ValueError: If sort_by or difficulty is invalid
+        sqlite3.Error: For any database errors, raised while iterating
+    """
+    _leaderboard_filter(cuisine, difficulty)
+    conditions, params = [], []
+    if cuisine is not None:
+        conditions.append("cuisine = ?")
+        params.append(cuisine)
+    if difficulty is not None:
+        conditions.append("difficulty = ?")
+        params.append(difficulty)
+    first_query = _leaderboard_query(sort_by, conditions, order_by_id=True, limit=True)
+    sort_key = LEADERBOARD_SORT_KEYS[sort_by]
+    next_query = _leaderboard_query(sort_by, [*conditions, f"({sort_key} < ? OR ({sort_key} = ? AND id > ?))"],
+                                    order_by_id=True, limit=True)
+
+    def rows() -> Iterator[dict[str, Any]]:
+        try:
+            flush_meal_stats()
+            query, query_params, count = first_query, params, 0
+            while True:
+                with get_db_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(query, [*query_params, batch_size])
+                    batch = cursor.fetchall()
+                for meal_id, meal, cuisine_, price, difficulty_, battles, wins, _ in batch:
+                    yield {"id": meal_id, "meal": meal, "cuisine": cuisine_, "price": price,
+                           "difficulty": difficulty_, "battles": battles, "wins": wins,
+                           "win_pct": round(wins * 1.0 / battles * 100, 1)}
+                count += len(batch)
+                if len(batch) < batch_size:
+                    break
+                last = batch[-1]
+                key = last[6] if sort_by == "wins" else last[7]
+                query, query_params = next_query, [*params, key, key, last[0]]
+            logger.info("Streamed %d leaderboard entries", count)
+
+        except sqlite3.Error as e:
+            logger.error("Database error: %s", str(e))
+            raise e
+
+    return rows()
+
+def _sync_leaderboard(query: str, sort_by: str) -> None:
+    """
+    Loads the materialized leaderboard if it is cold or stale, and ranks any meals that
+    gained their first battles since the last load.
+    """
+    with _leaderboard.lock:
+        loaded_at = _leaderboard.loaded_at
+        stale = loaded_at is None or (
+            LEADERBOARD_REFRESH_INTERVAL > 0 and time.monotonic() - loaded_at > LEADERBOARD_REFRESH_INTERVAL
+        )
+        if not stale and not _leaderboard_missing:
+            return
+
+    # connection first, then the leaderboard lock, then the flush pause (same order as writers)
+    with get_db_connection() as conn, _leaderboard.lock, _paused_stats_flush():
+        cursor = conn.cursor()
+        pending = _pending_stats()
+
+        if _leaderboard.loaded_at is None or stale:
             cursor.execute(query)
             rows = cursor.fetchall()
+            if pending:
+                rows = _merge_pending_stats(cursor, rows, pending, sort_by)
+            _leaderboard.load(rows)
+        elif _leaderboard_missing:
+            missing = {meal_id: pending.get(meal_id, (0, 0)) for meal_id in _leaderboard_missing}
+            for row in _merge_pending_stats(cursor, [], missing, sort_by):
+                _leaderboard.upsert(row)
+            logger.info("Added %d meals to the leaderboard", len(missing))
 
-        leaderboard = []
-        for row in rows:
-            meal = {
-                'id': row[0],
-                'meal': row[1],
-                'cuisine': row[2],
-                'price': row[3],
-                'difficulty': row[4],
-                'battles': row[5],
-                'wins': row[6],
-                'win_pct': round(row[7] * 100, 1)  # Convert to percentage
-            }
-            leaderboard.append(meal)
+        _leaderboard_missing.clear()
 
-        logger.info("Leaderboard retrieved successfully")
-        return leaderboard
+def _merge_pending_stats(cursor: sqlite3.Cursor, rows: list[tuple], pending: dict[int, tuple[int, int]],
+                         sort_by: str) -> list[tuple]:
+    """
+    Applies buffered (not yet flushed) stat deltas to leaderboard rows and re-sorts them
+
+    Meals whose only battles are still buffered are loaded with extra queries.
+    """
+    rows_by_id = {row[0]: list(row[:7]) for row in rows}
+
+    missing = [meal_id for meal_id in pending if meal_id not in rows_by_id]
+    for chunk in _chunks(missing):
+        placeholders = ", ".join("?" * len(chunk))
+        cursor.execute(f"""
+            SELECT id, meal, cuisine, price, difficulty, battles, wins
+            FROM meals WHERE deleted = false AND id IN ({placeholders})
+        """, chunk)
+        for row in cursor.fetchall():
+            rows_by_id[row[0]] = list(row)
+
+    for meal_id, (battles, wins) in pending.items():
+        row = rows_by_id.get(meal_id)
+        if row is not None:
+            row[5] += battles
+            row[6] += wins
+
+    merged = [tuple(row) + (row[6] * 1.0 / row[5],) for row in rows_by_id.values() if row[5] > 0]
+    sort_index = 7 if sort_by == "win_pct" else 6
+    merged.sort(key=lambda row: row[sort_index], reverse=True)
+    return merged
+
+def get_all_meals() -> list[Meal]:
+    """
+    Retrieves every meal that has not been deleted, ordered by ID
+
+    Rows are turned into Meal objects by `meal_row_factory` as they are fetched.
+
+    Returns:
+        list[Meal]: The meals in the catalog
+
+    Raises:
+        sqlite3.Error: For any database errors
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = meal_row_factory
+            cursor.execute("""
+                SELECT id, meal, cuisine, price, difficulty FROM meals
+                WHERE deleted = FALSE ORDER BY id
+            """)
+            meals = cursor.fetchall()
+
+        logger.info("Retrieved %d meals", len(meals))
+        return meals
 
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
@@ -178,6 +976,9 @@ def get_meal_by_id(meal_id: int) -> Meal:
     """
     Retrieves a meal from the database based on the meal ID
 
+    Meals are served from an in-process LRU/TTL cache when possible. Every call returns
+    its own copy, so changing it does not affect other callers.
+
     Args:
         meal_id (int): The ID of the meal to retrieve
     
@@ -188,6 +989,11 @@ def get_meal_by_id(meal_id: int) -> Meal:
         ValueError: If the meal with the given ID does not exist or has already been marked as deleted
         sqlite3.Error: For any other database errors
     """
+    meal = _cached_meal("id", meal_id)
+    if meal is not None:
+        return meal
+    generation = _meal_cache_generation
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -198,7 +1004,9 @@ def get_meal_by_id(meal_id: int) -> Meal:
                 if row[5]:
                     logger.info("Meal with ID %s has been deleted", meal_id)
                     raise ValueError(f"Meal with ID {meal_id} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                meal = Meal.from_row(row)
+                _cache_meal(meal, generation)
+                return meal
             else:
                 logger.info("Meal with ID %s not found", meal_id)
                 raise ValueError(f"Meal with ID {meal_id} not found")
@@ -212,6 +1020,9 @@ def get_meal_by_name(meal_name: str) -> Meal:
     """
     Retrieves a meal from the database based on the meal name
 
+    Meals are served from an in-process LRU/TTL cache when possible. Every call returns
+    its own copy, so changing it does not affect other callers.
+
     Args:
         meal_name (str): The name of the meal to retrieve
 
@@ -222,6 +1033,11 @@ def get_meal_by_name(meal_name: str) -> Meal:
         ValueError: If the meal with the given name does not exist or has already been marked as deleted
         sqlite3.Error: For any other database errors
     """
+    meal = _cached_meal("name", meal_name)
+    if meal is not None:
+        return meal
+    generation = _meal_cache_generation
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -232,7 +1048,9 @@ def get_meal_by_name(meal_name: str) -> Meal:
                 if row[5]:
                     logger.info("Meal with name %s has been deleted", meal_name)
                     raise ValueError(f"Meal with name {meal_name} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                meal = Meal.from_row(row)
+                _cache_meal(meal, generation)
+                return meal
             else:
                 logger.info("Meal with name %s not found", meal_name)
                 raise ValueError(f"Meal with name {meal_name} not found")
@@ -242,6 +1060,99 @@ def get_meal_by_name(meal_name: str) -> Meal:
         raise e
 
 
+def _get_meals_by(column: str, kind: str, label: str, keys: list) -> list[Meal]:
+    unique_keys = list(dict.fromkeys(keys))
+    found = {}
+    misses = []
+    for key in unique_keys:
+        meal = _cached_meal(kind, key)
+        if meal is not None:
+            found[key] = meal
+        else:
+            misses.append(key)
+
+    deleted = set()
+    if misses:
+        generation = _meal_cache_generation
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            for chunk in _chunks(misses):
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"""
+                    SELECT id, meal, cuisine, price, difficulty, deleted
+                    FROM meals WHERE {column} IN ({placeholders})
+                """, chunk)
+                for row in cursor.fetchall():
+                    key = row[0] if kind == "id" else row[1]
+                    if row[5]:
+                        deleted.add(key)
+                        continue
+                    meal = Meal.from_row(row)
+                    found[key] = meal
+                    _cache_meal(meal, generation)
+
+    errors = {}
+    for key in unique_keys:
+        if key in deleted:
+            logger.info("Meal with %s %s has been deleted", label, key)
+            errors[key] = f"Meal with {label} {key} has been deleted"
+        elif key not in found:
+            logger.info("Meal with %s %s not found", label, key)
+            errors[key] = f"Meal with {label} {key} not found"
+    if errors:
+        raise MealLookupError(errors)
+
+    return [found[key] for key in keys]
+
+def get_meals_by_ids(meal_ids: Iterable[int]) -> list[Meal]:
+    """
+    Retrieves several meals by ID with one query per chunk of IDs
+
+    Cached meals are served from the meal cache and only the rest are queried.
+
+    Args:
+        meal_ids (Iterable[int]): The IDs of the meals to retrieve. Duplicates are allowed.
+
+    Returns:
+        list[Meal]: The meals, in the order of `meal_ids`
+
+    Raises:
+        MealLookupError: If any meal does not exist or has been marked as deleted. Its `errors`
+                         map each failing ID to the message `get_meal_by_id` would raise.
+        sqlite3.Error: For any other database errors
+    """
+    try:
+        return _get_meals_by("id", "id", "ID", list(meal_ids))
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def get_meals_by_names(meal_names: Iterable[str]) -> list[Meal]:
+    """
+    Retrieves several meals by name with one query per chunk of names
+
+    Cached meals are served from the meal cache and only the rest are queried.
+
+    Args:
+        meal_names (Iterable[str]): The names of the meals to retrieve. Duplicates are allowed.
+
+    Returns:
+        list[Meal]: The meals, in the order of `meal_names`
+
+    Raises:
+        MealLookupError: If any meal does not exist or has been marked as deleted. Its `errors`
+                         map each failing name to the message `get_meal_by_name` would raise.
+        sqlite3.Error: For any other database errors
+    """
+    try:
+        return _get_meals_by("meal", "name", "name", list(meal_names))
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
 def update_meal_stats(meal_id: int, result: str) -> None:
     """
     Updates the battle stats for a meal based on the result of a battle
@@ -268,14 +1179,161 @@ def update_meal_stats(meal_id: int, result: str) -> None:
                 logger.info("Meal with ID %s not found", meal_id)
                 raise ValueError(f"Meal with ID {meal_id} not found")
 
+            if result not in ('win', 'loss'):
+                raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
+
+            wins = int(result == 'win')
+            buffer = _stats_buffer
+            if buffer is not None:
+                with _leaderboard.lock:
+                    buffer.add(meal_id, 1, wins)
+                    _apply_to_leaderboard(meal_id, 1, wins)
+                return
+
             if result == 'win':
                 cursor.execute("UPDATE meals SET battles = battles + 1, wins = wins + 1 WHERE id = ?", (meal_id,))
-            elif result == 'loss':
-                cursor.execute("UPDATE meals SET battles = battles + 1 WHERE id = ?", (meal_id,))
             else:
-                raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
+                cursor.execute("UPDATE meals SET battles = battles + 1 WHERE id = ?", (meal_id,))
 
-            conn.commit()
+            with _leaderboard.lock:
+                conn.commit()
+                _apply_to_leaderboard(meal_id, 1, wins)
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def record_battle_result(winner_id: int, loser_id: int) -> None:
+    """
+    Records the outcome of a battle for both meals in a single transaction
+
+    Both meals are validated with one query and updated with one statement, so either
+    both rows reflect the battle or neither does.
+
+    Args:
+        winner_id (int): The ID of the winning meal
+        loser_id (int): The ID of the losing meal
+
+    Raises:
+        ValueError: If the winner and loser are the same meal
+        ValueError: If either meal does not exist or has already been marked as deleted
+        sqlite3.Error: For any other database errors
+    """
+    if winner_id == loser_id:
+        raise ValueError(f"Meal with ID {winner_id} cannot battle itself")
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, deleted FROM meals WHERE id IN (?, ?)", (winner_id, loser_id))
+            deleted_by_id = dict(cursor.fetchall())
+
+            for meal_id in (winner_id, loser_id):
+                if meal_id not in deleted_by_id:
+                    logger.info("Meal with ID %s not found", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} not found")
+                if deleted_by_id[meal_id]:
+                    logger.info("Meal with ID %s has been deleted", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} has been deleted")
+
+            buffer = _stats_buffer
+            if buffer is not None:
+                with _leaderboard.lock:
+                    buffer.add(winner_id, 1, 1)
+                    buffer.add(loser_id, 1, 0)
+                    _apply_to_leaderboard(winner_id, 1, 1)
+                    _apply_to_leaderboard(loser_id, 1, 0)
+                logger.info("Battle result buffered: meal %s beat meal %s", winner_id, loser_id)
+                return
+
+            cursor.execute("""
+                UPDATE meals SET battles = battles + 1, wins = wins + (id = ?)
+                WHERE id IN (?, ?)
+            """, (winner_id, winner_id, loser_id))
+            with _leaderboard.lock:
+                conn.commit()
+                _apply_to_leaderboard(winner_id, 1, 1)
+                _apply_to_leaderboard(loser_id, 1, 0)
+
+            logger.info("Battle result recorded: meal %s beat meal %s", winner_id, loser_id)
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def record_battle_results(results: Iterable[tuple[int, int]]) -> int:
+    """
+    Records the outcomes of many battles in a single transaction
+
+    Results are aggregated into one (battles, wins) delta per meal, every meal is
+    validated with chunked queries, and the deltas are applied with one batched UPDATE.
+    Either every result is recorded or none is.
+
+    Args:
+        results (Iterable[tuple[int, int]]): (winner ID, loser ID) pairs
+
+    Returns:
+        int: The number of results recorded
+
+    Raises:
+        ValueError: If a meal is paired with itself
+        MealLookupError: If any meal does not exist or has already been marked as deleted
+        sqlite3.Error: For any other database errors
+    """
+    deltas: dict[int, list[int]] = {}
+    count = 0
+    for winner_id, loser_id in results:
+        if winner_id == loser_id:
+            raise ValueError(f"Meal with ID {winner_id} cannot battle itself")
+        winner = deltas.setdefault(winner_id, [0, 0])
+        winner[0] += 1
+        winner[1] += 1
+        deltas.setdefault(loser_id, [0, 0])[0] += 1
+        count += 1
+
+    if not deltas:
+        return 0
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            deleted_by_id = {}
+            for chunk in _chunks(list(deltas)):
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"SELECT id, deleted FROM meals WHERE id IN ({placeholders})", chunk)
+                deleted_by_id.update(cursor.fetchall())
+
+            errors = {}
+            for meal_id in deltas:
+                if meal_id not in deleted_by_id:
+                    logger.info("Meal with ID %s not found", meal_id)
+                    errors[meal_id] = f"Meal with ID {meal_id} not found"
+                elif deleted_by_id[meal_id]:
+                    logger.info("Meal with ID %s has been deleted", meal_id)
+                    errors[meal_id] = f"Meal with ID {meal_id} has been deleted"
+            if errors:
+                raise MealLookupError(errors)
+
+            buffer = _stats_buffer
+            if buffer is not None:
+                with _leaderboard.lock:
+                    for meal_id, (battles, wins) in deltas.items():
+                        buffer.add(meal_id, battles, wins)
+                        _apply_to_leaderboard(meal_id, battles, wins)
+                logger.info("Buffered %d battle results for %d meals", count, len(deltas))
+                return count
+
+            cursor.executemany(
+                "UPDATE meals SET battles = battles + ?, wins = wins + ? WHERE id = ?",
+                [(battles, wins, meal_id) for meal_id, (battles, wins) in deltas.items()]
+            )
+            with _leaderboard.lock:
+                conn.commit()
+                for meal_id, (battles, wins) in deltas.items():
+                    _apply_to_leaderboard(meal_id, battles, wins)
+
+            logger.info("Recorded %d battle results for %d meals", count, len(deltas))
+            return count
 
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
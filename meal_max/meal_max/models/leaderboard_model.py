@@ -0,0 +1,183 @@
+from bisect import bisect_left, bisect_right, insort
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class Leaderboard:
+    """
+    An in-memory leaderboard of meals kept sorted by wins and by win percentage
+
+    Each ordering is a sorted list of (negated key, meal id) tuples, so reading the
+    top k entries is a slice and a stat change is a bisect plus a list insert.
+    Only meals with at least one battle are ranked.
+
+    Attributes:
+        lock (threading.RLock): Guards the leaderboard. Callers that must apply a change
+                                atomically with a database write hold it across both.
+        loaded_at (Optional[float]): When the leaderboard was last loaded (monotonic clock),
+                                     or None if it has not been loaded
+    """
+
+    SORT_KEYS = ("wins", "win_pct")
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.loaded_at: Optional[float] = None
+        self._entries: dict[int, dict[str, Any]] = {}
+        self._order: dict[str, list[tuple]] = {sort_by: [] for sort_by in self.SORT_KEYS}
+
+    @staticmethod
+    def _sort_key(entry: dict[str, Any], sort_by: str) -> tuple:
+        if sort_by == "win_pct":
+            return (-(entry["wins"] * 1.0 / entry["battles"]), entry["id"])
+        return (-entry["wins"], entry["id"])
+
+    def _unlink(self, entry: dict[str, Any]) -> None:
+        for sort_by, order in self._order.items():
+            key = self._sort_key(entry, sort_by)
+            del order[bisect_left(order, key)]
+
+    def _link(self, entry: dict[str, Any]) -> None:
+        for sort_by, order in self._order.items():
+            insort(order, self._sort_key(entry, sort_by))
+
+    def load(self, rows: list[tuple]) -> None:
+        """
+        Replaces the leaderboard contents
+
+        Args:
+            rows (list[tuple]): (id, meal, cuisine, price, difficulty, battles, wins) rows.
+                                Extra trailing columns are ignored.
+        """
+        with self.lock:
+            self._entries = {}
+            for row in rows:
+                if row[5] > 0:
+                    self._entries[row[0]] = {
+                        "id": row[0], "meal": row[1], "cuisine": row[2], "price": row[3],
+                        "difficulty": row[4], "battles": row[5], "wins": row[6],
+                    }
+            for sort_by in self.SORT_KEYS:
+                self._order[sort_by] = sorted(self._sort_key(entry, sort_by) for entry in self._entries.values())
+            self.loaded_at = time.monotonic()
+        logger.info("Leaderboard loaded with %d meals", len(self._entries))
+
+    def upsert(self, row: tuple) -> None:
+        """
+        Adds a meal or replaces its stats
+
+        Args:
+            row (tuple): An (id, meal, cuisine, price, difficulty, battles, wins) row
+        """
+        with self.lock:
+            self.remove(row[0])
+            if row[5] > 0:
+                entry = {
+                    "id": row[0], "meal": row[1], "cuisine": row[2], "price": row[3],
+                    "difficulty": row[4], "battles": row[5], "wins": row[6],
+                }
+                self._entries[row[0]] = entry
+                self._link(entry)
+
+    def apply(self, meal_id: int, battles: int, wins: int) -> bool:
+        """
+        Adds battle and win deltas to a ranked meal
+
+        Args:
+            meal_id (int): The ID of the meal
+            battles (int): The number of battles to add
+            wins (int): The number of wins to add
+
+        Returns:
+            bool: False if the meal is not on the leaderboard and has to be loaded
+        """
+        with self.lock:
+            entry = self._entries.get(meal_id)
+            if entry is None:
+                return False
+            self._unlink(entry)
+            entry["battles"] += battles
+            entry["wins"] += wins
+            self._link(entry)
+            return True
+
+    def remove(self, meal_id: int) -> None:
+        """
+        Removes a meal from the leaderboard if it is ranked
+
+        Args:
+            meal_id (int): The ID of the meal
+        """
+        with self.lock:
+            entry = self._entries.pop(meal_id, None)
+            if entry is not None:
+                self._unlink(entry)
+
+    def invalidate(self) -> None:
+        """
+        Drops all entries and marks the leaderboard as not loaded
+        """
+        with self.lock:
+            self._entries = {}
+            self._order = {sort_by: [] for sort_by in self.SORT_KEYS}
+            self.loaded_at = None
+
+    def top(self, sort_by: str, limit: Optional[int] = None) -> list[dict[str, Any]]:
+        """
+        Returns copies of the top entries in leaderboard order
+
+        Args:
+            sort_by (str): 'wins' or 'win_pct'
+            limit (int, optional): The maximum number of entries to return. Defaults to all.
+
+        Returns:
+            list[dict[str, Any]]: The ranked entries
+        """
+        with self.lock:
+            order = self._order[sort_by] if limit is None else self._order[sort_by][:limit]
+            return [dict(self._entries[meal_id]) for _, meal_id in order]
+
+    def page(self, sort_by: str, limit: int, after: Optional[tuple] = None,
+             predicate: Optional[Callable[[dict[str, Any]], bool]] = None) -> tuple[list[dict[str, Any]], Optional[tuple]]:
+        """
+        Returns copies of the entries that follow a position in leaderboard order
+
+        Args:
+            sort_by (str): 'wins' or 'win_pct'
+            limit (int): The maximum number of entries to return
+            after (tuple, optional): The sort key of the last entry of the previous page
+            predicate (Callable, optional): Only entries for which this returns True are included
+
+        Returns:
+            tuple: The entries, and the sort key to resume after (None once the end is reached)
+        """
+        with self.lock:
+            order = self._order[sort_by]
+            position = 0 if after is None else bisect_right(order, tuple(after))
+            entries = []
+            last_key = None
+            while position < len(order) and len(entries) < limit:
+                key = order[position]
+                entry = self._entries[key[1]]
+                if predicate is None or predicate(entry):
+                    entries.append(dict(entry))
+                    last_key = key
+                position += 1
+
+            # with a predicate the next page may still turn out to be empty
+            has_more = len(entries) == limit and position < len(order)
+            return entries, (last_key if has_more else None)
+
+    def __contains__(self, meal_id: int) -> bool:
+        return meal_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
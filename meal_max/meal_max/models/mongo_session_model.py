@@ -1,7 +1,14 @@
+import atexit
 import logging
-from typing import Any, List
+import os
+import threading
+from typing import Any, List, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import PyMongoError
 
 from meal_max.clients.mongo_client import sessions_collection
+from meal_max.models.kitchen_model import MEAL_FIELDS, Meal, MealLookupError, get_meals_by_ids
 from meal_max.utils.logger import configure_logger
 
 
@@ -9,16 +16,286 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# write-behind settings for sessions (opt-in, single-worker deployments only, see SessionWriteBuffer)
+SESSION_WRITE_BEHIND = os.getenv("SESSION_WRITE_BEHIND", "false").lower() == "true"
+SESSION_FLUSH_SIZE = int(os.getenv("SESSION_FLUSH_SIZE", 500))  # buffered logouts before a flush
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", 1.0))  # seconds between flushes
+SESSION_SNAPSHOT_MEALS = os.getenv("SESSION_SNAPSHOT_MEALS", "false").lower() == "true"
+
+# version of the stored combatants document, see encode_combatants
+SESSION_FORMAT_VERSION = 1
+
+# the stored combatants each logged-in user had when their session was loaded, to skip unchanged writes
+_loaded_combatants: dict[int, dict[str, Any]] = {}
+_loaded_lock = threading.Lock()
+
+
+class SessionWriteBuffer:
+    """
+    Coalesces session writes from logouts and saves them to MongoDB in bulk
+
+    Only the latest combatants of each user are kept, and they are written with one
+    unordered bulk_write when `flush_size` users are pending, every `flush_interval`
+    seconds, on demand, and at interpreter shutdown. A failed flush keeps its writes for
+    the next one, unless the user has logged out again since.
+
+    The buffer lives in one process. A login served by another worker reads the session
+    from MongoDB and misses writes still buffered here, and a crash loses them, so only
+    enable it when a single worker serves all logins.
+
+    Attributes:
+        flush_size (int): The number of pending users that triggers a flush
+        flush_interval (float): The maximum time between flushes, in seconds
+    """
+
+    def __init__(self, flush_size: int = SESSION_FLUSH_SIZE, flush_interval: float = SESSION_FLUSH_INTERVAL):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: dict[int, dict[str, Any]] = {}
+        self._flushing: dict[int, dict[str, Any]] = {}
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="session-flusher", daemon=True)
+        self._thread.start()
+
+    def add(self, user_id: int, combatants: dict[str, Any]) -> None:
+        """
+        Buffers the combatants to save for a user, replacing any earlier pending write
+
+        Args:
+            user_id (int): The ID of the user
+            combatants (dict[str, Any]): The encoded combatants to store in the user's session
+        """
+        with self._lock:
+            self._pending[user_id] = combatants
+            full = len(self._pending) >= self.flush_size
+        if full:
+            self._wakeup.set()
+
+    def get(self, user_id: int) -> Optional[dict[str, Any]]:
+        """
+        Returns the combatants waiting to be saved for a user, including a flush in progress
+
+        Args:
+            user_id (int): The ID of the user
+
+        Returns:
+            dict[str, Any]: The encoded combatants, or None if nothing is pending for the user
+        """
+        with self._lock:
+            combatants = self._pending.get(user_id)
+            return combatants if combatants is not None else self._flushing.get(user_id)
+
+    def flush(self) -> int:
+        """
+        Writes all pending sessions to MongoDB with one bulk_write
+
+        Returns:
+            int: The number of sessions written
+
+        Raises:
+            PyMongoError: If the write fails. The sessions stay pending for the next flush.
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._flushing, self._pending = self._pending, {}
+                operations = [UpdateOne({"user_id": user_id}, {"$set": {"combatants": combatants}}, upsert=True)
+                              for user_id, combatants in self._flushing.items()]
+            if not operations:
+                return 0
+
+            try:
+                sessions_collection.bulk_write(operations, ordered=False)
+            except PyMongoError as e:
+                logger.error("MongoDB error while saving %d sessions: %s", len(operations), str(e))
+                with self._lock:
+                    for user_id, combatants in self._flushing.items():
+                        self._pending.setdefault(user_id, combatants)
+                    self._flushing = {}
+                raise
+
+            with self._lock:
+                self._flushing = {}
+
+        logger.info("Saved %d sessions to MongoDB", len(operations))
+        return len(operations)
+
+    def close(self) -> None:
+        """
+        Stops the background flusher and writes any remaining sessions
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.flush()
+            except PyMongoError:
+                pass  # already logged, sessions are retried on the next pass
+
+
+_write_buffer: Optional[SessionWriteBuffer] = None
+_write_buffer_lock = threading.Lock()
+
+
+def enable_session_write_behind(flush_size: int = SESSION_FLUSH_SIZE,
+                                flush_interval: float = SESSION_FLUSH_INTERVAL) -> None:
+    """
+    Switches logouts to write-behind mode
+
+    In this mode `logout_user` buffers the user's combatants, and sessions are saved in
+    periodic bulk writes instead of one update per logout.
+
+    Args:
+        flush_size (int, optional): The number of pending users that triggers a flush
+        flush_interval (float, optional): The maximum time between flushes, in seconds
+    """
+    global _write_buffer
+    with _write_buffer_lock:
+        if _write_buffer is not None:
+            return
+        _write_buffer = SessionWriteBuffer(flush_size=flush_size, flush_interval=flush_interval)
+    logger.info("Write-behind enabled for sessions (flush_size=%d, flush_interval=%.2fs)", flush_size, flush_interval)
+
+def disable_session_write_behind() -> None:
+    """
+    Saves any buffered sessions and switches back to writing each logout immediately
+    """
+    global _write_buffer
+    with _write_buffer_lock:
+        buffer, _write_buffer = _write_buffer, None
+    if buffer is not None:
+        buffer.close()
+        logger.info("Write-behind disabled for sessions")
+
+def flush_sessions() -> int:
+    """
+    Writes any buffered sessions to MongoDB now
+
+    Returns:
+        int: The number of sessions written (0 when write-behind is disabled)
+
+    Raises:
+        PyMongoError: If the write fails
+    """
+    buffer = _write_buffer
+    return buffer.flush() if buffer is not None else 0
+
+def ensure_session_indexes() -> None:
+    """
+    Creates the unique index on sessions.user_id if it does not exist yet
+
+    It makes the login upsert and the session lookups index scans, and guarantees one
+    session document per user.
+
+    Raises:
+        PyMongoError: If the index cannot be created, e.g. because of duplicate sessions
+    """
+    sessions_collection.create_index("user_id", unique=True, name="uq_sessions_user_id")
+    logger.info("Session indexes are in place")
+
+def session_exists(user_id: int) -> bool:
+    """
+    Returns whether a session document exists for the user, i.e. whether they ever logged in
+
+    Args:
+        user_id (int): The ID of the user
+
+    Returns:
+        bool: True if the sessions collection holds a document for the user
+    """
+    return sessions_collection.count_documents({"user_id": user_id}, limit=1) > 0
+
+def encode_combatants(combatants: List[Meal], snapshot: bool = SESSION_SNAPSHOT_MEALS) -> dict[str, Any]:
+    """
+    Encodes combatants into the compact document stored in a session
+
+    The document is {"v": 1, "ids": [meal IDs]}. With `snapshot`, it also holds the other
+    meal fields as one [meal, cuisine, price, difficulty] array per combatant under "meals",
+    so logins restore the combatants as they were at logout.
+
+    Args:
+        combatants (List[Meal]): The combatants
+        snapshot (bool, optional): Whether to store the meal fields as well as the IDs
+
+    Returns:
+        dict[str, Any]: The session document's combatants
+    """
+    encoded = {"v": SESSION_FORMAT_VERSION, "ids": [combatant.id for combatant in combatants]}
+    if snapshot:
+        encoded["meals"] = [[getattr(combatant, field) for field in MEAL_FIELDS[1:]] for combatant in combatants]
+    return encoded
+
+def decode_combatants(encoded: Any) -> List[Meal]:
+    """
+    Rebuilds the combatants stored in a session
+
+    The meals are loaded with one batched lookup, and meals deleted since the session was
+    saved are dropped. Snapshots are turned back into Meal objects from their stored fields,
+    using the lookup only to drop deleted meals.
+    Sessions saved before the format was versioned, as a list of documents with an 'id'
+    or 'meal_id', are read as IDs.
+
+    Args:
+        encoded (Any): The combatants of a session document
+
+    Returns:
+        List[Meal]: The combatants, in their stored order
+
+    Raises:
+        ValueError: If the document has an unknown format version
+    """
+    if not encoded:
+        return []
+    if isinstance(encoded, list):
+        meal_ids = [combatant.get("id", combatant.get("meal_id")) for combatant in encoded]
+        encoded = {"v": SESSION_FORMAT_VERSION, "ids": [meal_id for meal_id in meal_ids if meal_id is not None]}
+    if encoded.get("v") != SESSION_FORMAT_VERSION:
+        raise ValueError(f"Unsupported session format version: {encoded.get('v')}")
+
+    meal_ids = encoded["ids"]
+    if not meal_ids:
+        return []
+    meals = _available_meals(meal_ids)
+    if "meals" not in encoded:
+        return meals
+    available = {meal.id for meal in meals}
+    return [Meal.from_row((meal_id, *fields)) for meal_id, fields in zip(meal_ids, encoded["meals"])
+            if meal_id in available]
+
+def _available_meals(meal_ids: List[int]) -> List[Meal]:
+    # the meals that still exist, in order; deleted ones are logged and left out
+    try:
+        return get_meals_by_ids(meal_ids)
+    except MealLookupError as e:
+        logger.warning("Dropping unavailable combatants from session: %s", str(e))
+        available = [meal_id for meal_id in meal_ids if meal_id not in e.errors]
+        return get_meals_by_ids(available) if available else []
+
+atexit.register(disable_session_write_behind)
+
+
 def login_user(user_id: int, battle_model) -> None:
     """
     Load the user's combatants from MongoDB into the BattleModel's combatants list.
 
-    Checks if a session document exists for the given `user_id` in MongoDB.
-    If it exists, clears any current combatants in `battle_model` and loads
-    the stored combatants from MongoDB into `battle_model`.
+    Fetches the user's session document, creating it with an empty combatants list if it
+    does not exist, in a single upsert that only returns the combatants. Combatants from a
+    logout that is still buffered take precedence over the stored ones. The combatants are
+    rebuilt with `decode_combatants` and loaded into `battle_model` in one step.
 
-    If no session is found, it creates a new session document for the user
-    with an empty combatants list in MongoDB.
+    The loaded combatants are remembered so that `logout_user` can skip the write when
+    they have not changed.
 
     Args:
         user_id (int): The ID of the user whose session is to be loaded.
@@ -26,30 +303,44 @@ def login_user(user_id: int, battle_model) -> None:
                                     will be loaded.
     """
     logger.info("Attempting to log in user with ID %d.", user_id)
-    session = sessions_collection.find_one({"user_id": user_id})
+    buffer = _write_buffer
+    encoded = buffer.get(user_id) if buffer is not None else None
+
+    if encoded is None:
+        session = sessions_collection.find_one_and_update(
+            {"user_id": user_id},
+            {"$setOnInsert": {"combatants": encode_combatants([])}},
+            projection={"_id": False, "combatants": True},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        encoded = session.get("combatants")
+    else:
+        logger.info("Using buffered session of user ID %d.", user_id)
 
-    if session:
+    combatants = decode_combatants(encoded)
+    if combatants:
         logger.info("Session found for user ID %d. Loading combatants into BattleModel.", user_id)
-        battle_model.clear_combatants()
-        for combatant in session.get("combatants", []):
-            logger.debug("Preparing combatant: %s", combatant)
-            battle_model.prep_combatant(combatant)
+        battle_model.load_combatants(combatants)
         logger.info("Combatants successfully loaded for user ID %d.", user_id)
     else:
-        logger.info("No session found for user ID %d. Creating a new session with empty combatants list.", user_id)
-        sessions_collection.insert_one({"user_id": user_id, "combatants": []})
-        logger.info("New session created for user ID %d.", user_id)
+        logger.info("Session for user ID %d has no combatants.", user_id)
+
+    with _loaded_lock:
+        _loaded_combatants[user_id] = encode_combatants(combatants)
 
 def logout_user(user_id: int, battle_model) -> None:
     """
     Store the current combatants from the BattleModel back into MongoDB.
 
-    Retrieves the current combatants from `battle_model` and attempts to store them in
-    the MongoDB session document associated with the given `user_id`. If no session
-    document exists for the user, raises a `ValueError`.
+    If the combatants are the ones loaded at login, nothing is written. Otherwise they are
+    buffered for the next bulk write in write-behind mode, or written immediately.
+
+    Users that did not log in through this process are written immediately, which
+    requires their session document to exist.
 
-    After saving the combatants to MongoDB, the combatants list in `battle_model` is
-    cleared to ensure a fresh state for the next login.
+    After saving, the combatants list in `battle_model` is cleared to ensure a fresh state
+    for the next login.
 
     Args:
         user_id (int): The ID of the user whose session data is to be saved.
@@ -60,19 +351,30 @@ def logout_user(user_id: int, battle_model) -> None:
         ValueError: If no session document is found for the user in MongoDB.
     """
     logger.info("Attempting to log out user with ID %d.", user_id)
-    combatants_data = battle_model.get_combatants()
+    combatants_data = encode_combatants(battle_model.get_combatants())
     logger.debug("Current combatants for user ID %d: %s", user_id, combatants_data)
 
-    result = sessions_collection.update_one(
-        {"user_id": user_id},
-        {"$set": {"combatants": combatants_data}},
-        upsert=False  # Prevents creating a new document if not found
-    )
+    with _loaded_lock:
+        loaded = _loaded_combatants.pop(user_id, None)
+    buffer = _write_buffer
+
+    if loaded is not None and loaded == combatants_data:
+        logger.info("Combatants unchanged for user ID %d. Skipping the session write.", user_id)
+    elif loaded is not None and buffer is not None:
+        buffer.add(user_id, combatants_data)
+        logger.info("Combatants buffered for user ID %d.", user_id)
+    else:
+        result = sessions_collection.update_one(
+            {"user_id": user_id},
+            {"$set": {"combatants": combatants_data}},
+            upsert=False  # Prevents creating a new document if not found
+        )
 
-    if result.matched_count == 0:
-        logger.error("No session found for user ID %d. Logout failed.", user_id)
-        raise ValueError(f"User with ID {user_id} not found for logout.")
+        if result.matched_count == 0:
+            logger.error("No session found for user ID %d. Logout failed.", user_id)
+            raise ValueError(f"User with ID {user_id} not found for logout.")
+        logger.info("Combatants successfully saved for user ID %d.", user_id)
 
-    logger.info("Combatants successfully saved for user ID %d. Clearing BattleModel combatants.", user_id)
+    logger.info("Clearing BattleModel combatants for user ID %d.", user_id)
     battle_model.clear_combatants()
-    logger.info("BattleModel combatants cleared for user ID %d.", user_id)
\ No newline at end of file
+    logger.info("BattleModel combatants cleared for user ID %d.", user_id)
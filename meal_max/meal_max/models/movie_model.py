@@ -0,0 +1,226 @@
+import asyncio
+from datetime import datetime, timedelta
+import logging
+import os
+from typing import Any, List
+
+import httpx
+import requests
+
+from meal_max.clients.tmdb_client import get_movie_details, get_movie_details_async
+from meal_max.db import db
+from meal_max.utils.http_client import get_async_http_client
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import SQL_IN_CHUNK_SIZE
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+MOVIE_METADATA_TTL = float(os.getenv("MOVIE_METADATA_TTL", 7 * 24 * 3600))  # seconds before a movie is re-fetched
+MOVIE_FETCH_CONCURRENCY = int(os.getenv("MOVIE_FETCH_CONCURRENCY", 20))  # TMDB calls in flight per bulk lookup
+
+# TMDB fields copied into the table
+MOVIE_FIELDS = ("title", "overview", "release_date", "popularity", "vote_average")
+
+
+class Movie(db.Model):
+    """
+    TMDB metadata of the movies users have seen in search results, recommendations or watchlists
+
+    Rows are keyed by TMDB ID and stamped with when TMDB last returned them, so watchlist
+    writes can validate a movie locally and only go to TMDB when the row is missing or stale.
+    """
+    __tablename__ = 'movies'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # TMDB ID
+    title = db.Column(db.String(200), nullable=False)
+    overview = db.Column(db.Text, nullable=True)
+    release_date = db.Column(db.String(10), nullable=True)
+    popularity = db.Column(db.Float, nullable=True)
+    vote_average = db.Column(db.Float, nullable=True)
+    fetched_on = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def is_fresh(self, max_age: float = MOVIE_METADATA_TTL) -> bool:
+        """
+        Checks whether the metadata was fetched from TMDB recently enough to trust
+
+        Args:
+            max_age (float, optional): The maximum age in seconds
+
+        Returns:
+            bool: True if the row is younger than `max_age`
+        """
+        return datetime.utcnow() - self.fetched_on < timedelta(seconds=max_age)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"id": self.id, **{field: getattr(self, field) for field in MOVIE_FIELDS}}
+
+    @classmethod
+    def get_many(cls, movie_ids: List[int]) -> dict[int, "Movie"]:
+        """
+        Loads the stored metadata of several movies with one query per SQL_IN_CHUNK_SIZE IDs
+
+        Args:
+            movie_ids (List[int]): TMDB IDs
+
+        Returns:
+            dict[int, Movie]: The stored movies by ID; unknown IDs are left out
+        """
+        movie_ids = list(movie_ids)
+        movies = {}
+        for start in range(0, len(movie_ids), SQL_IN_CHUNK_SIZE):
+            chunk = movie_ids[start:start + SQL_IN_CHUNK_SIZE]
+            movies.update((movie.id, movie) for movie in cls.query.filter(cls.id.in_(chunk)))
+        return movies
+
+    @classmethod
+    def upsert_many(cls, movies: List[dict[str, Any]], commit: bool = True) -> List["Movie"]:
+        """
+        Stores TMDB movie records, inserting new movies and refreshing known ones in one transaction
+
+        Known movies are looked up with a single query. A row is only written when its
+        metadata changed or it has gone stale, so replaying a cached TMDB response is free.
+
+        Args:
+            movies (List[dict[str, Any]]): TMDB movie records, e.g. the 'results' of a search
+            commit (bool, optional): False leaves the changes in the session for the caller to commit
+
+        Returns:
+            List[Movie]: The stored movies, in input order; records without an ID or title are skipped
+
+        Raises:
+            SQLAlchemyError: For any database errors
+        """
+        records = {movie["id"]: movie for movie in movies if movie.get("id") is not None and movie.get("title")}
+        if not records:
+            return []
+
+        now = datetime.utcnow()
+        known = cls.get_many(records)
+        written = 0
+        for movie_id, record in records.items():
+            values = {field: record.get(field) for field in MOVIE_FIELDS}
+            movie = known.get(movie_id)
+            if movie is None:
+                movie = known[movie_id] = cls(id=movie_id, fetched_on=now, **values)
+                db.session.add(movie)
+            elif movie.is_fresh() and all(getattr(movie, field) == value for field, value in values.items()):
+                continue
+            else:
+                for field, value in values.items():
+                    setattr(movie, field, value)
+                movie.fetched_on = now
+            written += 1
+
+        if written and commit:
+            try:
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error("Database error while storing movies: %s", str(e))
+                raise
+            logger.info("Stored metadata of %d movies", written)
+        return [known[movie_id] for movie_id in records]
+
+    @classmethod
+    def get_or_fetch(cls, movie_id: int) -> "Movie":
+        """
+        Returns a movie's metadata, validating the ID against TMDB only if it is not known locally
+
+        A missing or stale row is (re)fetched from TMDB. If TMDB cannot be reached or answers
+        with an error other than 404 (e.g. 429 or 503 after retries), a stale row is still returned.
+
+        Args:
+            movie_id (int): The TMDB ID of the movie
+
+        Returns:
+            Movie: The movie
+
+        Raises:
+            ValueError: If TMDB does not know the movie (404)
+            requests.exceptions.RequestException: If TMDB fails otherwise and the movie is not known locally
+        """
+        movie = db.session.get(cls, movie_id)
+        if movie is not None and movie.is_fresh():
+            return movie
+
+        try:
+            details = get_movie_details(movie_id)
+        except requests.exceptions.RequestException as e:
+            if e.response is not None and e.response.status_code == 404:
+                logger.info("TMDB does not know movie %s", movie_id)
+                raise ValueError(f"Movie with ID {movie_id} not found")
+            if movie is None:
+                raise
+            logger.warning("Using stale metadata of movie %s: %s", movie_id, e)
+            return movie
+
+        stored = cls.upsert_many([details])
+        if not stored:
+            raise ValueError(f"Movie with ID {movie_id} not found")
+        return stored[0]
+
+    @classmethod
+    def get_or_fetch_many(cls, movie_ids: List[int]) -> tuple[dict[int, "Movie"], dict[int, str]]:
+        """
+        Returns the metadata of several movies, fetching missing and stale ones from TMDB concurrently
+
+        Known movies are loaded with one query. The others are fetched with up to
+        MOVIE_FETCH_CONCURRENCY calls in flight on the async HTTP client, and stored in the
+        session without committing, so the caller can commit them with its own changes. Only a
+        404 marks a movie as not found; on other TMDB errors a stale row is used if there is one.
+
+        Args:
+            movie_ids (List[int]): TMDB IDs
+
+        Returns:
+            tuple[dict[int, Movie], dict[int, str]]: The movies by ID, and an error message for each
+                                                     ID that could not be validated
+
+        Raises:
+            SQLAlchemyError: For any database errors
+        """
+        known = cls.get_many(movie_ids)
+        to_fetch = [movie_id for movie_id in dict.fromkeys(movie_ids)
+                    if movie_id not in known or not known[movie_id].is_fresh()]
+        if not to_fetch:
+            return known, {}
+
+        logger.info("Fetching metadata of %d movies from TMDB", len(to_fetch))
+        client = get_async_http_client()
+        responses = client.submit(_fetch_details(to_fetch)).result()
+
+        movies = {movie_id: movie for movie_id, movie in known.items() if movie_id not in to_fetch}
+        errors = {}
+        details = []
+        for movie_id, response in zip(to_fetch, responses):
+            if isinstance(response, httpx.HTTPStatusError) and response.response.status_code == 404:
+                errors[movie_id] = f"Movie with ID {movie_id} not found"
+            elif isinstance(response, Exception):
+                if movie_id in known:
+                    logger.warning("Using stale metadata of movie %s: %s", movie_id, response)
+                    movies[movie_id] = known[movie_id]
+                else:
+                    errors[movie_id] = f"Could not validate movie with ID {movie_id}: TMDB is unavailable"
+            else:
+                details.append(response)
+
+        for movie in cls.upsert_many(details, commit=False):
+            movies[movie.id] = movie
+        for movie_id in to_fetch:
+            if movie_id not in movies and movie_id not in errors:
+                errors[movie_id] = f"Movie with ID {movie_id} not found"
+        return movies, errors
+
+
+async def _fetch_details(movie_ids: List[int]) -> List[Any]:
+    # runs on the async HTTP client's loop; each result is the movie's details or the error raised
+    semaphore = asyncio.Semaphore(MOVIE_FETCH_CONCURRENCY)
+
+    async def fetch(movie_id: int) -> dict[str, Any]:
+        async with semaphore:
+            return await get_movie_details_async(movie_id)
+
+    return await asyncio.gather(*(fetch(movie_id) for movie_id in movie_ids), return_exceptions=True)
@@ -0,0 +1,211 @@
+import logging
+import math
+import os
+from typing import Any, Iterator, List, Optional
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import get_meals_by_ids, record_battle_results
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.random_providers import get_random_batch
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+TOURNAMENT_FORMATS = ("single_elimination", "round_robin", "swiss")
+
+# Upper bound on the matches of one tournament; every match is kept in the returned results
+TOURNAMENT_MAX_MATCHES = int(os.getenv("TOURNAMENT_MAX_MATCHES", 100000))
+
+
+def _resolve_match(meal_1: int, meal_2: int, scores: dict[int, float], random_number: float) -> dict[str, Any]:
+    # same rule as BattleModel.battle: the first meal wins when the score delta beats the random number
+    delta = abs(scores[meal_1] - scores[meal_2]) / 100
+    if delta > random_number:
+        winner, loser = meal_1, meal_2
+    else:
+        winner, loser = meal_2, meal_1
+    return {"meal_1": meal_1, "meal_2": meal_2, "winner": winner, "loser": loser,
+            "delta": delta, "random_number": random_number}
+
+def _count_matches(tournament_format: str, entrants: int, rounds: int) -> int:
+    if tournament_format == "single_elimination":
+        return entrants - 1
+    if tournament_format == "round_robin":
+        return entrants * (entrants - 1) // 2
+    return rounds * (entrants // 2)
+
+def _single_elimination(meal_ids: List[int], scores: dict[int, float],
+                        random_numbers: Iterator[float]) -> Iterator[tuple[list, list]]:
+    # the bracket is padded to a power of two with first-round byes for the top seeds
+    bracket_size = 1 << (len(meal_ids) - 1).bit_length()
+    byes = bracket_size - len(meal_ids)
+    entrants = meal_ids[byes:]
+    advancing = meal_ids[:byes]
+    while len(entrants) > 1:
+        matches = [_resolve_match(entrants[i], entrants[i + 1], scores, next(random_numbers))
+                   for i in range(0, len(entrants), 2)]
+        yield matches, advancing
+        entrants = advancing + [match["winner"] for match in matches]
+        advancing = []
+
+def _round_robin(meal_ids: List[int], scores: dict[int, float],
+                 random_numbers: Iterator[float]) -> Iterator[tuple[list, list]]:
+    # circle method: one seat stays fixed and the others rotate, so every pair meets exactly once
+    seats: List[Optional[int]] = list(meal_ids)
+    if len(seats) % 2:
+        seats.append(None)
+    for _ in range(len(seats) - 1):
+        pairs = [(seats[i], seats[-1 - i]) for i in range(len(seats) // 2)]
+        matches = [_resolve_match(a, b, scores, next(random_numbers))
+                   for a, b in pairs if a is not None and b is not None]
+        byes = [a if b is None else b for a, b in pairs if a is None or b is None]
+        yield matches, byes
+        seats = [seats[0], seats[-1]] + seats[1:-1]
+
+def _swiss_pairings(ranked: List[int], played: set) -> List[tuple[int, int]]:
+    # pair neighbours in the standings, skipping opponents already met when possible
+    unpaired = list(ranked)
+    pairs = []
+    while unpaired:
+        meal_1 = unpaired.pop(0)
+        position = next((i for i, meal_2 in enumerate(unpaired)
+                         if frozenset((meal_1, meal_2)) not in played), 0)
+        pairs.append((meal_1, unpaired.pop(position)))
+
+    # the greedy pass can leave a rematch at the bottom; swap opponents with a higher pair to repair it
+    for i, (meal_1, meal_2) in enumerate(pairs):
+        if frozenset((meal_1, meal_2)) not in played:
+            continue
+        for j in range(i - 1, -1, -1):
+            meal_3, meal_4 = pairs[j]
+            for other_1, other_2 in ((meal_1, meal_2), (meal_2, meal_1)):
+                if frozenset((meal_3, other_1)) not in played and frozenset((meal_4, other_2)) not in played:
+                    pairs[j], pairs[i] = (meal_3, other_1), (meal_4, other_2)
+                    break
+            else:
+                continue
+            break
+    return pairs
+
+def _swiss(meal_ids: List[int], scores: dict[int, float], random_numbers: Iterator[float],
+           rounds: int, points: dict[int, int]) -> Iterator[tuple[list, list]]:
+    seed = {meal_id: position for position, meal_id in enumerate(meal_ids)}
+    played: set[frozenset] = set()
+    had_bye: set[int] = set()
+    for _ in range(rounds):
+        unpaired = sorted(meal_ids, key=lambda meal_id: (-points[meal_id], seed[meal_id]))
+
+        byes = []
+        if len(unpaired) % 2:
+            # the lowest ranked meal that has not had a bye sits out and scores a point
+            bye = next((meal_id for meal_id in reversed(unpaired) if meal_id not in had_bye), unpaired[-1])
+            unpaired.remove(bye)
+            had_bye.add(bye)
+            points[bye] += 1
+            byes.append(bye)
+
+        matches = []
+        for meal_1, meal_2 in _swiss_pairings(unpaired, played):
+            played.add(frozenset((meal_1, meal_2)))
+            match = _resolve_match(meal_1, meal_2, scores, next(random_numbers))
+            points[match["winner"]] += 1
+            matches.append(match)
+        yield matches, byes
+
+def run_tournament(meal_ids: List[int], tournament_format: str = "single_elimination",
+                   rounds: Optional[int] = None, battle_model: Optional[BattleModel] = None) -> dict[str, Any]:
+    """
+    Runs a tournament between many meals and records every result in one transaction
+
+    Meals are loaded with one batched lookup and scored once, the random numbers for every
+    match are fetched up front in one batch from the battle model's random provider, or the
+    configured backend when it has none (random.org sized requests for random.org), and each
+    match is decided with the same rule as `BattleModel.battle`. A battle model with a
+    SeededRandomProvider therefore replays the same tournament.
+
+    Args:
+        meal_ids (List[int]): The IDs of the entrants, best seed first
+        tournament_format (str, optional): 'single_elimination', 'round_robin' or 'swiss'
+        rounds (int, optional): The number of Swiss rounds. Defaults to ceil(log2(entrants)).
+        battle_model (BattleModel, optional): The model used to score the meals
+
+    Returns:
+        dict[str, Any]: The format, the bracket as a list of rounds (each with its matches
+                        and byes), the final standings and the winner
+
+    Raises:
+        ValueError: If the format, the entrants or the number of rounds are invalid
+        MealLookupError: If any meal does not exist or has already been marked as deleted
+        RuntimeError: If fetching random numbers fails
+        sqlite3.Error: For any database errors
+    """
+    if tournament_format not in TOURNAMENT_FORMATS:
+        raise ValueError(f"Invalid tournament format: {tournament_format}. Must be one of {list(TOURNAMENT_FORMATS)}.")
+    meal_ids = list(meal_ids)
+    if len(meal_ids) < 2:
+        raise ValueError("At least two meals must enter a tournament.")
+    seen = set()
+    for meal_id in meal_ids:
+        if meal_id in seen:
+            raise ValueError(f"Meal with ID {meal_id} entered more than once")
+        seen.add(meal_id)
+
+    if tournament_format == "swiss":
+        rounds = math.ceil(math.log2(len(meal_ids))) if rounds is None else rounds
+        if not 1 <= rounds <= len(meal_ids) - 1:
+            raise ValueError(f"Invalid number of rounds: {rounds}. Must be between 1 and {len(meal_ids) - 1}.")
+    elif rounds is not None:
+        raise ValueError("The number of rounds can only be set for Swiss tournaments.")
+
+    match_count = _count_matches(tournament_format, len(meal_ids), rounds)
+    if match_count > TOURNAMENT_MAX_MATCHES:
+        raise ValueError(f"Tournament would need {match_count} matches; the limit is {TOURNAMENT_MAX_MATCHES}.")
+
+    logger.info("Starting %s tournament with %d meals and %d matches", tournament_format, len(meal_ids), match_count)
+
+    meals = get_meals_by_ids(meal_ids)
+    battle_model = battle_model or BattleModel()
+    scores = dict(zip(meal_ids, battle_model.get_battle_scores(meals)))
+    random_provider = battle_model.random_provider
+    random_numbers = iter(random_provider.random_batch(match_count) if random_provider is not None
+                          else get_random_batch(match_count))
+
+    points = {meal_id: 0 for meal_id in meal_ids}
+    if tournament_format == "single_elimination":
+        schedule = _single_elimination(meal_ids, scores, random_numbers)
+    elif tournament_format == "round_robin":
+        schedule = _round_robin(meal_ids, scores, random_numbers)
+    else:
+        schedule = _swiss(meal_ids, scores, random_numbers, rounds, points)
+
+    bracket = []
+    battles = {meal_id: 0 for meal_id in meal_ids}
+    wins = {meal_id: 0 for meal_id in meal_ids}
+    for round_number, (matches, byes) in enumerate(schedule, start=1):
+        for match in matches:
+            battles[match["winner"]] += 1
+            battles[match["loser"]] += 1
+            wins[match["winner"]] += 1
+        bracket.append({"round": round_number, "matches": matches, "byes": byes})
+        logger.info("Round %d: %d matches, %d byes", round_number, len(matches), len(byes))
+
+    record_battle_results([(match["winner"], match["loser"]) for round_ in bracket for match in round_["matches"]])
+
+    if tournament_format != "swiss":
+        points = wins
+    seed = {meal_id: position for position, meal_id in enumerate(meal_ids)}
+    standings = [
+        {"id": meal.id, "meal": meal.meal, "battles": battles[meal.id], "wins": wins[meal.id], "points": points[meal.id]}
+        for meal in sorted(meals, key=lambda meal: (-points[meal.id], -wins[meal.id], seed[meal.id]))
+    ]
+    if tournament_format == "single_elimination":
+        winner_id = bracket[-1]["matches"][0]["winner"]
+        winner = next(entry for entry in standings if entry["id"] == winner_id)
+    else:
+        winner = standings[0]
+
+    logger.info("Tournament won by %s", winner["meal"])
+    return {"format": tournament_format, "rounds": bracket, "standings": standings,
+            "winner": {"id": winner["id"], "meal": winner["meal"]}}
@@ -1,16 +1,35 @@
 import logging
+import os
 from sqlalchemy.exc import IntegrityError
 from meal_max.db import db
 from datetime import datetime
+from typing import List, Optional
+from meal_max.models.movie_model import Movie
 from meal_max.models.user_model import Users
 from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import SQL_IN_CHUNK_SIZE
+from meal_max.utils.streaming import STREAM_BATCH_ROWS
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+WATCHLIST_BULK_MAX = int(os.getenv("WATCHLIST_BULK_MAX", 1000))  # movie IDs per bulk request
+WATCHLIST_PAGE_MAX = int(os.getenv("WATCHLIST_PAGE_MAX", 100))  # entries per page of a listing
+
+WATCHLIST_SORT_FIELDS = ("added_on", "popularity", "movie_title")
+WATCHLIST_FIELDS = ("id", "movie_id", "movie_title", "overview", "popularity", "added_on", "watched")
+
+
 class Watchlist(db.Model):
     __tablename__ = 'watchlist'
+    __table_args__ = (
+        # One entry per movie and user. Also serves every lookup by user_id alone.
+        db.Index('uq_watchlist_user_movie', 'user_id', 'movie_id', unique=True),
+        db.Index('ix_watchlist_user_title', 'user_id', 'movie_title'),
+        db.Index('ix_watchlist_user_added_on', 'user_id', 'added_on'),
+        db.Index('ix_watchlist_user_popularity', 'user_id', 'popularity'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -21,7 +40,7 @@ class Watchlist(db.Model):
     added_on = db.Column(db.DateTime, default=datetime.utcnow)
     watched = db.Column(db.Boolean, default=False)
 
-    user = db.relationship('User', back_populates='watchlist')
+    user = db.relationship('Users', back_populates='watchlist')
 
     @staticmethod
     def add_to_watchlist(username: str, movie_title: str) -> dict:
@@ -43,18 +62,104 @@ class Watchlist(db.Model):
 
     @staticmethod
     def get_watchlist(username: str) -> list:
-        user = Users.query.filter_by(username=username).first()
-        if not user:
+        # one query: the user's row joined to its entries, so an unknown user yields no rows at all
+        rows = (
+            db.session.query(Users.id, Watchlist.id, Watchlist.movie_title, Watchlist.added_on, Watchlist.watched)
+            .outerjoin(Watchlist, Watchlist.user_id == Users.id)
+            .filter(Users.username == username)
+            .order_by(Watchlist.added_on, Watchlist.id)
+            .all()
+        )
+        if not rows:
             logger.error("User '%s' not found.", username)
             raise ValueError(f"User '{username}' not found.")
 
-        watchlist = Watchlist.query.filter_by(user_id=user.id).all()
         logger.info("Retrieved watchlist for user '%s'.", username)
         return [
-            {"id": entry.id, "movie_title": entry.movie_title, "added_on": entry.added_on, "watched": entry.watched}
-            for entry in watchlist
+            {"id": entry_id, "movie_title": movie_title, "added_on": added_on, "watched": watched}
+            for _, entry_id, movie_title, added_on, watched in rows
+            if entry_id is not None
         ]
 
+    @staticmethod
+    def list_watchlist(user_id: int, page: int = 1, per_page: int = 50, sort_by: str = "added_on",
+                       order: str = "desc", watched: Optional[bool] = None) -> dict:
+        """
+        Returns one page of a user's watchlist
+
+        The (user_id, sort field) indexes serve the filter, the ordering and the count, so the
+        cost depends on the page rather than on the size of the watchlist.
+
+        Args:
+            user_id (int): The ID of the user
+            page (int, optional): The page, starting at 1
+            per_page (int, optional): Entries per page, at most WATCHLIST_PAGE_MAX
+            sort_by (str, optional): 'added_on', 'popularity' or 'movie_title'
+            order (str, optional): 'asc' or 'desc'
+            watched (bool, optional): Only watched (True) or unwatched (False) entries; None for all
+
+        Returns:
+            dict: The entries of the page, and page, per_page, total and pages
+
+        Raises:
+            ValueError: If an argument is invalid
+        """
+        if not isinstance(page, int) or page < 1:
+            raise ValueError(f"Invalid page: {page}. Must be at least 1.")
+        if not isinstance(per_page, int) or not 1 <= per_page <= WATCHLIST_PAGE_MAX:
+            raise ValueError(f"Invalid page size: {per_page}. Must be between 1 and {WATCHLIST_PAGE_MAX}.")
+        if sort_by not in WATCHLIST_SORT_FIELDS:
+            raise ValueError(f"Invalid sort field: {sort_by}. Must be one of {list(WATCHLIST_SORT_FIELDS)}.")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Invalid sort order: {order}. Must be 'asc' or 'desc'.")
+
+        query = Watchlist.query.filter(Watchlist.user_id == user_id)
+        if watched is not None:
+            query = query.filter(Watchlist.watched == watched)
+        total = query.count()
+
+        column = getattr(Watchlist, sort_by)
+        direction = (lambda c: c.desc()) if order == "desc" else (lambda c: c.asc())
+        entries = (
+            query.order_by(direction(column), direction(Watchlist.id))
+            .limit(per_page)
+            .offset((page - 1) * per_page)
+            .all()
+        )
+        return {
+            "entries": [entry.to_dict() for entry in entries],
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+            "pages": -(-total // per_page),
+        }
+
+    @staticmethod
+    def iter_entries(user_id: int, watched: Optional[bool] = None, batch_size: int = STREAM_BATCH_ROWS):
+        """
+        Streams a user's whole watchlist, oldest first, for exports
+
+        Rows are fetched `batch_size` at a time as plain tuples rather than ORM objects, so
+        memory does not grow with the size of the watchlist. Must be consumed inside an app context.
+
+        Args:
+            user_id (int): The ID of the user
+            watched (bool, optional): Only watched (True) or unwatched (False) entries; None for all
+            batch_size (int, optional): Rows fetched at a time
+
+        Yields:
+            dict: The entries, shaped like to_dict
+        """
+        columns = [getattr(Watchlist, field) for field in WATCHLIST_FIELDS]
+        query = db.session.query(*columns).filter(Watchlist.user_id == user_id)
+        if watched is not None:
+            query = query.filter(Watchlist.watched == watched)
+        for row in query.order_by(Watchlist.added_on, Watchlist.id).yield_per(batch_size):
+            yield dict(zip(WATCHLIST_FIELDS, row))
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in WATCHLIST_FIELDS}
+
     @staticmethod
     def remove_from_watchlist(username: str, movie_title: str) -> dict:
         user = Users.query.filter_by(username=username).first()
@@ -71,5 +176,172 @@ class Watchlist(db.Model):
         db.session.commit()
         logger.info("Movie '%s' removed from %s's watchlist.", movie_title, username)
         return {"message": "Movie removed from watchlist", "movie_title": movie_title}
-    
-    
+
+    @staticmethod
+    def _validate_movie_ids(movie_ids: List[int]) -> List[int]:
+        if not isinstance(movie_ids, list) or not movie_ids:
+            raise ValueError("movie_ids must be a non-empty list.")
+        if len(movie_ids) > WATCHLIST_BULK_MAX:
+            raise ValueError(f"Too many movie IDs: {len(movie_ids)}. At most {WATCHLIST_BULK_MAX} are allowed.")
+        if not all(isinstance(movie_id, int) and not isinstance(movie_id, bool) for movie_id in movie_ids):
+            raise ValueError("movie_ids must be integers.")
+        return list(dict.fromkeys(movie_ids))
+
+    @staticmethod
+    def _get_entries(user_id: int, movie_ids: List[int]) -> dict:
+        entries = {}
+        for start in range(0, len(movie_ids), SQL_IN_CHUNK_SIZE):
+            chunk = movie_ids[start:start + SQL_IN_CHUNK_SIZE]
+            query = Watchlist.query.filter(Watchlist.user_id == user_id, Watchlist.movie_id.in_(chunk))
+            entries.update((entry.movie_id, entry) for entry in query)
+        return entries
+
+    @staticmethod
+    def _commit(action: str, user_id: int) -> None:
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Database error while %s for user %s: %s", action, user_id, str(e))
+            raise
+
+    @staticmethod
+    def add_many(user_id: int, movie_ids: List[int]) -> List[dict]:
+        """
+        Adds several movies to a user's watchlist in one transaction
+
+        Existing entries are found with one query. Movies are validated against the local
+        metadata store, and the unknown or stale ones are fetched from TMDB concurrently.
+
+        Args:
+            user_id (int): The ID of the user
+            movie_ids (List[int]): TMDB IDs; repeated IDs are handled once
+
+        Returns:
+            List[dict]: Per movie, in request order: movie_id and a status of 'added',
+                        'already_in_watchlist' or 'invalid' (with an error)
+
+        Raises:
+            ValueError: If movie_ids is not a non-empty list of at most WATCHLIST_BULK_MAX integers
+            SQLAlchemyError: For any database errors; nothing is written
+        """
+        movie_ids = Watchlist._validate_movie_ids(movie_ids)
+        try:
+            results = Watchlist._add_many(user_id, movie_ids)
+        except IntegrityError as e:
+            db.session.rollback()
+            if not is_duplicate_entry(e):
+                logger.error("Database error while adding movies to the watchlist of user %s: %s", user_id, str(e))
+                raise
+            # a concurrent request added some of the movies first; resolve them again
+            results = Watchlist._add_many(user_id, movie_ids)
+        logger.info("Added %d of %d movies to the watchlist of user %s",
+                    sum(result["status"] == "added" for result in results), len(movie_ids), user_id)
+        return results
+
+    @staticmethod
+    def _add_many(user_id: int, movie_ids: List[int]) -> List[dict]:
+        existing = Watchlist._get_entries(user_id, movie_ids)
+        movies, errors = Movie.get_or_fetch_many([movie_id for movie_id in movie_ids if movie_id not in existing])
+
+        results = []
+        for movie_id in movie_ids:
+            if movie_id in existing:
+                results.append({"movie_id": movie_id, "status": "already_in_watchlist"})
+            elif movie_id in errors:
+                results.append({"movie_id": movie_id, "status": "invalid", "error": errors[movie_id]})
+            else:
+                movie = movies[movie_id]
+                db.session.add(Watchlist(user_id=user_id, movie_id=movie_id, movie_title=movie.title,
+                                         overview=movie.overview, popularity=movie.popularity or 0.0))
+                results.append({"movie_id": movie_id, "status": "added"})
+
+        Watchlist._commit("adding movies", user_id)
+        return results
+
+    @staticmethod
+    def mark_watched_many(user_id: int, movie_ids: List[int]) -> List[dict]:
+        """
+        Marks several movies of a user's watchlist as watched in one transaction
+
+        Args:
+            user_id (int): The ID of the user
+            movie_ids (List[int]): TMDB IDs; repeated IDs are handled once
+
+        Returns:
+            List[dict]: Per movie, in request order: movie_id and a status of 'marked_watched' or 'not_found'
+
+        Raises:
+            ValueError: If movie_ids is not a non-empty list of at most WATCHLIST_BULK_MAX integers
+            SQLAlchemyError: For any database errors; nothing is written
+        """
+        movie_ids = Watchlist._validate_movie_ids(movie_ids)
+        existing = Watchlist._get_entries(user_id, movie_ids)
+        for entry in existing.values():
+            entry.watched = True
+        Watchlist._commit("marking movies as watched", user_id)
+        logger.info("Marked %d movies as watched for user %s", len(existing), user_id)
+        return [{"movie_id": movie_id, "status": "marked_watched" if movie_id in existing else "not_found"}
+                for movie_id in movie_ids]
+
+    @staticmethod
+    def remove_many(user_id: int, movie_ids: List[int]) -> List[dict]:
+        """
+        Removes several movies from a user's watchlist in one transaction
+
+        Args:
+            user_id (int): The ID of the user
+            movie_ids (List[int]): TMDB IDs; repeated IDs are handled once
+
+        Returns:
+            List[dict]: Per movie, in request order: movie_id and a status of 'removed' or 'not_found'
+
+        Raises:
+            ValueError: If movie_ids is not a non-empty list of at most WATCHLIST_BULK_MAX integers
+            SQLAlchemyError: For any database errors; nothing is written
+        """
+        movie_ids = Watchlist._validate_movie_ids(movie_ids)
+        existing = Watchlist._get_entries(user_id, movie_ids)
+        for entry in existing.values():
+            db.session.delete(entry)
+        Watchlist._commit("removing movies", user_id)
+        logger.info("Removed %d movies from the watchlist of user %s", len(existing), user_id)
+        return [{"movie_id": movie_id, "status": "removed" if movie_id in existing else "not_found"}
+                for movie_id in movie_ids]
+
+
+def is_duplicate_entry(error: IntegrityError) -> bool:
+    """
+    Checks whether an integrity error comes from the one-entry-per-movie constraint
+
+    Args:
+        error (IntegrityError): The error raised by a commit
+
+    Returns:
+        bool: True if the user already has the movie in their watchlist; False for other
+              constraints such as foreign keys or NOT NULL columns
+    """
+    message = str(error.orig)
+    # PostgreSQL and MySQL name the index, SQLite lists its columns
+    return "uq_watchlist_user_movie" in message or \
+        "UNIQUE constraint failed: watchlist.user_id, watchlist.movie_id" in message
+
+def ensure_watchlist_indexes() -> None:
+    """
+    Creates the watchlist indexes on databases whose table predates them
+
+    The unique index fails if a user already has duplicate entries for a movie; those have
+    to be removed first. Watchlist inserts rely on it to reject duplicates, so callers should
+    not start without it.
+
+    Raises:
+        SQLAlchemyError: If any database error occurs.
+    """
+    try:
+        for index in Watchlist.__table__.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+        logger.info("Watchlist indexes are in place.")
+    except Exception as e:
+        logger.error("Database error while creating watchlist indexes: %s", str(e))
+        raise
+
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class ClientDisconnected(Exception):
+    """
+    Raised when the client that made a request hangs up before the response is ready
+    """
+
+
+async def wait_for_disconnect(receive: Callable[[], Awaitable[dict]]) -> None:
+    """
+    Returns once the ASGI server reports that the client has disconnected
+
+    Args:
+        receive (Callable): The request's ASGI receive channel. Body messages are discarded.
+    """
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+async def cancel_on_disconnect(awaitable: Awaitable[Any], receive: Callable[[], Awaitable[dict]]) -> Any:
+    """
+    Awaits the work done for a request, cancelling it if the client disconnects first
+
+    Args:
+        awaitable (Awaitable[Any]): The work done for the request
+        receive (Callable): The request's ASGI receive channel
+
+    Returns:
+        Any: The work's result
+
+    Raises:
+        ClientDisconnected: If the client disconnected; the work has been cancelled
+    """
+    task = asyncio.ensure_future(awaitable)
+    disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        done, _ = await asyncio.wait({task, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        disconnect.cancel()
+        raise
+    disconnect.cancel()
+    if task in done:
+        return task.result()
+    logger.info("Client disconnected; cancelling its request")
+    task.cancel()
+    raise ClientDisconnected("Client disconnected")
+
+async def send_json(send: Callable[[dict], Awaitable[None]], body: bytes, status: int) -> None:
+    """
+    Sends a complete JSON response
+
+    Args:
+        send (Callable): The request's ASGI send channel
+        body (bytes): The encoded JSON document
+        status (int): The HTTP status code
+    """
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+async def run_lifespan(receive: Callable[[], Awaitable[dict]], send: Callable[[dict], Awaitable[None]]) -> None:
+    """
+    Acknowledges the server's startup and shutdown events; the app has nothing to set up or tear down
+
+    Args:
+        receive (Callable): The lifespan's ASGI receive channel
+        send (Callable): The lifespan's ASGI send channel
+    """
+    while True:
+        message = await receive()
+        await send({"type": message["type"] + ".complete"})
+        if message["type"] == "lifespan.shutdown":
+            return
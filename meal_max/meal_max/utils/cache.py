@@ -0,0 +1,121 @@
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    A thread-safe, size-bounded LRU cache whose entries expire after a time-to-live
+
+    Attributes:
+        maxsize (int): The maximum number of entries. 0 disables the cache.
+        ttl (float): How long an entry stays valid, in seconds
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        if maxsize < 0:
+            raise ValueError(f"Invalid cache size: {maxsize}. Size must not be negative.")
+        if ttl <= 0:
+            raise ValueError(f"Invalid cache TTL: {ttl}. TTL must be positive.")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the cached value for a key and marks it as recently used
+
+        Args:
+            key (Hashable): The cache key
+            default (Any, optional): The value to return on a miss
+
+        Returns:
+            Any: The cached value, or `default` if the key is missing or expired
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._stats["misses"] += 1
+                return default
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Caches a value, evicting the least recently used entries if the cache is full
+
+        Args:
+            key (Hashable): The cache key
+            value (Any): The value to cache
+            ttl (float, optional): Overrides the cache's TTL for this entry
+        """
+        if self.maxsize == 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def delete(self, key: Hashable) -> Any:
+        """
+        Removes a key from the cache
+
+        Args:
+            key (Hashable): The cache key
+
+        Returns:
+            Any: The removed value, or None if the key was not cached
+        """
+        with self._lock:
+            item = self._data.pop(key, None)
+        return item[0] if item is not None else None
+
+    def discard_if(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """
+        Removes every entry for which `predicate(key, value)` is true
+
+        Returns:
+            int: The number of entries removed
+        """
+        with self._lock:
+            doomed = [key for key, (value, _) in self._data.items() if predicate(key, value)]
+            for key in doomed:
+                del self._data[key]
+        return len(doomed)
+
+    def clear(self) -> None:
+        """
+        Removes all entries. Counters are kept.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the cache's counters
+
+        Returns:
+            dict[str, int]: hits, misses, evictions, expirations, current size and maxsize
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._data)
+            stats["maxsize"] = self.maxsize
+        return stats
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,346 @@
+import asyncio
+from collections import deque
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 5.0))  # default seconds per request
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 3))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", 0.3))  # sleeps 0.3s, 0.6s, 1.2s, ... between retries
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 10))  # kept-alive connections per host
+HTTP_ASYNC_MAX_CONNECTIONS = int(os.getenv("HTTP_ASYNC_MAX_CONNECTIONS", 100))  # concurrent async calls
+
+# Per-host overrides of HTTP_POOL_MAXSIZE, e.g. "api.themoviedb.org=20,www.random.org=4"
+HTTP_HOST_POOL_SIZES = {
+    host.strip(): int(size)
+    for host, _, size in (item.partition("=") for item in os.getenv("HTTP_HOST_POOL_SIZES", "").split(",") if item.strip())
+}
+
+# Responses worth retrying; 429 and 503 honour the Retry-After header
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Latencies kept per host for the percentiles in HttpClient.stats
+LATENCY_SAMPLES = 1000
+
+
+class HttpClient:
+    """
+    A thread-safe HTTP client that keeps connections alive between calls
+
+    Each thread gets its own requests.Session, but all sessions share the same adapters,
+    so connections (and their TLS sessions) are pooled per host across the whole process.
+    Idempotent requests are retried with exponential backoff on connection errors and on
+    RETRY_STATUSES. Read timeouts are not retried, so a timeout costs at most one `timeout`.
+
+    Attributes:
+        timeout (float): The default timeout of a request, in seconds
+    """
+
+    def __init__(self, timeout: float = HTTP_TIMEOUT, retries: int = HTTP_RETRIES, backoff_factor: float = HTTP_BACKOFF,
+                 pool_maxsize: int = HTTP_POOL_MAXSIZE, host_pool_sizes: Optional[dict[str, int]] = None):
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=False,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+            raise_on_status=False,
+        )
+        self._default_adapter = HTTPAdapter(pool_maxsize=pool_maxsize, max_retries=retry)
+        self._host_adapters = {
+            host: HTTPAdapter(pool_maxsize=size, max_retries=retry)
+            for host, size in (HTTP_HOST_POOL_SIZES if host_pool_sizes is None else host_pool_sizes).items()
+        }
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, Any]] = {}
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", self._default_adapter)
+            session.mount("https://", self._default_adapter)
+            for host, adapter in self._host_adapters.items():
+                session.mount(f"http://{host}", adapter)
+                session.mount(f"https://{host}", adapter)
+            self._local.session = session
+        return session
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Sends a request over a pooled connection and records its latency
+
+        Args:
+            method (str): The HTTP method
+            url (str): The URL
+            **kwargs: Passed on to requests; `timeout` defaults to the client's timeout
+
+        Returns:
+            requests.Response: The response. HTTP errors are not raised; call raise_for_status.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails after its retries
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).hostname or ""
+        started = time.monotonic()
+        try:
+            response = self._session().request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            self._record(host, time.monotonic() - started, error=True)
+            raise
+        self._record(host, time.monotonic() - started, error=response.status_code >= 400)
+        return response
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Sends a GET request. See `request`.
+        """
+        return self.request("GET", url, **kwargs)
+
+    def _record(self, host: str, latency: float, error: bool) -> None:
+        with self._lock:
+            stats = self._stats.get(host)
+            if stats is None:
+                stats = self._stats[host] = {"calls": 0, "errors": 0, "total_latency": 0.0, "max_latency": 0.0,
+                                             "samples": deque(maxlen=LATENCY_SAMPLES)}
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["total_latency"] += latency
+            stats["max_latency"] = max(stats["max_latency"], latency)
+            stats["samples"].append(latency)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Returns call counts and latencies per host
+
+        Returns:
+            dict[str, dict[str, Any]]: calls, errors (exceptions and 4xx/5xx responses), and the
+                                       average, p50, p95 and max latency in seconds, keyed by host
+        """
+        with self._lock:
+            report = {}
+            for host, stats in self._stats.items():
+                samples = sorted(stats["samples"])
+                report[host] = {
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "avg_latency": stats["total_latency"] / stats["calls"],
+                    "p50_latency": samples[len(samples) // 2],
+                    "p95_latency": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+                    "max_latency": stats["max_latency"],
+                }
+            return report
+
+    def close(self) -> None:
+        """
+        Closes every pooled connection
+        """
+        self._default_adapter.close()
+        for adapter in self._host_adapters.values():
+            adapter.close()
+
+
+class AsyncHttpClient:
+    """
+    An asynchronous HTTP client that multiplexes calls on one event loop
+
+    The loop runs in a daemon thread and owns an httpx.AsyncClient. A request handler
+    submits one coroutine for a batch of upstream calls (see Movie.get_or_fetch_many) and
+    waits for its result, so the batch shares one connection pool and its calls are in
+    flight together instead of one after another. The handler's own thread still blocks
+    until the batch is done. Coroutines running on another event loop, such as the ASGI
+    routes in asgi.py, use `run` and hold no thread while they wait.
+    Retries follow HttpClient: connection errors and RETRY_STATUSES are retried with
+    exponential backoff, read timeouts are not.
+
+    Attributes:
+        timeout (float): The default timeout of a request, in seconds
+    """
+
+    def __init__(self, timeout: float = HTTP_TIMEOUT, retries: int = HTTP_RETRIES, backoff_factor: float = HTTP_BACKOFF,
+                 max_connections: int = HTTP_ASYNC_MAX_CONNECTIONS, recorder: Optional[HttpClient] = None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=HTTP_POOL_MAXSIZE)
+        self._recorder = recorder
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="http-async-loop", daemon=True).start()
+                self._client = httpx.AsyncClient(limits=self._limits, timeout=self.timeout)
+                self._loop = loop
+            return self._loop
+
+    def submit(self, coroutine: Awaitable[Any]) -> concurrent.futures.Future:
+        """
+        Schedules a coroutine on the client's event loop
+
+        Args:
+            coroutine (Awaitable[Any]): The coroutine
+
+        Returns:
+            concurrent.futures.Future: Its result. Cancelling the future cancels the coroutine.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._start())
+
+    async def run(self, coroutine: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """
+        Awaits a coroutine on the client's event loop, from any event loop
+
+        Args:
+            coroutine (Awaitable[Any]): The coroutine, which may call `request`
+            timeout (float, optional): Seconds to wait before cancelling it
+
+        Returns:
+            Any: Its result
+
+        Raises:
+            asyncio.TimeoutError: If the timeout passes first
+            asyncio.CancelledError: If the caller is cancelled, which also cancels the coroutine
+        """
+        loop = self._start()
+        if asyncio.get_running_loop() is loop:
+            return await asyncio.wait_for(coroutine, timeout)
+        return await asyncio.wait_for(asyncio.wrap_future(self.submit(coroutine)), timeout)
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Sends a request over a pooled connection and records its latency. Must run on the client's loop.
+
+        Args:
+            method (str): The HTTP method
+            url (str): The URL
+            **kwargs: Passed on to httpx; `timeout` defaults to the client's timeout
+
+        Returns:
+            httpx.Response: The response. HTTP errors are not raised; call raise_for_status.
+
+        Raises:
+            httpx.HTTPError: If the request fails after its retries
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).hostname or ""
+        retry = method.upper() in ("GET", "HEAD", "OPTIONS")
+        started = time.monotonic()
+        for attempt in range(self.retries + 1):
+            last = not retry or attempt == self.retries
+            try:
+                response = await self._client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if last:
+                    self._record(host, time.monotonic() - started, error=True)
+                    raise
+                delay = self.backoff_factor * 2 ** attempt
+            except httpx.HTTPError:
+                self._record(host, time.monotonic() - started, error=True)
+                raise
+            else:
+                if last or response.status_code not in RETRY_STATUSES:
+                    self._record(host, time.monotonic() - started, error=response.status_code >= 400)
+                    return response
+                retry_after = response.headers.get("Retry-After", "")
+                delay = float(retry_after) if retry_after.isdigit() else self.backoff_factor * 2 ** attempt
+                await response.aclose()
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Sends a GET request. See `request`.
+        """
+        return await self.request("GET", url, **kwargs)
+
+    def _record(self, host: str, latency: float, error: bool) -> None:
+        # async calls are reported with the synchronous ones
+        (self._recorder or get_http_client())._record(host, latency, error)
+
+    def close(self) -> None:
+        """
+        Closes every pooled connection and stops the event loop
+        """
+        with self._lock:
+            loop, client = self._loop, self._client
+            self._loop = self._client = None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+
+
+_client: Optional[HttpClient] = None
+_async_client: Optional[AsyncHttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    Returns the process-wide HTTP client, creating it on first use
+
+    Returns:
+        HttpClient: The shared client
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+def get_async_http_client() -> AsyncHttpClient:
+    """
+    Returns the process-wide asynchronous HTTP client, creating it on first use
+
+    Returns:
+        AsyncHttpClient: The shared client
+    """
+    global _async_client
+    with _client_lock:
+        if _async_client is None:
+            _async_client = AsyncHttpClient()
+        return _async_client
+
+def http_get(url: str, **kwargs: Any) -> requests.Response:
+    """
+    Sends a GET request through the process-wide HTTP client
+
+    Args:
+        url (str): The URL
+        **kwargs: Passed on to requests; `timeout` defaults to HTTP_TIMEOUT
+
+    Returns:
+        requests.Response: The response
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails after its retries
+    """
+    return get_http_client().get(url, **kwargs)
+
+def get_http_stats() -> dict[str, dict[str, Any]]:
+    """
+    Returns the per-host call counts and latencies of the process-wide HTTP client
+    """
+    return get_http_client().stats()
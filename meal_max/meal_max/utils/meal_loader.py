@@ -0,0 +1,126 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+from typing import Any, Iterator, Optional
+
+from meal_max.models.kitchen_model import BULK_INSERT_CHUNK_SIZE, create_meals_bulk
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+def _parse_price(value: Any) -> Any:
+    # leave unparseable prices as they are so create_meals_bulk reports them per row
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def iter_csv_meals(path: str) -> Iterator[dict[str, Any]]:
+    """
+    Streams meals from a CSV file with a meal,cuisine,price,difficulty header
+
+    Args:
+        path (str): The path of the CSV file
+
+    Yields:
+        dict[str, Any]: One meal per data row, with the price parsed as a float
+    """
+    with open(path, newline="") as fh:
+        for row in csv.DictReader(fh):
+            if 'price' in row:
+                row['price'] = _parse_price(row['price'])
+            yield row
+
+
+def iter_jsonl_meals(path: str) -> Iterator[Any]:
+    """
+    Streams meals from a JSON Lines file with one meal object per line
+
+    Blank lines are skipped. Lines that are not valid JSON are yielded as raw strings
+    so the import reports them as malformed rows.
+
+    Args:
+        path (str): The path of the JSONL file
+
+    Yields:
+        Any: One meal per non-blank line
+    """
+    with open(path) as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                yield line
+                continue
+            if isinstance(row, dict) and 'price' in row:
+                row['price'] = _parse_price(row['price'])
+            yield row
+
+
+READERS = {
+    "csv": iter_csv_meals,
+    "jsonl": iter_jsonl_meals,
+    "ndjson": iter_jsonl_meals,
+}
+
+
+def load_meals_file(path: str, file_format: Optional[str] = None,
+                    chunk_size: int = BULK_INSERT_CHUNK_SIZE) -> dict[str, Any]:
+    """
+    Imports meals from a CSV or JSONL file with constant memory use
+
+    Args:
+        path (str): The path of the file
+        file_format (str, optional): 'csv', 'jsonl' or 'ndjson'. Defaults to the file extension.
+        chunk_size (int, optional): The number of rows per transaction
+
+    Returns:
+        dict[str, Any]: The import report from `create_meals_bulk`
+
+    Raises:
+        ValueError: If the file format is not supported
+        OSError: If the file cannot be read
+        sqlite3.Error: For any database errors
+    """
+    file_format = (file_format or os.path.splitext(path)[1].lstrip(".")).lower()
+    if file_format not in READERS:
+        raise ValueError(f"Unsupported file format: {file_format}. Must be one of {sorted(READERS)}.")
+
+    logger.info("Importing meals from %s (%s)", path, file_format)
+    return create_meals_bulk(READERS[file_format](path), chunk_size=chunk_size)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Command line entry point: python -m meal_max.utils.meal_loader meals.csv
+
+    Prints the import report as JSON. Exits with 1 if any row was skipped.
+    """
+    parser = argparse.ArgumentParser(description="Bulk import meals from a CSV or JSONL file.")
+    parser.add_argument("path", help="CSV (meal,cuisine,price,difficulty) or JSONL file to import")
+    parser.add_argument("--format", dest="file_format", choices=sorted(READERS),
+                        help="file format (defaults to the file extension)")
+    parser.add_argument("--chunk-size", type=int, default=BULK_INSERT_CHUNK_SIZE,
+                        help="rows per transaction (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    report = load_meals_file(args.path, file_format=args.file_format, chunk_size=args.chunk_size)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 1 if report['duplicates'] or report['invalid'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+from abc import ABC, abstractmethod
+import logging
+import os
+import random
+import secrets
+import threading
+import time
+from typing import Any, List, Optional
+
+from meal_max.utils import random_utils
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Every backend draws from the same grid as random.org's two-decimal fractions: 0.00 .. 0.99
+RANDOM_DECIMALS = 2
+_RANDOM_STEPS = 10 ** RANDOM_DECIMALS
+
+RANDOM_BACKENDS = ("random_org", "system", "seeded", "fallback")
+RANDOM_BACKEND = os.getenv("RANDOM_BACKEND", "fallback")
+RANDOM_SEED = int(os.getenv("RANDOM_SEED")) if os.getenv("RANDOM_SEED") else None
+
+RANDOM_BREAKER_FAILURES = int(os.getenv("RANDOM_BREAKER_FAILURES", 3))  # failures before a backend is skipped
+RANDOM_BREAKER_RESET = float(os.getenv("RANDOM_BREAKER_RESET", 30.0))  # seconds before it is tried again
+RANDOM_SLOW_CALL = float(os.getenv("RANDOM_SLOW_CALL", 2.0))  # seconds after which a call counts as a failure
+
+
+class RandomProvider(ABC):
+    """
+    A source of random floats between 0 and 1
+
+    Subclasses implement `random`; `random_batch` calls it once per number unless overridden.
+
+    Attributes:
+        name (str): The name of the backend
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def random(self) -> float:
+        """
+        Returns one random number
+
+        Returns:
+            float: A random number between 0 and 1
+
+        Raises:
+            RuntimeError: If the backend is unavailable
+            ValueError: If the backend returns an invalid number
+        """
+
+    def random_batch(self, count: int) -> List[float]:
+        """
+        Returns several random numbers
+
+        Args:
+            count (int): The number of random numbers
+
+        Returns:
+            List[float]: The random numbers
+
+        Raises:
+            ValueError: If the count is negative
+            RuntimeError: If the backend is unavailable
+        """
+        if count < 0:
+            raise ValueError(f"Invalid count: {count}. Count must not be negative.")
+        return [self.random() for _ in range(count)]
+
+
+class RandomOrgProvider(RandomProvider):
+    """
+    Random numbers from random.org, served from the prefetched pool in random_utils
+    """
+
+    name = "random_org"
+
+    def random(self) -> float:
+        return random_utils.get_random()
+
+    def random_batch(self, count: int) -> List[float]:
+        return random_utils.get_random_batch(count)
+
+
+class SystemRandomProvider(RandomProvider):
+    """
+    Random numbers from the operating system's CSPRNG
+    """
+
+    name = "system"
+
+    def random(self) -> float:
+        return secrets.randbelow(_RANDOM_STEPS) / _RANDOM_STEPS
+
+
+class SeededRandomProvider(RandomProvider):
+    """
+    A deterministic PRNG for replayable simulations and benchmarks. Not for real battles.
+
+    Attributes:
+        seed (Optional[int]): The seed the generator started from
+    """
+
+    name = "seeded"
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def random(self) -> float:
+        with self._lock:
+            return self._random.randrange(_RANDOM_STEPS) / _RANDOM_STEPS
+
+    def random_batch(self, count: int) -> List[float]:
+        if count < 0:
+            raise ValueError(f"Invalid count: {count}. Count must not be negative.")
+        with self._lock:
+            return [self._random.randrange(_RANDOM_STEPS) / _RANDOM_STEPS for _ in range(count)]
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing backend for a while
+
+    After `failure_threshold` consecutive failures the breaker opens and calls are skipped.
+    Once `reset_timeout` seconds have passed, a single probe call is let through while every
+    other call is still skipped: a success closes the breaker and a failure opens it again.
+
+    Attributes:
+        failure_threshold (int): Consecutive failures that open the breaker
+        reset_timeout (float): Seconds the breaker stays open
+    """
+
+    def __init__(self, failure_threshold: int = RANDOM_BREAKER_FAILURES, reset_timeout: float = RANDOM_BREAKER_RESET):
+        if failure_threshold < 1:
+            raise ValueError(f"Invalid failure threshold: {failure_threshold}. Must be at least 1.")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False  # a half-open probe call is in flight
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """
+        'closed', 'open', or 'half_open' once the reset timeout has passed
+        """
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """
+        Returns whether a call should be attempted; in the half-open state only the first caller
+        is allowed, and it must report its outcome
+        """
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "open" or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class FallbackRandomProvider(RandomProvider):
+    """
+    Tries a chain of backends in order, skipping those whose circuit breaker is open
+
+    A call that raises, or that takes longer than `slow_call_threshold` seconds, counts as
+    a failure of its backend. The last backend is always tried, so a chain ending in a
+    local backend keeps battles running while random.org is slow or down.
+
+    Attributes:
+        providers (List[RandomProvider]): The backends, in order of preference
+        slow_call_threshold (float): Seconds after which a successful call still counts as a failure
+    """
+
+    name = "fallback"
+
+    def __init__(self, providers: List[RandomProvider], failure_threshold: int = RANDOM_BREAKER_FAILURES,
+                 reset_timeout: float = RANDOM_BREAKER_RESET, slow_call_threshold: float = RANDOM_SLOW_CALL):
+        if not providers:
+            raise ValueError("A fallback chain needs at least one provider.")
+        self.providers = providers
+        self.slow_call_threshold = slow_call_threshold
+        self._breakers = [CircuitBreaker(failure_threshold, reset_timeout) for _ in providers]
+        self._served = [0] * len(providers)
+        self._failures = [0] * len(providers)
+        self._counts_lock = threading.Lock()
+
+    def _call(self, method: str, *args: Any) -> Any:
+        last = len(self.providers) - 1
+        error = None
+        for position, (provider, breaker) in enumerate(zip(self.providers, self._breakers)):
+            if position < last and not breaker.allow():
+                continue
+
+            started = time.monotonic()
+            try:
+                result = getattr(provider, method)(*args)
+            except (RuntimeError, ValueError) as e:
+                breaker.record_failure()
+                with self._counts_lock:
+                    self._failures[position] += 1
+                logger.warning("Random provider %s failed: %s", provider.name, e)
+                error = e
+                continue
+            except BaseException:
+                # an unexpected error still ends a half-open probe
+                breaker.record_failure()
+                raise
+
+            if time.monotonic() - started > self.slow_call_threshold:
+                logger.warning("Random provider %s was slow", provider.name)
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            with self._counts_lock:
+                self._served[position] += 1
+            return result
+
+        raise RuntimeError("All random providers failed: %s" % error)
+
+    def random(self) -> float:
+        return self._call("random")
+
+    def random_batch(self, count: int) -> List[float]:
+        if count < 0:
+            raise ValueError(f"Invalid count: {count}. Count must not be negative.")
+        return self._call("random_batch", count)
+
+    def stats(self) -> List[dict[str, Any]]:
+        """
+        Returns the state of each backend in the chain
+
+        Returns:
+            List[dict[str, Any]]: name, breaker state, calls served and failures per backend
+        """
+        with self._counts_lock:
+            served, failures = list(self._served), list(self._failures)
+        return [
+            {"name": provider.name, "state": breaker.state, "served": served, "failures": failures}
+            for provider, breaker, served, failures in zip(self.providers, self._breakers, served, failures)
+        ]
+
+
+def create_random_provider(backend: str, seed: Optional[int] = None) -> RandomProvider:
+    """
+    Builds a randomness backend by name
+
+    Args:
+        backend (str): 'random_org', 'system', 'seeded', or 'fallback' (random.org, then the system CSPRNG)
+        seed (int, optional): The seed for the 'seeded' backend
+
+    Returns:
+        RandomProvider: The backend
+
+    Raises:
+        ValueError: If the backend name is not supported
+    """
+    if backend == "random_org":
+        return RandomOrgProvider()
+    if backend == "system":
+        return SystemRandomProvider()
+    if backend == "seeded":
+        return SeededRandomProvider(seed)
+    if backend == "fallback":
+        return FallbackRandomProvider([RandomOrgProvider(), SystemRandomProvider()])
+    raise ValueError(f"Invalid random backend: {backend}. Must be one of {list(RANDOM_BACKENDS)}.")
+
+
+_provider: Optional[RandomProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_random_provider() -> RandomProvider:
+    """
+    Returns the process-wide randomness backend, built from RANDOM_BACKEND on first use
+
+    Returns:
+        RandomProvider: The configured backend
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = create_random_provider(RANDOM_BACKEND, RANDOM_SEED)
+            logger.info("Using random backend: %s", _provider.name)
+        return _provider
+
+def set_random_provider(provider: Optional[RandomProvider]) -> None:
+    """
+    Replaces the process-wide randomness backend
+
+    Args:
+        provider (RandomProvider, optional): The new backend, or None to rebuild it from configuration
+    """
+    global _provider
+    with _provider_lock:
+        _provider = provider
+
+def get_random() -> float:
+    """
+    Returns a random number from the process-wide backend
+
+    Returns:
+        float: A random number between 0 and 1
+
+    Raises:
+        RuntimeError: If the backend is unavailable
+        ValueError: If the backend returns an invalid number
+    """
+    return get_random_provider().random()
+
+def get_random_batch(count: int) -> List[float]:
+    """
+    Returns several random numbers from the process-wide backend
+
+    Args:
+        count (int): The number of random numbers
+
+    Returns:
+        List[float]: The random numbers
+
+    Raises:
+        ValueError: If the count is negative or the backend returns invalid numbers
+        RuntimeError: If the backend is unavailable
+    """
+    return get_random_provider().random_batch(count)
+
+def get_random_provider_stats() -> dict[str, Any]:
+    """
+    Returns the configured backend and, for a fallback chain, the state of each link
+
+    Returns:
+        dict[str, Any]: The backend name and its chain, if any
+    """
+    provider = get_random_provider()
+    stats: dict[str, Any] = {"backend": provider.name}
+    if isinstance(provider, FallbackRandomProvider):
+        stats["chain"] = provider.stats()
+    return stats
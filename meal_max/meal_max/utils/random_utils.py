@@ -1,15 +1,34 @@
+from collections import deque
 import logging
+import os
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
 import requests
 
+from meal_max.utils.http_client import http_get
 from meal_max.utils.logger import configure_logger
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# random.org serves at most this many numbers per request
+RANDOM_BATCH_MAX = 10000
+
+# get_random serves numbers from a pool that refills in the background; a size of 0 disables it
+RANDOM_POOL_SIZE = int(os.getenv("RANDOM_POOL_SIZE", 1000))
+RANDOM_POOL_LOW_WATER = int(os.getenv("RANDOM_POOL_LOW_WATER", 250))  # refill once this few are left
+RANDOM_POOL_WAIT_TIMEOUT = float(os.getenv("RANDOM_POOL_WAIT_TIMEOUT", 15.0))  # seconds a caller waits on an empty pool
+
+
 def get_random() -> float:
     """
-    Fetches a random float between 0 and 1 from random.org
+    Returns a random float between 0 and 1 from random.org
+
+    Numbers are served from the prefetched pool unless RANDOM_POOL_SIZE is 0, in which
+    case every call makes its own request.
 
     Returns:
         float: The random number fetched from random.org
@@ -18,13 +37,20 @@ def get_random() -> float:
         RuntimeError: If the request to random.org fails or returns an invalid response
         ValueError: If the response from random.org is not a valid float
     """
+    pool = get_random_pool()
+    if pool is not None:
+        return pool.get()
+    return _fetch_random()
+
+
+def _fetch_random() -> float:
     url = "https://www.random.org/decimal-fractions/?num=1&dec=2&col=1&format=plain&rnd=new"
 
     try:
         # Log the request to random.org
         logger.info("Fetching random number from %s", url)
 
-        response = requests.get(url, timeout=5)
+        response = http_get(url, timeout=5)
 
         # Check if the request was successful
         response.raise_for_status()
@@ -46,3 +72,237 @@ def get_random() -> float:
     except requests.exceptions.RequestException as e:
         logger.error("Request to random.org failed: %s", e)
         raise RuntimeError("Request to random.org failed: %s" % e)
+
+
+def get_random_batch(count: int) -> List[float]:
+    """
+    Fetches several random floats between 0 and 1 from random.org
+
+    The numbers are requested in batches of up to RANDOM_BATCH_MAX per HTTP request.
+
+    Args:
+        count (int): The number of random numbers to fetch
+
+    Returns:
+        List[float]: The random numbers fetched from random.org
+
+    Raises:
+        ValueError: If the count is negative or the response from random.org is not a list of valid floats
+        RuntimeError: If a request to random.org fails
+    """
+    if count < 0:
+        raise ValueError(f"Invalid count: {count}. Count must not be negative.")
+
+    numbers: List[float] = []
+    while len(numbers) < count:
+        batch_size = min(RANDOM_BATCH_MAX, count - len(numbers))
+        url = f"https://www.random.org/decimal-fractions/?num={batch_size}&dec=2&col=1&format=plain&rnd=new"
+
+        try:
+            logger.info("Fetching %d random numbers from %s", batch_size, url)
+
+            response = http_get(url, timeout=5)
+            response.raise_for_status()
+
+        except requests.exceptions.Timeout:
+            logger.error("Request to random.org timed out.")
+            raise RuntimeError("Request to random.org timed out.")
+
+        except requests.exceptions.RequestException as e:
+            logger.error("Request to random.org failed: %s", e)
+            raise RuntimeError("Request to random.org failed: %s" % e)
+
+        lines = response.text.split()
+        try:
+            batch = [float(line) for line in lines]
+        except ValueError:
+            raise ValueError("Invalid response from random.org: %s" % response.text.strip()[:100])
+        if len(batch) != batch_size:
+            raise ValueError("Invalid response from random.org: expected %d numbers, got %d" % (batch_size, len(batch)))
+
+        numbers.extend(batch)
+
+    logger.info("Received %d random numbers", len(numbers))
+    return numbers
+
+
+class RandomPool:
+    """
+    A buffer of random numbers from random.org that refills itself in the background
+
+    Numbers are fetched in bulk. Once the pool is down to `low_water` numbers, a background
+    thread tops it back up to `size`, so callers only wait on the network when the pool
+    runs dry. If a refill fails, every caller waiting for it gets the refill's error, and
+    no caller waits longer than `wait_timeout` seconds.
+
+    Attributes:
+        size (int): The number of numbers the pool is filled to
+        low_water (int): The depth at which a refill starts
+        wait_timeout (float): The longest a caller waits on an empty pool, in seconds
+    """
+
+    def __init__(self, size: int, low_water: int, fetch: Optional[Callable[[int], List[float]]] = None,
+                 wait_timeout: float = RANDOM_POOL_WAIT_TIMEOUT):
+        if size < 1:
+            raise ValueError(f"Invalid pool size: {size}. Size must be at least 1.")
+        if not 0 <= low_water < size:
+            raise ValueError(f"Invalid low-water mark: {low_water}. Must be between 0 and {size - 1}.")
+
+        self.size = size
+        self.low_water = low_water
+        self.wait_timeout = wait_timeout
+        self._fetch = fetch or get_random_batch
+        self._numbers: deque = deque()
+        self._cond = threading.Condition()
+        self._refill_thread: Optional[threading.Thread] = None
+        self._refills_finished = 0  # counts refills that succeeded or failed, to tell waiters which one they saw
+        self._failure: Optional[tuple[int, Exception]] = None  # the last failed refill's number and error
+        self._stats = {"served": 0, "waits": 0, "refills": 0, "refill_failures": 0, "numbers_fetched": 0}
+        self._last_refill_latency: Optional[float] = None
+        self._total_refill_latency = 0.0
+
+    def get(self) -> float:
+        """
+        Takes a random number from the pool, waiting for a refill if it is empty
+
+        Returns:
+            float: The random number
+
+        Raises:
+            RuntimeError: If the pool is empty and the refill request fails, or no numbers arrive
+                          within `wait_timeout` seconds
+            ValueError: If the pool is empty and random.org returns an invalid response
+        """
+        with self._cond:
+            if not self._numbers:
+                self._stats["waits"] += 1
+                deadline = time.monotonic() + self.wait_timeout
+                self._start_refill()
+                waiting_for = self._refills_finished + 1
+                while not self._numbers:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        logger.error("Timed out waiting for the random pool to refill.")
+                        raise RuntimeError("Timed out waiting for random numbers from random.org.")
+                    self._cond.wait(remaining)
+                    if self._numbers or self._refills_finished < waiting_for:
+                        continue
+                    if self._failure is not None and self._failure[0] == waiting_for:
+                        raise self._failure[1]
+                    # the refill succeeded but other callers took its numbers
+                    self._start_refill()
+                    waiting_for = self._refills_finished + 1
+
+            self._stats["served"] += 1
+            number = self._numbers.popleft()
+            if len(self._numbers) <= self.low_water:
+                self._start_refill()
+            return number
+
+    def refill_async(self) -> None:
+        """
+        Starts a background refill unless one is already running
+        """
+        with self._cond:
+            self._start_refill()
+
+    def _start_refill(self) -> None:
+        # must be called with self._cond held
+        if self._refill_thread is not None:
+            return
+        self._refill_thread = threading.Thread(target=self._refill, args=(self.size - len(self._numbers),),
+                                               name="random-pool-refill", daemon=True)
+        self._refill_thread.start()
+
+    def _refill(self, count: int) -> None:
+        started = time.monotonic()
+        try:
+            numbers = self._fetch(count)
+        except Exception as e:
+            logger.error("Refilling the random pool failed: %s", e)
+            with self._cond:
+                self._stats["refill_failures"] += 1
+                self._refills_finished += 1
+                self._failure = (self._refills_finished, e)
+                self._refill_thread = None
+                self._cond.notify_all()
+            return
+
+        latency = time.monotonic() - started
+        with self._cond:
+            self._numbers.extend(numbers)
+            self._stats["refills"] += 1
+            self._stats["numbers_fetched"] += len(numbers)
+            self._last_refill_latency = latency
+            self._total_refill_latency += latency
+            self._refills_finished += 1
+            self._refill_thread = None
+            self._cond.notify_all()
+        logger.info("Refilled the random pool with %d numbers in %.3fs", len(numbers), latency)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the pool's depth and refill metrics
+
+        Returns:
+            dict[str, Any]: depth, size, low_water, served, waits (calls that found the pool empty),
+                            refills, refill_failures, numbers_fetched, refilling, and the last and
+                            average refill latency in seconds
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "depth": len(self._numbers),
+                "size": self.size,
+                "low_water": self.low_water,
+                "refilling": self._refill_thread is not None,
+                "last_refill_latency": self._last_refill_latency,
+                "avg_refill_latency": self._total_refill_latency / stats["refills"] if stats["refills"] else None,
+            })
+        return stats
+
+
+_random_pool: Optional[RandomPool] = None
+_random_pool_lock = threading.Lock()
+
+
+def get_random_pool() -> Optional[RandomPool]:
+    """
+    Returns the process-wide random pool, creating it on first use
+
+    Returns:
+        Optional[RandomPool]: The pool, or None if RANDOM_POOL_SIZE is 0
+    """
+    global _random_pool
+    with _random_pool_lock:
+        if _random_pool is None and RANDOM_POOL_SIZE > 0:
+            _random_pool = RandomPool(RANDOM_POOL_SIZE, RANDOM_POOL_LOW_WATER)
+        return _random_pool
+
+def warm_random_pool() -> None:
+    """
+    Starts filling the random pool in the background so the first battle does not wait
+    """
+    pool = get_random_pool()
+    if pool is not None:
+        pool.refill_async()
+
+def close_random_pool() -> None:
+    """
+    Drops the process-wide random pool. The next call to get_random creates a new one.
+    """
+    global _random_pool
+    with _random_pool_lock:
+        _random_pool = None
+
+def get_random_pool_stats() -> dict[str, Any]:
+    """
+    Returns the metrics of the process-wide random pool
+
+    Returns:
+        dict[str, Any]: The pool's stats with enabled=True, or just enabled=False if the pool is disabled
+    """
+    pool = get_random_pool()
+    if pool is None:
+        return {"enabled": False}
+    return {"enabled": True, **pool.stats()}
@@ -0,0 +1,294 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urlencode
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class RedisCacheBackend:
+    """
+    A cached-response store shared by every process through Redis
+
+    It has the get/set/clear interface of TTLCache, which is the in-process store. Entries
+    are stored as JSON with an expiry, and Redis's maxmemory policy (allkeys-lru) bounds
+    the size. Redis errors are logged and treated as misses, so an unavailable
+    Redis slows requests down instead of failing them.
+
+    Its calls block on the network, so `blocking` tells ResponseCache to make them from a
+    thread pool when it is used from an event loop.
+
+    Attributes:
+        prefix (str): The prefix of every key written by this cache
+    """
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = "response-cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            raw = self.client.get(self.prefix + key)
+        except Exception as e:
+            logger.warning("Redis cache read failed: %s", e)
+            return default
+        return json.loads(raw) if raw is not None else default
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            self.client.set(self.prefix + key, json.dumps(value), px=max(1, int(ttl * 1000)))
+        except Exception as e:
+            logger.warning("Redis cache write failed: %s", e)
+
+    def clear(self) -> None:
+        try:
+            keys = list(self.client.scan_iter(match=self.prefix + "*"))
+            if keys:
+                self.client.delete(*keys)
+        except Exception as e:
+            logger.warning("Redis cache clear failed: %s", e)
+
+
+class _Call:
+    # an upstream fetch that concurrent requests for the same key wait on
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class _AsyncCall:
+    # an upstream fetch on the event loop, cancelled once nobody waits for it
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class ResponseCache:
+    """
+    Caches upstream responses per endpoint with stale-while-revalidate and request coalescing
+
+    A fresh entry (younger than its endpoint's TTL) is served as is. A stale entry (within
+    `stale_ttl` after that) is served immediately while one background fetch refreshes it.
+    On a miss, concurrent requests for the same key share a single upstream call. Failed
+    fetches are not cached.
+
+    `aget_or_fetch` does the same for coroutines. Its in-flight fetches are tracked per event
+    loop, so it should always be awaited on the same loop (AsyncHttpClient's). Backends with a
+    true `blocking` attribute (Redis) are called from the loop's default executor there, so
+    a slow cache round trip does not stall the other calls on the loop.
+
+    Attributes:
+        backend: The store, a TTLCache or a RedisCacheBackend
+        ttls (dict[str, float]): Seconds an entry stays fresh, per endpoint
+        default_ttl (float): The TTL of endpoints not in `ttls`
+        stale_ttl (float): Seconds a stale entry may still be served while it is refreshed
+    """
+
+    def __init__(self, backend, ttls: Optional[dict[str, float]] = None, default_ttl: float = 300.0,
+                 stale_ttl: float = 60.0):
+        self.backend = backend
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self._calls: dict[str, _Call] = {}
+        self._async_calls: dict[str, _AsyncCall] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "revalidations": 0, "errors": 0}
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[dict[str, Any]] = None) -> str:
+        """
+        Builds the cache key of a request: the endpoint and its parameters sorted by name
+
+        Args:
+            endpoint (str): The endpoint path, e.g. '/search/movie'
+            params (dict[str, Any], optional): The query parameters
+
+        Returns:
+            str: The cache key
+        """
+        return endpoint + ("?" + urlencode(sorted(params.items())) if params else "")
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get_or_fetch(self, endpoint: str, params: Optional[dict[str, Any]], fetch: Callable[[], Any]) -> Any:
+        """
+        Returns the cached response for a request, fetching it on a miss
+
+        Args:
+            endpoint (str): The endpoint path, which selects the TTL
+            params (dict[str, Any], optional): The normalized query parameters
+            fetch (Callable[[], Any]): Calls upstream and returns a JSON-serializable response
+
+        Returns:
+            Any: The response
+
+        Raises:
+            Exception: Whatever `fetch` raises on a miss
+        """
+        key = self.make_key(endpoint, params)
+        ttl = self.ttls.get(endpoint, self.default_ttl)
+
+        entry = self.backend.get(key)
+        if entry is not None:
+            age = time.time() - entry["stored_at"]
+            if age < ttl:
+                self._count("hits")
+                return entry["value"]
+            if age < ttl + self.stale_ttl:
+                self._count("stale_hits")
+                self._revalidate(key, ttl, fetch)
+                return entry["value"]
+
+        self._count("misses")
+        return self._fetch(key, ttl, fetch)
+
+    def _fetch(self, key: str, ttl: float, fetch: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self._stats["coalesced"] += 1
+
+        if leader:
+            self._run(key, ttl, fetch, call)
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.value
+
+    def _revalidate(self, key: str, ttl: float, fetch: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._calls:
+                return
+            call = self._calls[key] = _Call()
+            self._stats["revalidations"] += 1
+        threading.Thread(target=self._run, args=(key, ttl, fetch, call), name="response-cache-revalidate",
+                         daemon=True).start()
+
+    def _run(self, key: str, ttl: float, fetch: Callable[[], Any], call: _Call) -> None:
+        try:
+            call.value = fetch()
+            self.backend.set(key, {"value": call.value, "stored_at": time.time()}, ttl + self.stale_ttl)
+        except Exception as e:
+            logger.warning("Fetching %s failed: %s", key, e)
+            call.error = e
+            self._count("errors")
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def aget_or_fetch(self, endpoint: str, params: Optional[dict[str, Any]],
+                            fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns the cached response for a request, awaiting `fetch` on a miss
+
+        Concurrent misses for a key share one fetch. Cancelling a request only cancels the
+        fetch when no other request is waiting for it.
+
+        Args:
+            endpoint (str): The endpoint path, which selects the TTL
+            params (dict[str, Any], optional): The normalized query parameters
+            fetch (Callable[[], Awaitable[Any]]): Calls upstream and returns a JSON-serializable response
+
+        Returns:
+            Any: The response
+
+        Raises:
+            Exception: Whatever `fetch` raises on a miss
+        """
+        key = self.make_key(endpoint, params)
+        ttl = self.ttls.get(endpoint, self.default_ttl)
+
+        entry = await self._abackend(self.backend.get, key)
+        if entry is not None:
+            age = time.time() - entry["stored_at"]
+            if age < ttl:
+                self._count("hits")
+                return entry["value"]
+            if age < ttl + self.stale_ttl:
+                self._count("stale_hits")
+                if key not in self._async_calls:
+                    self._count("revalidations")
+                    self._start_async_call(key, ttl, fetch)
+                return entry["value"]
+
+        self._count("misses")
+        call = self._async_calls.get(key)
+        if call is None:
+            call = self._start_async_call(key, ttl, fetch)
+        else:
+            self._count("coalesced")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1:
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _start_async_call(self, key: str, ttl: float, fetch: Callable[[], Awaitable[Any]]) -> _AsyncCall:
+        task = asyncio.ensure_future(self._arun(key, ttl, fetch))
+        # background revalidations have no waiters; their errors are already logged
+        task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        call = self._async_calls[key] = _AsyncCall(task)
+        return call
+
+    async def _arun(self, key: str, ttl: float, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+            await self._abackend(self.backend.set, key, {"value": value, "stored_at": time.time()},
+                                 ttl + self.stale_ttl)
+            return value
+        except Exception as e:
+            logger.warning("Fetching %s failed: %s", key, e)
+            self._count("errors")
+            raise
+        finally:
+            self._async_calls.pop(key, None)
+
+    async def _abackend(self, method: Callable[..., Any], *args: Any) -> Any:
+        if not getattr(self.backend, "blocking", False):
+            return method(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+
+    def clear(self) -> None:
+        """
+        Drops every cached response
+        """
+        self.backend.clear()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the cache's counters
+
+        Returns:
+            dict[str, int]: hits, stale_hits, misses, coalesced (misses that waited on another
+                            request's fetch), revalidations and errors
+        """
+        with self._lock:
+            return dict(self._stats)
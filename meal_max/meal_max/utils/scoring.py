@@ -0,0 +1,79 @@
+from typing import Iterable
+
+import numpy as np
+
+
+DIFFICULTY_MODIFIERS = {"HIGH": 1, "MED": 2, "LOW": 3}
+
+# Difficulty codes index into _MODIFIERS_BY_CODE
+DIFFICULTY_CODES = {"HIGH": 0, "MED": 1, "LOW": 2}
+_MODIFIERS_BY_CODE = np.array([DIFFICULTY_MODIFIERS["HIGH"], DIFFICULTY_MODIFIERS["MED"], DIFFICULTY_MODIFIERS["LOW"]],
+                              dtype=np.float64)
+
+
+def meal_columns(meals: Iterable) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Splits meals into the columns used by the vectorized scoring functions
+
+    Args:
+        meals (Iterable[Meal]): The meals to convert
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: Prices, cuisine name lengths and difficulty codes
+
+    Raises:
+        KeyError: If a meal has an unknown difficulty
+    """
+    meals = list(meals)
+    prices = np.fromiter((meal.price for meal in meals), dtype=np.float64, count=len(meals))
+    cuisine_lengths = np.fromiter((len(meal.cuisine) for meal in meals), dtype=np.int64, count=len(meals))
+    difficulty_codes = np.fromiter((DIFFICULTY_CODES[meal.difficulty] for meal in meals), dtype=np.int8, count=len(meals))
+    return prices, cuisine_lengths, difficulty_codes
+
+def battle_scores(prices, cuisine_lengths, difficulty_codes) -> np.ndarray:
+    """
+    Calculates battle scores for whole columns of meals at once
+
+    Computes price * len(cuisine) - difficulty modifier in float64, one rounding per
+    operation, so every score is bit-for-bit identical to `BattleModel.get_battle_score`.
+
+    Args:
+        prices (array-like): Meal prices
+        cuisine_lengths (array-like): The lengths of the meals' cuisine names
+        difficulty_codes (array-like): Difficulty codes from DIFFICULTY_CODES
+
+    Returns:
+        np.ndarray: The float64 battle scores
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    cuisine_lengths = np.asarray(cuisine_lengths, dtype=np.float64)
+    return prices * cuisine_lengths - _MODIFIERS_BY_CODE[np.asarray(difficulty_codes)]
+
+def battle_outcomes(scores, first, second, random_numbers) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Resolves many pairings at once with the same rule as `BattleModel.battle`
+
+    The first meal of a pairing wins when the normalized score delta is greater than
+    the pairing's random number.
+
+    Args:
+        scores (array-like): Battle scores, indexed by `first` and `second`
+        first (array-like): Index of the first meal of each pairing
+        second (array-like): Index of the second meal of each pairing
+        random_numbers (array-like): One random number between 0 and 1 per pairing
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The deltas, and whether the first meal won each pairing
+
+    Raises:
+        ValueError: If the pairing arrays do not have the same length
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    first = np.asarray(first)
+    second = np.asarray(second)
+    random_numbers = np.asarray(random_numbers, dtype=np.float64)
+    if not first.shape == second.shape == random_numbers.shape:
+        raise ValueError("Pairings and random numbers must have the same length.")
+
+    deltas = np.abs(scores[first] - scores[second]) / 100
+    return deltas, deltas > random_numbers
@@ -1,7 +1,11 @@
+from collections import deque
 from contextlib import contextmanager
 import logging
 import os
 import sqlite3
+import threading
+import time
+from typing import Any, Optional
 
 from meal_max.utils.logger import configure_logger
 
@@ -13,6 +17,308 @@ configure_logger(logger)
 # load the db path from the environment with a default value
 DB_PATH = os.getenv("DB_PATH", "/app/sql/meal_max.db")
 
+# upper bound on bound parameters per IN (...) query
+SQL_IN_CHUNK_SIZE = 500
+
+# connection pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 5.0))
+# idle connections older than this (in seconds) are validated before being handed out
+DB_POOL_VALIDATE_AFTER = float(os.getenv("DB_POOL_VALIDATE_AFTER", 30.0))
+
+# PRAGMA profile applied to every new connection. WAL lets leaderboard readers run
+# while a battle result is being committed, and synchronous=NORMAL only fsyncs at
+# checkpoints instead of on every commit.
+PRAGMA_PROFILE = {
+    "journal_mode": os.getenv("DB_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("DB_SYNCHRONOUS", "NORMAL"),
+    "cache_size": int(os.getenv("DB_CACHE_SIZE", -16000)),  # negative values are in KiB
+    "mmap_size": int(os.getenv("DB_MMAP_SIZE", 268435456)),
+    "temp_store": os.getenv("DB_TEMP_STORE", "MEMORY"),
+    "busy_timeout": int(os.getenv("DB_BUSY_TIMEOUT", 5000)),  # milliseconds
+}
+
+# PRAGMA values cannot be bound as parameters, so keyword settings are checked against these
+_PRAGMA_CHOICES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+_PRAGMA_READBACK = {
+    "synchronous": {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"},
+    "temp_store": {0: "DEFAULT", 1: "FILE", 2: "MEMORY"},
+}
+
+
+def _pragma_value(name: str, value: Any) -> str:
+    if name in _PRAGMA_CHOICES:
+        value = str(value).upper()
+        if value not in _PRAGMA_CHOICES[name]:
+            raise ValueError(f"Invalid value for PRAGMA {name}: {value}. Must be one of {sorted(_PRAGMA_CHOICES[name])}.")
+        return value
+    if name in PRAGMA_PROFILE:
+        return str(int(value))
+    raise ValueError(f"Unsupported PRAGMA: {name}")
+
+
+def apply_pragmas(conn: sqlite3.Connection, profile: Optional[dict[str, Any]] = None) -> None:
+    """
+    Applies a PRAGMA profile to a connection.
+
+    Args:
+        conn (sqlite3.Connection): The connection to configure
+        profile (dict[str, Any], optional): The settings to apply. Defaults to PRAGMA_PROFILE.
+
+    Raises:
+        ValueError: If a setting is unsupported or has an invalid value
+        sqlite3.Error: If a PRAGMA cannot be applied
+    """
+    profile = PRAGMA_PROFILE if profile is None else profile
+    for name, value in profile.items():
+        conn.execute(f"PRAGMA {name} = {_pragma_value(name, value)};").fetchall()
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes available within the checkout timeout."""
+
+
+class ConnectionPool:
+    """
+    A bounded pool of SQLite connections with per-thread reuse.
+
+    A thread that already holds a connection gets the same connection back on
+    nested checkouts, so helpers calling each other share one connection.
+    Idle connections are handed out most-recently-used first and validated
+    with a cheap query when they have been idle for a while.
+
+    Attributes:
+        db_path (str): The path of the SQLite database file
+        size (int): The maximum number of open connections
+        timeout (float): How long a checkout waits for a free connection, in seconds
+        validate_after (float): Idle time after which a connection is validated, in seconds
+        pragmas (dict[str, Any]): The PRAGMA profile applied to each new connection
+    """
+
+    def __init__(self, db_path: str, size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT,
+                 validate_after: float = DB_POOL_VALIDATE_AFTER, pragmas: Optional[dict[str, Any]] = None):
+        if size < 1:
+            raise ValueError(f"Invalid pool size: {size}. Pool size must be at least 1.")
+
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.validate_after = validate_after
+        self.pragmas = PRAGMA_PROFILE if pragmas is None else pragmas
+
+        self._idle = deque()  # (connection, returned_at) pairs
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        self._local = threading.local()
+        self._stats = {
+            "created": 0,
+            "checkouts": 0,
+            "reused": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "discarded": 0,
+        }
+
+    def _create_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            apply_pragmas(conn, self.pragmas)
+        except (sqlite3.Error, ValueError):
+            conn.close()
+            raise
+        logger.info("Opened new pooled database connection to %s", self.db_path)
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1;").fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.warning("Discarding unhealthy pooled connection: %s", str(e))
+            return False
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._cond:
+            self._open -= 1
+            self._stats["discarded"] += 1
+            self._cond.notify()
+
+    def _acquire(self) -> sqlite3.Connection:
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool has been closed.")
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    self._stats["reused"] += 1
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    conn, returned_at = None, None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    logger.error("Timed out after %.2fs waiting for a database connection", self.timeout)
+                    raise PoolTimeoutError(f"Timed out after {self.timeout}s waiting for a database connection")
+                self._stats["waits"] += 1
+                self._cond.wait(remaining)
+
+        if conn is None:
+            try:
+                conn = self._create_connection()
+            except (sqlite3.Error, ValueError):
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._stats["created"] += 1
+            return conn
+
+        if time.monotonic() - returned_at > self.validate_after and not self._is_healthy(conn):
+            self._discard(conn)
+            return self._acquire()
+        return conn
+
+    def _release(self, conn: sqlite3.Connection, broken: bool = False) -> None:
+        if not broken and conn.in_transaction:
+            # never hand out a connection with someone else's half-finished transaction
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                broken = True
+
+        if broken or self._closed:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Checks out a connection for the duration of the with block.
+
+        Nested checkouts on the same thread yield the connection the thread already holds.
+
+        Yields:
+            sqlite3.Connection: A pooled connection to the database
+
+        Raises:
+            PoolTimeoutError: If no connection becomes available within the timeout
+            sqlite3.Error: If a new connection cannot be opened
+        """
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        with self._cond:
+            self._stats["checkouts"] += 1
+        self._local.conn = conn
+        self._local.depth = 1
+        broken = False
+        try:
+            yield conn
+        except sqlite3.DatabaseError as e:
+            # errors like "database disk image is malformed" leave the connection unusable
+            broken = not isinstance(e, (sqlite3.IntegrityError, sqlite3.OperationalError))
+            raise
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn, broken=broken)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns a snapshot of the pool's counters.
+
+        Returns:
+            dict[str, Any]: Pool size, open/idle/in-use connection counts and lifetime counters
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+            })
+        return stats
+
+    def close(self) -> None:
+        """
+        Closes all idle connections. Connections in use are closed when they are returned.
+        """
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            conn.close()
+        logger.info("Connection pool for %s closed.", self.db_path)
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Returns the process-wide connection pool, creating it on first use.
+
+    Returns:
+        ConnectionPool: The pool serving connections to DB_PATH
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+
+def close_pool() -> None:
+    """
+    Closes the process-wide connection pool. The next checkout creates a fresh one.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def get_pool_stats() -> dict[str, Any]:
+    """
+    Returns the counters of the process-wide connection pool.
+
+    Returns:
+        dict[str, Any]: See ConnectionPool.stats
+    """
+    return get_pool().stats()
+
 
 def check_database_connection():
     try:
@@ -26,6 +332,37 @@ def check_database_connection():
         logger.error(error_message)
         raise Exception(error_message) from e
 
+def check_database_pragmas() -> dict[str, Any]:
+    """
+    Reads back the PRAGMA settings active on a pooled connection and logs them.
+
+    Settings that differ from PRAGMA_PROFILE (e.g. WAL on an in-memory database)
+    are logged as warnings.
+
+    Returns:
+        dict[str, Any]: The active value of every setting in PRAGMA_PROFILE
+
+    Raises:
+        Exception: If the settings cannot be read
+    """
+    try:
+        with get_db_connection() as conn:
+            active = {}
+            for name in PRAGMA_PROFILE:
+                value = conn.execute(f"PRAGMA {name};").fetchone()[0]
+                active[name] = _PRAGMA_READBACK.get(name, {}).get(value, value)
+    except sqlite3.Error as e:
+        error_message = f"PRAGMA check error: {e}"
+        logger.error(error_message)
+        raise Exception(error_message) from e
+
+    for name, expected in PRAGMA_PROFILE.items():
+        actual = active[name]
+        if str(actual).upper() != str(expected).upper():
+            logger.warning("PRAGMA %s is %s, expected %s", name, actual, expected)
+    logger.info("Active database settings: %s", active)
+    return active
+
 def check_table_exists(tablename: str):
     try:
         conn = sqlite3.connect(DB_PATH)
@@ -45,14 +382,9 @@ def check_table_exists(tablename: str):
 ###################################################
 @contextmanager
 def get_db_connection():
-    conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
-        yield conn
+        with get_pool().connection() as conn:
+            yield conn
     except sqlite3.Error as e:
         logger.error("Database connection error: %s", str(e))
         raise e
-    finally:
-        if conn:
-            conn.close()
-            logger.info("Database connection closed.")
@@ -0,0 +1,115 @@
+from datetime import date, datetime
+import json
+import logging
+import os
+from typing import Any, Callable, Iterable, Iterator
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+STREAM_BATCH_ROWS = int(os.getenv("STREAM_BATCH_ROWS", 500))  # rows fetched from the database at a time
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", 100))  # rows written per chunk of the response
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(row: Any) -> str:
+    """
+    Serializes one row compactly, with dates and datetimes in ISO 8601
+
+    Args:
+        row (Any): The row, usually a dict
+
+    Returns:
+        str: The JSON document
+    """
+    return json.dumps(row, default=_default, separators=(",", ":"))
+
+def ndjson_chunks(rows: Iterable[Any], encode: Callable[[Any], str] = dumps,
+                  chunk_rows: int = STREAM_CHUNK_ROWS) -> Iterator[str]:
+    """
+    Serializes rows as newline-delimited JSON, one document per line
+
+    Args:
+        rows (Iterable[Any]): The rows; consumed lazily
+        encode (Callable[[Any], str], optional): Serializes one row
+        chunk_rows (int, optional): Lines per yielded chunk
+
+    Yields:
+        str: Chunks of complete lines
+    """
+    lines = []
+    for row in rows:
+        lines.append(encode(row))
+        if len(lines) >= chunk_rows:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+def json_array_chunks(rows: Iterable[Any], encode: Callable[[Any], str] = dumps,
+                      chunk_rows: int = STREAM_CHUNK_ROWS) -> Iterator[str]:
+    """
+    Serializes rows as one JSON array, written a few rows at a time
+
+    Args:
+        rows (Iterable[Any]): The rows; consumed lazily
+        encode (Callable[[Any], str], optional): Serializes one row
+        chunk_rows (int, optional): Rows per yielded chunk
+
+    Yields:
+        str: Consecutive pieces of the array; joined, they form a valid JSON document
+    """
+    separator = "["
+    items = []
+    for row in rows:
+        items.append(encode(row))
+        if len(items) >= chunk_rows:
+            yield separator + ",".join(items)
+            separator, items = ",", []
+    if items:
+        yield separator + ",".join(items)
+        separator = ","
+    yield "[]" if separator == "[" else "]"
+
+def stream_rows(rows: Iterable[Any], stream_format: str) -> tuple[Iterator[str], str]:
+    """
+    Serializes rows lazily in a streaming format
+
+    Errors raised by `rows` once the stream has started are logged and re-raised to the WSGI
+    server, which aborts the response; its status has already been sent, so clients see a
+    truncated document.
+
+    Args:
+        rows (Iterable[Any]): The rows; consumed lazily
+        stream_format (str): 'ndjson' or 'json' (a JSON array)
+
+    Returns:
+        tuple[Iterator[str], str]: The chunks of the body and its mimetype
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    if stream_format not in STREAM_FORMATS:
+        raise ValueError(f"Invalid format: {stream_format}. Must be one of {list(STREAM_FORMATS)}.")
+    chunks = ndjson_chunks(rows) if stream_format == "ndjson" else json_array_chunks(rows)
+
+    def logged(chunks: Iterator[str]) -> Iterator[str]:
+        try:
+            yield from chunks
+        except Exception as e:
+            logger.error("Streaming response failed: %s", str(e))
+            raise
+
+    return logged(chunks), STREAM_FORMATS[stream_format]
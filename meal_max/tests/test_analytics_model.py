@@ -0,0 +1,123 @@
+import json
+
+import numpy as np
+import pytest
+
+from meal_max.models import analytics_model
+from meal_max.models.analytics_model import (
+    get_win_probability_matrix,
+    iter_win_probability_rows,
+    stream_win_probabilities,
+    win_probabilities
+)
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal
+
+
+@pytest.fixture
+def meals():
+    """Fixture to provide meals with a spread of battle scores."""
+    return [
+        Meal(id=1, meal="Toast", cuisine="British", price=1.0, difficulty="LOW"),
+        Meal(id=2, meal="Pad Thai", cuisine="Thai", price=12.0, difficulty="MED"),
+        Meal(id=3, meal="Lasagna", cuisine="Italian", price=14.5, difficulty="HIGH"),
+        Meal(id=4, meal="Wagyu", cuisine="Japanese", price=99.0, difficulty="HIGH"),
+        Meal(id=5, meal="Injera", cuisine="Ethiopian", price=9.25, difficulty="LOW"),
+    ]
+
+@pytest.fixture
+def mock_get_all_meals(mocker, meals):
+    """Fixture to serve the sample meals as the whole catalog."""
+    return mocker.patch("meal_max.models.analytics_model.get_all_meals", return_value=meals)
+
+
+def test_win_probabilities_closed_form():
+    """Test the closed form against the battle rule for a two-decimal random number."""
+    deltas = np.array([0.0, 0.005, 0.01, 0.37, 0.999, 1.5])
+
+    assert win_probabilities(deltas, decimals=None).tolist() == [0.0, 0.005, 0.01, 0.37, 0.999, 1.0]
+    assert win_probabilities(deltas).tolist() == [0.0, 0.01, 0.01, 0.37, 1.0, 1.0]
+
+def test_win_probabilities_match_battle_rule(meals):
+    """Test that the exact matrix agrees with enumerating every random number get_random can return."""
+    battle_model = BattleModel()
+    rows = dict((meal.id, row) for meal, row in iter_win_probability_rows(meals, workers=0))
+
+    for meal_1 in meals:
+        for j, meal_2 in enumerate(meals):
+            if meal_1 is meal_2:
+                assert np.isnan(rows[meal_1.id][j])
+                continue
+            delta = abs(battle_model.get_battle_score(meal_1) - battle_model.get_battle_score(meal_2)) / 100
+            expected = sum(delta > float(f"0.{k:02d}") for k in range(100)) / 100
+            assert rows[meal_1.id][j] == expected
+
+def test_monte_carlo_is_close_to_exact(meals):
+    """Test that the simulation converges on the closed form."""
+    exact = np.array([row for _, row in iter_win_probability_rows(meals, workers=0)])
+    simulated = np.array([row for _, row in iter_win_probability_rows(meals, method="monte_carlo", trials=4000,
+                                                                         seed=411, workers=0)])
+
+    assert np.nanmax(np.abs(exact - simulated)) < 0.05
+
+def test_process_pool_matches_inline(meals):
+    """Test that chunked work in worker processes gives the same rows in the same order."""
+    inline = [(meal.id, row) for meal, row in iter_win_probability_rows(meals, method="monte_carlo", trials=50,
+                                                                          seed=7, workers=0, chunk_rows=2)]
+    pooled = [(meal.id, row) for meal, row in iter_win_probability_rows(meals, method="monte_carlo", trials=50,
+                                                                          seed=7, workers=2, chunk_rows=2)]
+
+    assert [meal_id for meal_id, _ in pooled] == [1, 2, 3, 4, 5]
+    for (_, expected), (_, actual) in zip(inline, pooled):
+        np.testing.assert_array_equal(expected, actual)
+
+def test_chunks_are_sized_by_cells(meals, mocker):
+    """Test that the rows per task shrink as the catalog widens."""
+    spy = mocker.spy(analytics_model, "_probability_rows")
+
+    rows = [meal.id for meal, _ in iter_win_probability_rows(meals, workers=0, chunk_cells=12)]
+    assert rows == [1, 2, 3, 4, 5]
+    assert [(call.args[1], call.args[2]) for call in spy.call_args_list] == [(0, 2), (2, 4), (4, 5)]
+
+    spy.reset_mock()
+    list(iter_win_probability_rows(meals, workers=0, chunk_cells=3))
+    assert spy.call_count == 5, "A chunk holds at least one row"
+
+def test_get_win_probability_matrix(mock_get_all_meals):
+    """Test the matrix for the whole catalog."""
+    result = get_win_probability_matrix(workers=0)
+
+    assert result["meal_ids"] == [1, 2, 3, 4, 5]
+    assert len(result["matrix"]) == 5
+    assert [result["matrix"][i][i] for i in range(5)] == [None] * 5
+    assert result["matrix"][3][0] == 1.0, "Wagyu prepped first should always beat Toast"
+
+def test_get_win_probability_matrix_for_meal_ids(mocker, meals):
+    """Test that selected meals are loaded with one batched lookup."""
+    get_meals_by_ids = mocker.patch("meal_max.models.analytics_model.get_meals_by_ids", return_value=meals[:2])
+
+    result = get_win_probability_matrix([1, 2], workers=0)
+
+    get_meals_by_ids.assert_called_once_with([1, 2])
+    assert result["meal_ids"] == [1, 2]
+
+def test_stream_win_probabilities(mock_get_all_meals):
+    """Test the NDJSON stream: a header line, then one line per meal."""
+    lines = list(stream_win_probabilities(workers=0))
+
+    assert all(line.endswith("\n") for line in lines)
+    documents = [json.loads(line) for line in lines]
+    assert documents[0] == {"meal_ids": [1, 2, 3, 4, 5]}
+    assert [document["id"] for document in documents[1:]] == [1, 2, 3, 4, 5]
+    assert documents[1]["win_probability"][0] is None
+
+def test_win_probability_errors(mocker, meals):
+    """Test errors for invalid options and too few meals."""
+    with pytest.raises(ValueError, match="Invalid method: guess"):
+        next(iter_win_probability_rows(meals, method="guess"))
+    with pytest.raises(ValueError, match="Invalid number of trials: 0"):
+        next(iter_win_probability_rows(meals, method="monte_carlo", trials=0))
+
+    mocker.patch("meal_max.models.analytics_model.get_all_meals", return_value=meals[:1])
+    with pytest.raises(ValueError, match="At least two meals are needed"):
+        get_win_probability_matrix()
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+
+import pytest
+
+from meal_max.utils.asgi_utils import ClientDisconnected, cancel_on_disconnect, run_lifespan, send_json
+from meal_max.utils.http_client import AsyncHttpClient, HttpClient
+
+
+def channel(*messages, disconnect_after=None):
+    """Builds an ASGI receive channel that yields the messages, then a disconnect after the delay (or never)."""
+    queue = list(messages)
+
+    async def receive():
+        if queue:
+            return queue.pop(0)
+        if disconnect_after is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    return receive
+
+REQUEST = {"type": "http.request", "body": b"", "more_body": False}
+
+
+def test_cancel_on_disconnect_returns_the_result():
+    """Test that work finishing while the client is connected is returned."""
+    async def work():
+        await asyncio.sleep(0.01)
+        return {"v": 1}
+
+    assert asyncio.run(cancel_on_disconnect(work(), channel(REQUEST))) == {"v": 1}
+
+def test_disconnect_cancels_the_work():
+    """Test that a client hanging up cancels the work done for it."""
+    cancelled = asyncio.Event()
+
+    async def request():
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(ClientDisconnected):
+            await cancel_on_disconnect(work(), channel(REQUEST, disconnect_after=0.01))
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+    asyncio.run(request())
+
+def test_disconnect_cancels_the_upstream_call():
+    """Test that the cancellation reaches the async HTTP client's event loop."""
+    client = AsyncHttpClient(recorder=HttpClient())
+    cancelled = threading.Event()
+
+    async def upstream():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def request():
+        await cancel_on_disconnect(client.run(upstream()), channel(REQUEST, disconnect_after=0.01))
+
+    try:
+        with pytest.raises(ClientDisconnected):
+            asyncio.run(request())
+        assert cancelled.wait(2)
+    finally:
+        client.close()
+
+def test_send_json():
+    """Test that a JSON response is sent with its status and length."""
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(send_json(send, b'{"v":1}\n', 200))
+
+    assert sent == [
+        {"type": "http.response.start", "status": 200,
+         "headers": [(b"content-type", b"application/json"), (b"content-length", b"8")]},
+        {"type": "http.response.body", "body": b'{"v":1}\n'},
+    ]
+
+def test_run_lifespan():
+    """Test that startup and shutdown are acknowledged."""
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(run_lifespan(channel({"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}), send))
+
+    assert [message["type"] for message in sent] == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
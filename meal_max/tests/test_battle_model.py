@@ -9,9 +9,9 @@ def battle_model():
     return BattleModel()
 
 @pytest.fixture
-def mock_update_meal_stats(mocker):
-    """Fixture to provide a mock for the update_meal_stats function."""
-    return mocker.patch("meal_max.models.battle_model.update_meal_stats")
+def mock_record_battle_result(mocker):
+    """Fixture to provide a mock for the record_battle_result function."""
+    return mocker.patch("meal_max.models.battle_model.record_battle_result")
 
 @pytest.fixture
 def sample_meal1():
@@ -58,10 +58,29 @@ def test_get_battle_score(battle_model, sample_meal1, sample_meal2):
     assert score1 == (sample_meal1.price * len(sample_meal1.cuisine)) - 1, "Score calculation for meal1 is incorrect"
     assert score2 == (sample_meal2.price * len(sample_meal2.cuisine)) - 3, "Score calculation for meal2 is incorrect"
 
+def test_get_battle_scores(battle_model, sample_meal1, sample_meal2):
+    """Test that batched scores match the per-combatant calculation."""
+    scores = battle_model.get_battle_scores([sample_meal2, sample_meal1])
+
+    assert scores == [battle_model.get_battle_score(sample_meal2), battle_model.get_battle_score(sample_meal1)]
+
+def test_battle_with_random_provider(mock_record_battle_result, sample_meal1, sample_meal2, mocker):
+    """Test that an injected random provider decides the battle."""
+    provider = mocker.Mock()
+    provider.random.return_value = 0.1
+    battle_model = BattleModel(random_provider=provider)
+    battle_model.prep_combatant(sample_meal1)
+    battle_model.prep_combatant(sample_meal2)
+
+    # The delta (0.2) is greater than 0.1, so meal1 wins
+    assert battle_model.battle() == sample_meal1.meal
+    provider.random.assert_called_once()
+    mock_record_battle_result.assert_called_once_with(sample_meal1.id, sample_meal2.id)
+
 @patch("meal_max.models.battle_model.get_random", return_value=0.5)
-@patch("meal_max.models.battle_model.update_meal_stats")
+@patch("meal_max.models.battle_model.record_battle_result")
 
-def test_battle(mock_update_meal_stats, mock_random, battle_model, sample_meal1, sample_meal2):
+def test_battle(mock_record_battle_result, mock_random, battle_model, sample_meal1, sample_meal2):
     """Test conducting a battle between two combatants."""
     battle_model.prep_combatant(sample_meal1)
     battle_model.prep_combatant(sample_meal2)
@@ -73,8 +92,7 @@ def test_battle(mock_update_meal_stats, mock_random, battle_model, sample_meal1,
 
     # Since the delta (20/100 = 0.2) is less than get_random (0.5), meal2 should win
     assert winner == sample_meal2.meal, "meal2 should be the winner based on battle logic"
-    mock_update_meal_stats.assert_any_call(sample_meal2.id, 'win')
-    mock_update_meal_stats.assert_any_call(sample_meal1.id, 'loss')
+    mock_record_battle_result.assert_called_once_with(sample_meal2.id, sample_meal1.id)
 
     assert sample_meal1 not in battle_model.get_combatants(), "Losing combatant should be removed from combatants list"
     assert sample_meal2 in battle_model.get_combatants(), "Winning combatant should remain in combatants list"
@@ -95,3 +113,14 @@ def test_clear_combatants(battle_model, sample_meal1, sample_meal2):
     battle_model.clear_combatants()
     assert len(battle_model.get_combatants()) == 0, "Combatants list should be empty after clearing"
     assert battle_model.get_combatants() == [], "Combatants list should be empty after clearing"
+
+def test_load_combatants(battle_model, sample_battle, sample_meal1):
+    """Test replacing the combatants with a saved list."""
+    battle_model.prep_combatant(sample_meal1)
+
+    battle_model.load_combatants(sample_battle)
+    assert battle_model.get_combatants() == sample_battle, "Loaded combatants should replace the current ones"
+
+    with pytest.raises(ValueError, match="Combatant list is full"):
+        battle_model.load_combatants(sample_battle + [sample_meal1])
+    assert battle_model.get_combatants() == sample_battle, "A rejected load should leave the combatants unchanged"
@@ -0,0 +1,176 @@
+import threading
+
+import pytest
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.battle_session_model import BattleSessionRegistry
+
+
+@pytest.fixture
+def store(mocker):
+    """Fixture to provide mocked session load/save functions."""
+    return mocker.Mock(), mocker.Mock()
+
+@pytest.fixture
+def session_exists(mocker):
+    """Fixture to report that every user has a session document."""
+    return mocker.Mock(return_value=True)
+
+@pytest.fixture
+def registry(store, session_exists):
+    """Fixture to provide a registry of three sessions without timed sweeps."""
+    load, save = store
+    registry = BattleSessionRegistry(max_sessions=3, idle_timeout=60, sweep_interval=3600, load=load, save=save,
+                                     exists=session_exists)
+    yield registry
+    registry.close()
+
+
+def test_login_gives_each_user_their_own_model(registry, store):
+    """Test that users get separate battle models, loaded once per login."""
+    load, _ = store
+
+    first = registry.login(1)
+    second = registry.login(2)
+
+    assert isinstance(first, BattleModel) and first is not second
+    assert registry.get(1) is first
+    assert registry.login(1) is first, "Logging in again should keep the state in memory"
+    assert load.call_count == 2
+
+def test_get_requires_login(registry):
+    """Test error when a user without a session is looked up."""
+    with pytest.raises(ValueError, match="No battle session for user with ID 7"):
+        registry.get(7)
+
+def test_logout_saves_and_drops_the_session(registry, store):
+    """Test that logout writes the user's model back and frees it."""
+    _, save = store
+    battle_model = registry.login(1)
+
+    registry.logout(1)
+
+    save.assert_called_once_with(1, battle_model)
+    assert len(registry) == 0
+    registry.logout(1)
+    save.assert_called_once()
+
+def test_logout_without_login(registry, store, session_exists):
+    """Test error when a user who never logged in logs out."""
+    _, save = store
+    session_exists.return_value = False
+
+    with pytest.raises(ValueError, match="User with ID 7 not found for logout."):
+        registry.logout(7)
+    session_exists.assert_called_once_with(7)
+    save.assert_not_called()
+
+def test_least_recently_used_sessions_are_evicted(registry, store):
+    """Test that logins past the limit write back the least recently used sessions."""
+    _, save = store
+    models = {user_id: registry.login(user_id) for user_id in (1, 2, 3)}
+    registry.get(1)
+
+    registry.login(4)
+
+    save.assert_called_once_with(2, models[2])
+    assert len(registry) == 3
+    assert registry.stats()["evictions"] == 1
+    with pytest.raises(ValueError):
+        registry.get(2)
+
+def test_idle_sessions_are_evicted(registry, store, mocker):
+    """Test that sessions idle past the timeout are written back."""
+    _, save = store
+    registry.login(1)
+    registry.login(2)
+    clock = mocker.patch("meal_max.models.battle_session_model.time.monotonic", return_value=1e9)
+    registry.get(2)
+    clock.return_value += 30
+
+    assert registry.evict_idle() == 1
+    save.assert_called_once()
+    assert save.call_args[0][0] == 1
+    assert registry.stats()["expirations"] == 1
+
+def test_write_back_errors_are_counted(registry, store):
+    """Test that a failed write-back does not stop other evictions."""
+    _, save = store
+    save.side_effect = [RuntimeError("Mongo is down"), None]
+    for user_id in (1, 2):
+        registry.login(user_id)
+
+    registry.idle_timeout = 1e-9
+    assert registry.evict_idle() == 2
+    assert registry.stats()["write_back_errors"] == 1
+
+def test_login_waits_for_write_back(store):
+    """Test that a login after an eviction loads the state saved by that eviction."""
+    load, save = store
+    saving, release = threading.Event(), threading.Event()
+    save.side_effect = lambda user_id, model: (saving.set(), release.wait())
+    registry = BattleSessionRegistry(max_sessions=1, idle_timeout=60, sweep_interval=3600, load=load, save=save)
+    registry.login(1)
+
+    evicting = threading.Thread(target=registry.login, args=(2,))
+    evicting.start()
+    assert saving.wait(2)
+    returning = threading.Thread(target=registry.login, args=(1,))
+    returning.start()
+    returning.join(0.1)
+    assert returning.is_alive(), "Login should wait for the pending write-back"
+
+    release.set()
+    evicting.join()
+    returning.join()
+    assert [call.args[0] for call in load.call_args_list] == [1, 2, 1]
+    save.side_effect = None
+    registry.close()
+
+def test_login_waits_for_logout(registry, store):
+    """Test that a login during a logout loads the state that logout saved."""
+    load, save = store
+    saving, release = threading.Event(), threading.Event()
+    save.side_effect = lambda user_id, model: (saving.set(), release.wait(2))
+    registry.login(1)
+
+    logging_out = threading.Thread(target=registry.logout, args=(1,))
+    logging_out.start()
+    assert saving.wait(2)
+    returning = threading.Thread(target=registry.login, args=(1,))
+    returning.start()
+    returning.join(0.1)
+    assert returning.is_alive(), "Login should wait for the logout's save"
+    assert load.call_count == 1
+
+    release.set()
+    logging_out.join()
+    returning.join()
+    assert load.call_count == 2
+    assert registry.stats()["logouts"] == 1
+    save.side_effect = None
+
+def test_failed_logout_does_not_block_logins(registry, store):
+    """Test that a logout whose save fails raises and still releases the user."""
+    load, save = store
+    save.side_effect = ValueError("User 1 not found for logout.")
+    registry.login(1)
+
+    with pytest.raises(ValueError, match="User 1 not found"):
+        registry.logout(1)
+
+    save.side_effect = None
+    registry.login(1)
+    assert load.call_count == 2
+    assert registry.stats()["logouts"] == 0
+
+def test_close_writes_back_everything(store):
+    """Test that closing the registry saves every resident session."""
+    load, save = store
+    registry = BattleSessionRegistry(max_sessions=5, idle_timeout=60, sweep_interval=3600, load=load, save=save)
+    registry.login(1)
+    registry.login(2)
+
+    registry.close()
+
+    assert sorted(call.args[0] for call in save.call_args_list) == [1, 2]
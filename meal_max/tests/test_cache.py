@@ -0,0 +1,72 @@
+import pytest
+
+from meal_max.utils.cache import TTLCache
+
+
+@pytest.fixture
+def clock(mocker):
+    """Fixture to control the cache's clock."""
+    now = [1000.0]
+    mocker.patch("meal_max.utils.cache.time.monotonic", side_effect=lambda: now[0])
+    return now
+
+
+def test_get_and_set():
+    """Test caching and retrieving values."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("b", "default") == "default"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted when the cache is full."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None, "b was least recently used and should be evicted"
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_expiry(clock):
+    """Test that entries expire after their TTL."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=120)
+
+    clock[0] += 61
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats()["expirations"] == 1
+
+def test_delete_and_discard_if():
+    """Test removing entries by key and by predicate."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 2)
+
+    assert cache.delete("a") == 1
+    assert cache.delete("a") is None
+    assert cache.discard_if(lambda key, value: value == 2) == 2
+    assert len(cache) == 0
+
+def test_disabled_cache():
+    """Test that a cache of size 0 stores nothing."""
+    cache = TTLCache(maxsize=0, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+def test_invalid_settings():
+    """Test errors for invalid cache settings."""
+    with pytest.raises(ValueError, match="Invalid cache size: -1"):
+        TTLCache(maxsize=-1, ttl=60)
+    with pytest.raises(ValueError, match="Invalid cache TTL: 0"):
+        TTLCache(maxsize=1, ttl=0)
@@ -0,0 +1,170 @@
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+
+import httpx
+import pytest
+import requests
+
+from meal_max.utils.http_client import AsyncHttpClient, HttpClient
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Answers with the queued status codes (200 once they run out) and records client ports."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.client_ports.append(self.client_address[1])
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        body = b"ok"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Fixture to run a local keep-alive HTTP server."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.client_ports = []
+    server.statuses = []
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def client():
+    """Fixture to provide a client that retries without sleeping."""
+    client = HttpClient(timeout=2, retries=2, backoff_factor=0, host_pool_sizes={"api.themoviedb.org": 20})
+    yield client
+    client.close()
+
+def url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def test_connections_are_kept_alive(server, client):
+    """Test that consecutive calls reuse one connection."""
+    for _ in range(3):
+        assert client.get(url(server)).text == "ok"
+
+    assert len(set(server.client_ports)) == 1, "All calls should share one kept-alive connection"
+
+def test_retries_with_backoff_on_server_errors(server, client):
+    """Test that 5xx responses are retried before the response is returned."""
+    server.statuses = [503, 502]
+
+    response = client.get(url(server))
+
+    assert response.status_code == 200
+    assert len(server.client_ports) == 3
+
+def test_gives_up_after_retries(server, client):
+    """Test that the last error response is returned once retries run out."""
+    server.statuses = [500, 500, 500]
+
+    assert client.get(url(server)).status_code == 500
+    assert client.stats()["127.0.0.1"]["errors"] == 1
+
+def test_connection_errors_raise_request_exceptions(client):
+    """Test that failures surface as requests exceptions, as callers expect."""
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get("http://127.0.0.1:9/")
+
+def test_latency_stats(server, client):
+    """Test per-host call counts and latencies."""
+    client.get(url(server))
+    client.get(url(server))
+
+    stats = client.stats()["127.0.0.1"]
+    assert stats["calls"] == 2
+    assert stats["errors"] == 0
+    assert 0 < stats["p50_latency"] <= stats["max_latency"]
+
+def test_sessions_are_thread_local_with_shared_pools(client):
+    """Test that each thread has its own session but connections are pooled per host for all threads."""
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(client._session()))
+    thread.start()
+    thread.join()
+
+    assert sessions[0] is not client._session()
+    assert sessions[0].get_adapter("https://example.com/") is client._session().get_adapter("https://example.com/")
+
+def test_per_host_pool_sizes(client):
+    """Test that configured hosts get their own connection pool size."""
+    session = client._session()
+
+    assert session.get_adapter("https://api.themoviedb.org/3/search/movie")._pool_maxsize == 20
+    assert session.get_adapter("https://www.random.org/")._pool_maxsize == 10
+
+
+######################################################
+#
+#    Async client
+#
+######################################################
+
+
+@pytest.fixture
+def async_client():
+    """Fixture to provide an async client that retries without sleeping and keeps its own stats."""
+    client = AsyncHttpClient(timeout=2, retries=2, backoff_factor=0, recorder=HttpClient())
+    yield client
+    client.close()
+
+
+def test_async_calls_share_kept_alive_connections(server, async_client):
+    """Test that calls from separate event loops reuse the client's connection."""
+    async def call():
+        response = await async_client.run(async_client.get(url(server)))
+        return response.text
+
+    for _ in range(3):
+        assert asyncio.run(call()) == "ok"
+
+    assert len(set(server.client_ports)) == 1
+
+def test_async_retries_on_server_errors(server, async_client):
+    """Test that 5xx responses are retried like the sync client does."""
+    server.statuses = [503, 502]
+
+    response = asyncio.run(async_client.run(async_client.get(url(server))))
+
+    assert response.status_code == 200
+    assert len(server.client_ports) == 3
+    assert async_client._recorder.stats()["127.0.0.1"]["calls"] == 1
+
+def test_async_calls_are_concurrent(server, async_client):
+    """Test that many calls can be in flight on the one loop."""
+    async def calls():
+        return await asyncio.gather(*(async_client.run(async_client.get(url(server))) for _ in range(5)))
+
+    assert [response.status_code for response in asyncio.run(calls())] == [200] * 5
+
+def test_async_connection_errors_raise(async_client):
+    """Test that failures surface as httpx errors."""
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(async_client.run(async_client.get("http://127.0.0.1:9/")))
+
+def test_async_timeout_cancels_the_call(async_client):
+    """Test that a run timeout cancels the coroutine on the client's loop."""
+    cancelled = threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(async_client.run(slow(), timeout=0.05))
+    assert cancelled.wait(2)
@@ -1,19 +1,40 @@
 from contextlib import contextmanager
+import dataclasses
+import pickle
 import re
 import sqlite3
 
 import pytest
 
+from meal_max.models import kitchen_model
 from meal_max.models.kitchen_model import (
+    FrozenMeal,
     Meal,
+    MealLookupError,
     create_meal,
+    create_meals_bulk,
+    clear_meal_cache,
     clear_meals,
     delete_meal,
+    disable_write_behind,
+    enable_write_behind,
+    flush_meal_stats,
+    get_all_meals,
     get_leaderboard,
+    get_leaderboard_page,
+    get_meal_cache_stats,
     get_meal_by_id,
     get_meal_by_name,
+    get_meals_by_ids,
+    get_meals_by_names,
+    invalidate_leaderboard,
+    iter_leaderboard,
+    meal_row_factory,
+    record_battle_result,
+    record_battle_results,
     update_meal_stats
 )
+from meal_max.utils.streaming import STREAM_BATCH_ROWS
 
 ######################################################
 #
@@ -43,8 +64,19 @@ def mock_cursor(mocker):
 
     mocker.patch("meal_max.models.kitchen_model.get_db_connection", mock_get_db_connection)
 
+    # Start every test with a cold materialized leaderboard and meal cache
+    invalidate_leaderboard()
+    clear_meal_cache()
+
     return mock_cursor  # Return the mock cursor so we can set expectations per test
 
+@pytest.fixture
+def write_behind(mock_cursor):
+    """Fixture to run a test with write-behind stats enabled and no timed flushes."""
+    enable_write_behind(flush_size=1000, flush_interval=3600)
+    yield
+    disable_write_behind()
+
 ######################################################
 #
 #    Add and delete
@@ -347,6 +379,71 @@ def test_update_meal_stats_deleted(mock_cursor):
     with pytest.raises(ValueError, match="Meal with ID 999 has been deleted"):
         update_meal_stats(999, "win")
 
+def test_record_battle_result(mock_cursor):
+    """Test recording a battle updates both meals with one statement and one commit."""
+    mock_cursor.fetchall.return_value = [(1, False), (2, False)]
+
+    record_battle_result(winner_id=1, loser_id=2)
+
+    expected_select = normalize_whitespace("SELECT id, deleted FROM meals WHERE id IN (?, ?)")
+    expected_update = normalize_whitespace("UPDATE meals SET battles = battles + 1, wins = wins + (id = ?) WHERE id IN (?, ?)")
+
+    assert mock_cursor.execute.call_count == 2, "Only one SELECT and one UPDATE should be executed"
+    assert normalize_whitespace(mock_cursor.execute.call_args_list[0][0][0]) == expected_select
+    assert mock_cursor.execute.call_args_list[0][0][1] == (1, 2)
+    assert normalize_whitespace(mock_cursor.execute.call_args_list[1][0][0]) == expected_update
+    assert mock_cursor.execute.call_args_list[1][0][1] == (1, 1, 2)
+
+def test_record_battle_result_not_found(mock_cursor):
+    """Test error when one of the meals in a battle does not exist."""
+    mock_cursor.fetchall.return_value = [(1, False)]
+
+    with pytest.raises(ValueError, match="Meal with ID 2 not found"):
+        record_battle_result(winner_id=1, loser_id=2)
+
+    assert mock_cursor.execute.call_count == 1, "No UPDATE should run when validation fails"
+
+def test_record_battle_result_deleted(mock_cursor):
+    """Test error when one of the meals in a battle has been deleted."""
+    mock_cursor.fetchall.return_value = [(1, True), (2, False)]
+
+    with pytest.raises(ValueError, match="Meal with ID 1 has been deleted"):
+        record_battle_result(winner_id=1, loser_id=2)
+
+def test_record_battle_result_same_meal(mock_cursor):
+    """Test error when a meal is recorded as battling itself."""
+    with pytest.raises(ValueError, match="Meal with ID 1 cannot battle itself"):
+        record_battle_result(winner_id=1, loser_id=1)
+
+    assert mock_cursor.execute.call_count == 0
+
+def test_record_battle_results(mock_cursor):
+    """Test recording many battles aggregates them into one batched UPDATE and one commit."""
+    mock_cursor.fetchall.return_value = [(1, False), (2, False), (3, False)]
+
+    assert record_battle_results([(1, 2), (1, 3), (2, 3)]) == 3
+
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == "SELECT id, deleted FROM meals WHERE id IN (?, ?, ?)"
+    expected_update = normalize_whitespace("UPDATE meals SET battles = battles + ?, wins = wins + ? WHERE id = ?")
+    assert normalize_whitespace(mock_cursor.executemany.call_args[0][0]) == expected_update
+    assert sorted(mock_cursor.executemany.call_args[0][1]) == [(2, 0, 3), (2, 1, 2), (2, 2, 1)]
+
+def test_record_battle_results_invalid_meals(mock_cursor):
+    """Test that no stats are written when any meal is missing or deleted."""
+    mock_cursor.fetchall.return_value = [(1, False), (2, True)]
+
+    with pytest.raises(MealLookupError, match="Meal with ID 2 has been deleted; Meal with ID 3 not found"):
+        record_battle_results([(1, 2), (1, 3)])
+
+    mock_cursor.executemany.assert_not_called()
+
+def test_record_battle_results_same_meal(mock_cursor):
+    """Test error when a result pairs a meal with itself."""
+    with pytest.raises(ValueError, match="Meal with ID 2 cannot battle itself"):
+        record_battle_results([(1, 2), (2, 2)])
+
+    assert mock_cursor.execute.call_count == 0
+
 ######################################################
 #
 #    Get Leaderboard
@@ -443,4 +540,527 @@ def test_get_leaderboard_invalid_parameter(mock_cursor):
         get_leaderboard(sort_by="invalid")
 
     # Ensure no SQL query was executed when an invalid parameter is provided
-    assert mock_cursor.execute.call_count == 0, "No SQL query should be executed for an invalid sort_by parameter."
\ No newline at end of file
+    assert mock_cursor.execute.call_count == 0, "No SQL query should be executed for an invalid sort_by parameter."
+######################################################
+#
+#    Write-behind stats
+#
+######################################################
+
+def test_update_meal_stats_write_behind(mock_cursor, write_behind):
+    """Test that buffered updates only validate the meal and are written on flush."""
+    mock_cursor.fetchone.return_value = ([False])
+
+    update_meal_stats(meal_id=1, result="win")
+    update_meal_stats(meal_id=1, result="loss")
+    mock_cursor.fetchall.return_value = [(1, False), (2, False)]
+    record_battle_result(winner_id=2, loser_id=1)
+
+    executed = [normalize_whitespace(call[0][0]) for call in mock_cursor.execute.call_args_list]
+    assert not any(sql.startswith("UPDATE") for sql in executed), "No UPDATE should run before a flush"
+
+    assert flush_meal_stats() == 2
+
+    expected_query = normalize_whitespace("UPDATE meals SET battles = battles + ?, wins = wins + ? WHERE id = ?")
+    assert normalize_whitespace(mock_cursor.executemany.call_args[0][0]) == expected_query
+    assert sorted(mock_cursor.executemany.call_args[0][1]) == [(1, 1, 2), (3, 1, 1)]
+
+    assert flush_meal_stats() == 0, "Nothing should be left to flush"
+
+def test_update_meal_stats_write_behind_not_found(mock_cursor, write_behind):
+    """Test that buffered updates still report meals that do not exist."""
+    mock_cursor.fetchone.return_value = None
+
+    with pytest.raises(ValueError, match="Meal with ID 999 not found"):
+        update_meal_stats(999, "win")
+
+    assert flush_meal_stats() == 0
+
+def test_flush_meal_stats_failure_keeps_deltas(mock_cursor, write_behind):
+    """Test that deltas survive a failed flush and are retried."""
+    mock_cursor.fetchone.return_value = ([False])
+    update_meal_stats(meal_id=1, result="win")
+
+    mock_cursor.executemany.side_effect = sqlite3.OperationalError("database is locked")
+    with pytest.raises(sqlite3.OperationalError):
+        flush_meal_stats()
+
+    mock_cursor.executemany.side_effect = None
+    assert flush_meal_stats() == 1
+    assert mock_cursor.executemany.call_args[0][1] == [(1, 1, 1)]
+
+def test_clear_meals_discards_pending_stats(mock_cursor, write_behind, mocker):
+    """Test that buffered stats of cleared meals are not flushed onto recreated meals."""
+    mock_cursor.fetchone.return_value = ([False])
+    mock_cursor.fetchall.return_value = [(1, False), (2, False)]
+    record_battle_result(winner_id=1, loser_id=2)
+    mocker.patch("builtins.open", mocker.mock_open(read_data="CREATE TABLE meals ..."))
+
+    clear_meals()
+    create_meal(meal="Curry", cuisine="Indian", price=10.99, difficulty="MED")
+    create_meal(meal="Tacos", cuisine="Mexican", price=8.99, difficulty="LOW")
+
+    assert flush_meal_stats() == 0
+    mock_cursor.executemany.assert_not_called()
+
+def test_get_leaderboard_merges_pending_stats(mock_cursor, write_behind):
+    """Test that the leaderboard includes battle results that have not been flushed."""
+    mock_cursor.fetchone.return_value = ([False])
+    update_meal_stats(meal_id=1, result="win")
+    update_meal_stats(meal_id=3, result="win")
+    update_meal_stats(meal_id=3, result="win")
+    update_meal_stats(meal_id=3, result="win")
+
+    mock_cursor.fetchall.side_effect = [
+        [(1, "Burger", "American", 9.99, "LOW", 2, 1, 0.5)],
+        [(3, "Lasagna", "Italian", 12.99, "MED", 0, 0)],
+    ]
+
+    leaderboard = get_leaderboard(sort_by="wins")
+
+    assert leaderboard == [
+        {"id": 3, "meal": "Lasagna", "cuisine": "Italian", "price": 12.99, "difficulty": "MED", "battles": 3, "wins": 3, "win_pct": 100.0},
+        {"id": 1, "meal": "Burger", "cuisine": "American", "price": 9.99, "difficulty": "LOW", "battles": 3, "wins": 2, "win_pct": 66.7},
+    ]
+    assert mock_cursor.execute.call_args[0][1] == [3], "Only meals missing from the base query should be loaded"
+
+######################################################
+#
+#    Materialized leaderboard
+#
+######################################################
+
+LEADERBOARD_ROWS = [
+    (1, "Burger", "American", 9.99, "LOW", 10, 7, 0.7),
+    (2, "Sushi", "Japanese", 15.99, "HIGH", 8, 6, 0.75),
+]
+
+def test_get_leaderboard_served_from_memory(mock_cursor):
+    """Test that repeated reads do not query the database again."""
+    mock_cursor.fetchall.return_value = LEADERBOARD_ROWS
+    get_leaderboard(sort_by="wins")
+
+    leaderboard = get_leaderboard(sort_by="win_pct")
+
+    assert [meal["id"] for meal in leaderboard] == [2, 1]
+    assert mock_cursor.execute.call_count == 1, "The leaderboard should only be loaded once"
+
+def test_record_battle_result_updates_leaderboard(mock_cursor):
+    """Test that recorded results are applied to the loaded leaderboard."""
+    mock_cursor.fetchall.return_value = LEADERBOARD_ROWS
+    get_leaderboard()
+
+    mock_cursor.fetchall.return_value = [(1, False), (2, False)]
+    record_battle_result(winner_id=2, loser_id=1)
+    record_battle_result(winner_id=2, loser_id=1)
+    mock_cursor.execute.reset_mock()
+
+    leaderboard = get_leaderboard()
+
+    assert [(meal["id"], meal["battles"], meal["wins"]) for meal in leaderboard] == [(2, 10, 8), (1, 12, 7)]
+    assert leaderboard[0]["win_pct"] == 80.0
+    mock_cursor.execute.assert_not_called()
+
+def test_update_meal_stats_ranks_new_meal(mock_cursor):
+    """Test that a meal's first battle adds it to the leaderboard with one targeted query."""
+    mock_cursor.fetchall.return_value = LEADERBOARD_ROWS
+    get_leaderboard()
+
+    mock_cursor.fetchone.return_value = ([False])
+    update_meal_stats(meal_id=3, result="win")
+
+    mock_cursor.fetchall.return_value = [(3, "Lasagna", "Italian", 12.99, "MED", 1, 1)]
+    leaderboard = get_leaderboard(sort_by="win_pct")
+
+    assert [meal["id"] for meal in leaderboard] == [3, 2, 1]
+    assert mock_cursor.execute.call_args[0][1] == [3]
+
+def test_delete_meal_removes_from_leaderboard(mock_cursor):
+    """Test that soft-deleted meals drop off the leaderboard."""
+    mock_cursor.fetchall.return_value = LEADERBOARD_ROWS
+    get_leaderboard()
+
+    mock_cursor.fetchone.return_value = ([False])
+    delete_meal(meal_id=1)
+
+    assert [meal["id"] for meal in get_leaderboard()] == [2]
+
+def test_get_leaderboard_limit_and_filters(mock_cursor):
+    """Test top-k and cuisine/difficulty filtered leaderboards."""
+    mock_cursor.fetchall.return_value = LEADERBOARD_ROWS + [(3, "Pizza", "Italian", 12.99, "LOW", 5, 5, 1.0)]
+
+    assert [meal["id"] for meal in get_leaderboard(limit=2)] == [1, 2]
+    assert [meal["id"] for meal in get_leaderboard(sort_by="win_pct", limit=1)] == [3]
+    assert [meal["id"] for meal in get_leaderboard(difficulty="LOW")] == [1, 3]
+    assert [meal["id"] for meal in get_leaderboard(cuisine="Japanese")] == [2]
+    assert get_leaderboard(cuisine="French") == []
+
+def test_get_leaderboard_invalid_limit(mock_cursor):
+    """Test error when the limit is not a positive integer."""
+    with pytest.raises(ValueError, match="Invalid limit: 0. Limit must be a positive integer."):
+        get_leaderboard(limit=0)
+
+def test_get_leaderboard_invalid_difficulty_filter(mock_cursor):
+    """Test error when filtering on an unknown difficulty."""
+    with pytest.raises(ValueError, match="Invalid difficulty level: EASY"):
+        get_leaderboard(difficulty="EASY")
+
+def test_get_leaderboard_page(mock_cursor):
+    """Test walking the leaderboard with keyset cursors."""
+    mock_cursor.fetchall.return_value = LEADERBOARD_ROWS + [(3, "Pizza", "Italian", 12.99, "LOW", 5, 5, 1.0)]
+
+    first = get_leaderboard_page(sort_by="win_pct", limit=2)
+    assert [meal["id"] for meal in first["leaderboard"]] == [3, 2]
+    assert first["leaderboard"][0]["win_pct"] == 100.0
+    assert first["next_cursor"] is not None
+
+    second = get_leaderboard_page(sort_by="win_pct", limit=2, cursor=first["next_cursor"])
+    assert [meal["id"] for meal in second["leaderboard"]] == [1]
+    assert second["next_cursor"] is None
+
+def test_get_leaderboard_page_invalid_cursor(mock_cursor):
+    """Test error when a cursor is malformed or belongs to another ordering."""
+    mock_cursor.fetchall.return_value = LEADERBOARD_ROWS
+    cursor = get_leaderboard_page(sort_by="wins", limit=1)["next_cursor"]
+
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        get_leaderboard_page(sort_by="win_pct", cursor=cursor)
+    with pytest.raises(ValueError, match="Invalid cursor: not-a-cursor"):
+        get_leaderboard_page(cursor="not-a-cursor")
+
+def test_iter_leaderboard_fetches_in_batches(mock_cursor):
+    """Test that the export reads the database lazily, one keyset query per batch."""
+    mock_cursor.fetchall.side_effect = [LEADERBOARD_ROWS[1:], LEADERBOARD_ROWS[:1], []]
+
+    entries = iter_leaderboard(sort_by="win_pct", batch_size=1)
+    assert mock_cursor.execute.call_count == 0, "Nothing should be read before the export is consumed"
+
+    assert [entry["id"] for entry in entries] == [2, 1]
+    first, second, third = [call[0] for call in mock_cursor.execute.call_args_list]
+    assert normalize_whitespace(first[0]).endswith("ORDER BY win_pct DESC, id LIMIT ?")
+    assert first[1] == [1]
+    assert "AND ((wins * 1.0 / battles) < ? OR ((wins * 1.0 / battles) = ? AND id > ?))" in normalize_whitespace(second[0])
+    assert second[1] == [0.75, 0.75, 2, 1]
+    assert third[1] == [0.7, 0.7, 1, 1]
+
+def test_iter_leaderboard_releases_the_connection_between_batches(mocker):
+    """Test that a paused export holds no connection, and ties are neither repeated nor skipped."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""CREATE TABLE meals (id INTEGER PRIMARY KEY, meal TEXT, cuisine TEXT, price REAL, difficulty TEXT,
+                    battles INTEGER, wins INTEGER, deleted BOOLEAN DEFAULT FALSE)""")
+    stats = [(4, 2), (4, 2), (2, 1), (5, 4), (3, 0), (4, 2), (1, 1)]
+    conn.executemany("INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins) VALUES (?, 'Thai', 9.99, 'LOW', ?, ?)",
+                     [(f"Meal {i}", battles, wins) for i, (battles, wins) in enumerate(stats)])
+    held = []
+
+    @contextmanager
+    def get_db_connection():
+        held.append(conn)
+        yield conn
+        held.pop()
+
+    mocker.patch("meal_max.models.kitchen_model.get_db_connection", get_db_connection)
+
+    for sort_by, key in (("wins", lambda e: (-e["wins"], e["id"])), ("win_pct", lambda e: (-e["wins"] / e["battles"], e["id"]))):
+        entries = []
+        for entry in iter_leaderboard(sort_by=sort_by, batch_size=2):
+            assert not held, "No connection should be held while the export is paused"
+            entries.append(entry)
+        assert [entry["id"] for entry in entries] == [entry["id"] for entry in sorted(entries, key=key)]
+        assert sorted(entry["id"] for entry in entries) == list(range(1, 8))
+    conn.close()
+
+def test_iter_leaderboard_filters(mock_cursor):
+    """Test that cuisine and difficulty filters are applied in SQL."""
+    mock_cursor.fetchall.side_effect = [[(1, "Burger", "American", 9.99, "LOW", 10, 7, 0.7)]]
+
+    entries = list(iter_leaderboard(cuisine="American", difficulty="LOW"))
+
+    assert entries == [{"id": 1, "meal": "Burger", "cuisine": "American", "price": 9.99, "difficulty": "LOW",
+                        "battles": 10, "wins": 7, "win_pct": 70.0}]
+    query, params = mock_cursor.execute.call_args[0]
+    assert "AND cuisine = ? AND difficulty = ? ORDER BY wins DESC, id LIMIT ?" in normalize_whitespace(query)
+    assert params == ["American", "LOW", STREAM_BATCH_ROWS]
+
+def test_iter_leaderboard_invalid_parameters(mock_cursor):
+    """Test that invalid arguments are rejected before the export starts."""
+    with pytest.raises(ValueError, match="Invalid sort_by parameter: invalid"):
+        iter_leaderboard(sort_by="invalid")
+    with pytest.raises(ValueError, match="Invalid difficulty level: EXTREME"):
+        iter_leaderboard(difficulty="EXTREME")
+
+######################################################
+#
+#    Bulk import
+#
+######################################################
+
+def test_create_meals_bulk(mock_cursor):
+    """Test that meals are inserted with one executemany per chunk."""
+    meals = (
+        {"meal": f"Meal {i}", "cuisine": "Italian", "price": 10.0 + i, "difficulty": "LOW"}
+        for i in range(5)
+    )
+
+    report = create_meals_bulk(meals, chunk_size=2)
+
+    assert report == {"inserted": 5, "duplicates": [], "invalid": []}
+    assert mock_cursor.executemany.call_count == 3
+    expected_query = normalize_whitespace("INSERT INTO meals (meal, cuisine, price, difficulty) VALUES (?, ?, ?, ?)")
+    assert normalize_whitespace(mock_cursor.executemany.call_args[0][0]) == expected_query
+    assert mock_cursor.executemany.call_args[0][1] == [("Meal 4", "Italian", 14.0, "LOW")]
+
+def test_create_meals_bulk_reports_bad_rows(mock_cursor):
+    """Test that invalid rows and duplicates are reported per row without aborting the batch."""
+    mock_cursor.fetchall.return_value = [("Lasagna",)]
+    meals = [
+        ("Lasagna", "Italian", 12.99, "LOW"),
+        ("Sushi", "Japanese", -1, "HIGH"),
+        {"meal": "Burger", "cuisine": "American", "price": 9.99, "difficulty": "EASY"},
+        {"meal": "Tacos", "cuisine": "Mexican", "price": 7.99},
+        "not a meal",
+        ("Pho", "Vietnamese", 11.5, "MED"),
+        ("Pho", "Vietnamese", 11.5, "MED"),
+    ]
+
+    report = create_meals_bulk(meals)
+
+    assert report["inserted"] == 1
+    assert report["duplicates"] == [{"row": 7, "meal": "Pho"}, {"row": 1, "meal": "Lasagna"}]
+    assert [invalid["row"] for invalid in report["invalid"]] == [2, 3, 4, 5]
+    assert report["invalid"][0]["error"] == "Invalid price: -1. Price must be a positive number."
+    assert report["invalid"][2]["error"] == "Missing field: difficulty"
+    assert mock_cursor.executemany.call_args[0][1] == [("Pho", "Vietnamese", 11.5, "MED")]
+
+def test_create_meals_bulk_large_chunks(mock_cursor):
+    """Test that chunks larger than one IN query check for duplicates with several queries."""
+    mock_cursor.fetchall.side_effect = [[("Meal 3",)], [("Meal 700",)]]
+    meals = ((f"Meal {i}", "Italian", 10.0, "LOW") for i in range(800))
+
+    report = create_meals_bulk(meals, chunk_size=1000)
+
+    lookups = [call[0][1] for call in mock_cursor.execute.call_args_list if call[0][0].startswith("SELECT meal FROM meals")]
+    assert [len(names) for names in lookups] == [500, 300]
+    assert report == {"inserted": 798, "invalid": [],
+                      "duplicates": [{"row": 4, "meal": "Meal 3"}, {"row": 701, "meal": "Meal 700"}]}
+    assert mock_cursor.executemany.call_count == 1
+
+def test_create_meals_bulk_invalid_chunk_size(mock_cursor):
+    """Test error when the chunk size is out of range."""
+    with pytest.raises(ValueError, match="Invalid chunk size: 0"):
+        create_meals_bulk([], chunk_size=0)
+
+######################################################
+#
+#    Meal cache
+#
+######################################################
+
+def test_get_meal_by_id_cached(mock_cursor):
+    """Test that repeated lookups by ID or name are served from the cache."""
+    mock_cursor.fetchone.return_value = (1, "Lasagna", "Italian", 12.99, "MED", False)
+    before = get_meal_cache_stats()
+
+    meal = get_meal_by_id(1)
+    assert get_meal_by_id(1) == meal
+    assert get_meal_by_name("Lasagna") == meal
+
+    assert mock_cursor.execute.call_count == 1, "Only the first lookup should query the database"
+    stats = get_meal_cache_stats()
+    assert stats["hits"] - before["hits"] == 2
+    assert stats["misses"] - before["misses"] == 1
+    assert stats["size"] == 2
+
+def test_cached_meals_are_copies(mock_cursor):
+    """Test that a caller changing its meal does not change what the cache serves."""
+    mock_cursor.fetchone.return_value = (1, "Lasagna", "Italian", 12.99, "MED", False)
+
+    meal = get_meal_by_id(1)
+    meal.price = 0.99
+    cached = get_meal_by_id(1)
+    cached.cuisine = "French"
+
+    assert isinstance(cached, Meal) and cached is not meal
+    assert get_meal_by_name("Lasagna") == Meal(1, "Lasagna", "Italian", 12.99, "MED")
+    assert get_meals_by_ids([1]) == [Meal(1, "Lasagna", "Italian", 12.99, "MED")]
+    assert mock_cursor.execute.call_count == 1
+
+def test_delete_meal_invalidates_name_after_id_eviction(mock_cursor, mocker):
+    """Test that deleting a meal removes its name key even when its ID key was evicted."""
+    mock_cursor.fetchone.return_value = (1, "Lasagna", "Italian", 12.99, "MED", False)
+    get_meal_by_name("Lasagna")
+    kitchen_model._meal_cache.delete(("id", 1))
+    discard_if = mocker.spy(kitchen_model._meal_cache, "discard_if")
+
+    mock_cursor.fetchone.return_value = ([False])
+    delete_meal(1)
+
+    assert get_meal_cache_stats()["size"] == 0
+    discard_if.assert_not_called()
+
+def test_get_meal_not_found_not_cached(mock_cursor):
+    """Test that failed lookups are not cached."""
+    mock_cursor.fetchone.return_value = None
+    with pytest.raises(ValueError, match="Meal with ID 1 not found"):
+        get_meal_by_id(1)
+
+    mock_cursor.fetchone.return_value = (1, "Lasagna", "Italian", 12.99, "MED", False)
+    assert get_meal_by_id(1).meal == "Lasagna"
+
+def test_delete_meal_invalidates_cache(mock_cursor):
+    """Test that deleting a meal removes it from the cache under both keys."""
+    mock_cursor.fetchone.return_value = (1, "Lasagna", "Italian", 12.99, "MED", False)
+    get_meal_by_name("Lasagna")
+
+    mock_cursor.fetchone.return_value = ([False])
+    delete_meal(1)
+
+    mock_cursor.fetchone.return_value = (1, "Lasagna", "Italian", 12.99, "MED", True)
+    with pytest.raises(ValueError, match="Meal with ID 1 has been deleted"):
+        get_meal_by_id(1)
+    with pytest.raises(ValueError, match="Meal with name Lasagna has been deleted"):
+        get_meal_by_name("Lasagna")
+
+def test_clear_meals_clears_cache(mock_cursor, mocker):
+    """Test that clearing the meals table empties the cache."""
+    mock_cursor.fetchone.return_value = (1, "Lasagna", "Italian", 12.99, "MED", False)
+    get_meal_by_id(1)
+    mocker.patch("builtins.open", mocker.mock_open(read_data="CREATE TABLE meals ..."))
+
+    clear_meals()
+
+    assert get_meal_cache_stats()["size"] == 0
+
+######################################################
+#
+#    Batched lookups
+#
+######################################################
+
+def test_get_meals_by_ids(mock_cursor):
+    """Test that several meals are fetched with one query and returned in request order."""
+    mock_cursor.fetchall.return_value = [
+        (1, "Lasagna", "Italian", 12.99, "MED", False),
+        (2, "Sushi", "Japanese", 15.99, "HIGH", False),
+    ]
+
+    meals = get_meals_by_ids([2, 1, 2])
+
+    assert meals == [
+        Meal(2, "Sushi", "Japanese", 15.99, "HIGH"),
+        Meal(1, "Lasagna", "Italian", 12.99, "MED"),
+        Meal(2, "Sushi", "Japanese", 15.99, "HIGH"),
+    ]
+    assert mock_cursor.execute.call_count == 1
+    expected_query = normalize_whitespace("SELECT id, meal, cuisine, price, difficulty, deleted FROM meals WHERE id IN (?, ?)")
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == expected_query
+    assert mock_cursor.execute.call_args[0][1] == [2, 1]
+
+def test_get_meals_by_ids_uses_cache(mock_cursor):
+    """Test that cached meals are not queried again."""
+    mock_cursor.fetchone.return_value = (1, "Lasagna", "Italian", 12.99, "MED", False)
+    get_meal_by_id(1)
+    mock_cursor.fetchall.return_value = [(2, "Sushi", "Japanese", 15.99, "HIGH", False)]
+
+    meals = get_meals_by_ids([1, 2])
+
+    assert [meal.id for meal in meals] == [1, 2]
+    assert mock_cursor.execute.call_args[0][1] == [2]
+
+def test_get_meals_by_ids_reports_each_key(mock_cursor):
+    """Test that missing and deleted meals are reported per ID."""
+    mock_cursor.fetchall.return_value = [
+        (1, "Lasagna", "Italian", 12.99, "MED", False),
+        (3, "Tacos", "Mexican", 7.99, "LOW", True),
+    ]
+
+    with pytest.raises(MealLookupError, match="Meal with ID 2 not found; Meal with ID 3 has been deleted") as exc_info:
+        get_meals_by_ids([1, 2, 3])
+
+    assert exc_info.value.errors == {2: "Meal with ID 2 not found", 3: "Meal with ID 3 has been deleted"}
+    assert isinstance(exc_info.value, ValueError)
+
+def test_get_meals_by_ids_chunks_large_requests(mock_cursor):
+    """Test that large requests are split into several IN queries."""
+    mock_cursor.fetchall.side_effect = lambda: [
+        (meal_id, f"Meal {meal_id}", "Italian", 10.0, "LOW", False)
+        for meal_id in mock_cursor.execute.call_args[0][1]
+    ]
+
+    meals = get_meals_by_ids(range(1, 1202))
+
+    assert len(meals) == 1201
+    assert mock_cursor.execute.call_count == 3
+
+def test_get_meals_by_names(mock_cursor):
+    """Test fetching meals by name and reporting missing names."""
+    mock_cursor.fetchall.return_value = [(2, "Sushi", "Japanese", 15.99, "HIGH", False)]
+
+    assert get_meals_by_names(["Sushi"]) == [Meal(2, "Sushi", "Japanese", 15.99, "HIGH")]
+
+    mock_cursor.fetchall.return_value = []
+    with pytest.raises(MealLookupError, match="Meal with name Burger not found"):
+        get_meals_by_names(["Burger"])
+
+
+######################################################
+#
+#    Meal representation
+#
+######################################################
+
+def test_meal_is_slotted():
+    """Test that meals do not carry a per-instance __dict__."""
+    meal = Meal(1, "Lasagna", "Italian", 12.99, "MED")
+
+    assert not hasattr(meal, "__dict__")
+    with pytest.raises(AttributeError):
+        meal.rating = 5
+
+def test_meal_validates_user_input():
+    """Test that the constructor still validates its arguments."""
+    with pytest.raises(ValueError, match="Price must be a positive value."):
+        Meal(1, "Lasagna", "Italian", -1.0, "MED")
+    with pytest.raises(ValueError, match="Difficulty must be 'LOW', 'MED', or 'HIGH'."):
+        FrozenMeal(1, "Lasagna", "Italian", 12.99, "EXTREME")
+
+def test_meal_from_row_skips_validation(mocker):
+    """Test that rows from the database are trusted."""
+    validate = mocker.patch.object(Meal, "__post_init__")
+
+    meal = Meal.from_row((1, "Lasagna", "Italian", 12.99, "MED", False))
+
+    assert meal == Meal(1, "Lasagna", "Italian", 12.99, "MED")
+    validate.assert_called_once()  # only by the comparison meal above
+
+def test_frozen_meal():
+    """Test that frozen meals are immutable, hashable and picklable."""
+    meal = FrozenMeal.from_row((1, "Lasagna", "Italian", 12.99, "MED"))
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        meal.price = 1.0
+    assert meal in {FrozenMeal(1, "Lasagna", "Italian", 12.99, "MED")}
+    assert pickle.loads(pickle.dumps(meal)) == meal
+
+def test_get_all_meals(mock_cursor):
+    """Test that the catalog is read through the Meal row factory."""
+    mock_cursor.fetchall.return_value = [Meal(1, "Lasagna", "Italian", 12.99, "MED")]
+
+    assert get_all_meals() == [Meal(1, "Lasagna", "Italian", 12.99, "MED")]
+
+    assert mock_cursor.row_factory is meal_row_factory
+    expected_query = normalize_whitespace("SELECT id, meal, cuisine, price, difficulty FROM meals WHERE deleted = FALSE ORDER BY id")
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == expected_query
+
+def test_meal_row_factory():
+    """Test that the row factory builds meals from query results."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE meals (id INTEGER, meal TEXT, cuisine TEXT, price REAL, difficulty TEXT)")
+    conn.execute("INSERT INTO meals VALUES (1, 'Lasagna', 'Italian', 12.99, 'MED')")
+    cursor = conn.cursor()
+    cursor.row_factory = meal_row_factory
+
+    cursor.execute("SELECT id, meal, cuisine, price, difficulty FROM meals")
+
+    assert cursor.fetchall() == [Meal(1, "Lasagna", "Italian", 12.99, "MED")]
+    conn.close()
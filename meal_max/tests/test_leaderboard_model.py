@@ -0,0 +1,102 @@
+import pytest
+
+from meal_max.models.leaderboard_model import Leaderboard
+
+
+@pytest.fixture
+def leaderboard():
+    """Fixture to provide a Leaderboard loaded with three meals and one without battles."""
+    leaderboard = Leaderboard()
+    leaderboard.load([
+        (1, "Burger", "American", 9.99, "LOW", 10, 7),
+        (2, "Sushi", "Japanese", 15.99, "HIGH", 8, 6),
+        (3, "Lasagna", "Italian", 12.99, "MED", 5, 3),
+        (4, "Tacos", "Mexican", 7.99, "LOW", 0, 0),
+    ])
+    return leaderboard
+
+
+def ids(entries):
+    return [entry["id"] for entry in entries]
+
+
+def test_load_ranks_meals_with_battles(leaderboard):
+    """Test that loading ranks meals by both orderings and skips meals without battles."""
+    assert len(leaderboard) == 3
+    assert 4 not in leaderboard
+    assert ids(leaderboard.top("wins")) == [1, 2, 3]
+    assert ids(leaderboard.top("win_pct")) == [2, 1, 3]
+    assert leaderboard.loaded_at is not None
+
+def test_top_limit(leaderboard):
+    """Test retrieving only the top k entries."""
+    assert ids(leaderboard.top("wins", limit=2)) == [1, 2]
+    assert leaderboard.top("wins", limit=0) == []
+
+def test_top_returns_copies(leaderboard):
+    """Test that callers cannot modify the ranked entries."""
+    leaderboard.top("wins")[0]["wins"] = 100
+    assert leaderboard.top("wins")[0]["wins"] == 7
+
+def test_apply_reorders(leaderboard):
+    """Test that stat deltas move a meal in both orderings."""
+    assert leaderboard.apply(3, battles=5, wins=5) is True
+
+    assert ids(leaderboard.top("wins")) == [3, 1, 2]
+    assert ids(leaderboard.top("win_pct")) == [3, 2, 1]
+    assert leaderboard.top("wins")[0]["battles"] == 10
+
+def test_apply_unknown_meal(leaderboard):
+    """Test that deltas for unranked meals are reported back to the caller."""
+    assert leaderboard.apply(4, battles=1, wins=1) is False
+    assert 4 not in leaderboard
+
+def test_ties_break_by_id(leaderboard):
+    """Test that meals with equal keys are ordered by ID."""
+    leaderboard.upsert((5, "Pho", "Vietnamese", 11.99, "MED", 10, 7))
+    assert ids(leaderboard.top("wins")) == [1, 5, 2, 3]
+
+def test_upsert_and_remove(leaderboard):
+    """Test adding, replacing and removing ranked meals."""
+    leaderboard.upsert((4, "Tacos", "Mexican", 7.99, "LOW", 1, 1))
+    assert ids(leaderboard.top("win_pct")) == [4, 2, 1, 3]
+
+    leaderboard.upsert((4, "Tacos", "Mexican", 7.99, "LOW", 2, 0))
+    assert ids(leaderboard.top("win_pct")) == [2, 1, 3, 4]
+
+    leaderboard.remove(4)
+    leaderboard.remove(4)
+    assert ids(leaderboard.top("wins")) == [1, 2, 3]
+
+def test_invalidate(leaderboard):
+    """Test that invalidating empties the leaderboard and marks it unloaded."""
+    leaderboard.invalidate()
+    assert len(leaderboard) == 0
+    assert leaderboard.top("wins") == []
+    assert leaderboard.loaded_at is None
+
+def test_page_walks_leaderboard(leaderboard):
+    """Test paging through the leaderboard with resume keys."""
+    entries, after = leaderboard.page("wins", limit=2)
+    assert ids(entries) == [1, 2]
+    assert after == (-6, 2)
+
+    entries, after = leaderboard.page("wins", limit=2, after=after)
+    assert ids(entries) == [3]
+    assert after is None, "The last page should not have a resume key"
+
+def test_page_resumes_after_stat_change(leaderboard):
+    """Test that a resume key stays valid when ranked meals change."""
+    entries, after = leaderboard.page("wins", limit=1)
+    leaderboard.apply(3, battles=1, wins=1)
+
+    entries, _ = leaderboard.page("wins", limit=5, after=after)
+    assert ids(entries) == [2, 3]
+
+def test_page_with_predicate(leaderboard):
+    """Test that a predicate filters entries without counting skipped ones."""
+    entries, after = leaderboard.page("win_pct", limit=1, predicate=lambda entry: entry["difficulty"] != "HIGH")
+    assert ids(entries) == [1]
+
+    entries, after = leaderboard.page("win_pct", limit=1, after=after, predicate=lambda entry: entry["difficulty"] != "HIGH")
+    assert ids(entries) == [3]
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from meal_max.utils.meal_loader import iter_csv_meals, iter_jsonl_meals, load_meals_file, main
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    """Fixture to provide a CSV file of meals."""
+    path = tmp_path / "meals.csv"
+    path.write_text("meal,cuisine,price,difficulty\nLasagna,Italian,12.99,MED\nSushi,Japanese,cheap,HIGH\n")
+    return str(path)
+
+@pytest.fixture
+def jsonl_file(tmp_path):
+    """Fixture to provide a JSONL file of meals with a blank and a malformed line."""
+    path = tmp_path / "meals.jsonl"
+    path.write_text(
+        json.dumps({"meal": "Burger", "cuisine": "American", "price": "9.99", "difficulty": "LOW"}) + "\n"
+        "\n"
+        "{not json\n"
+    )
+    return str(path)
+
+
+def test_iter_csv_meals(csv_file):
+    """Test streaming meals from a CSV file."""
+    assert list(iter_csv_meals(csv_file)) == [
+        {"meal": "Lasagna", "cuisine": "Italian", "price": 12.99, "difficulty": "MED"},
+        {"meal": "Sushi", "cuisine": "Japanese", "price": "cheap", "difficulty": "HIGH"},
+    ]
+
+def test_iter_jsonl_meals(jsonl_file):
+    """Test streaming meals from a JSONL file."""
+    assert list(iter_jsonl_meals(jsonl_file)) == [
+        {"meal": "Burger", "cuisine": "American", "price": 9.99, "difficulty": "LOW"},
+        "{not json",
+    ]
+
+def test_load_meals_file_picks_reader(mocker, csv_file):
+    """Test that the file extension selects the reader and rows are passed through lazily."""
+    mock_bulk = mocker.patch("meal_max.utils.meal_loader.create_meals_bulk", return_value={"inserted": 2})
+
+    assert load_meals_file(csv_file, chunk_size=100) == {"inserted": 2}
+
+    rows, = mock_bulk.call_args[0]
+    assert not isinstance(rows, list), "Rows should be streamed, not materialized"
+    assert mock_bulk.call_args[1] == {"chunk_size": 100}
+
+def test_load_meals_file_unsupported_format(tmp_path):
+    """Test error for unsupported file formats."""
+    with pytest.raises(ValueError, match="Unsupported file format: xml"):
+        load_meals_file(str(tmp_path / "meals.xml"))
+
+def test_main_exit_code(mocker, capsys, jsonl_file):
+    """Test that the CLI prints the report and fails when rows were skipped."""
+    mocker.patch(
+        "meal_max.utils.meal_loader.create_meals_bulk",
+        return_value={"inserted": 1, "duplicates": [], "invalid": [{"row": 2, "error": "Malformed row"}]},
+    )
+
+    assert main([jsonl_file]) == 1
+    assert json.loads(capsys.readouterr().out)["inserted"] == 1
@@ -1,6 +1,44 @@
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
 import pytest
 
-from meal_max.models.mongo_session_model import login_user, logout_user
+from meal_max.models import mongo_session_model
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal, MealLookupError
+from meal_max.models.mongo_session_model import (decode_combatants, disable_session_write_behind,
+                                                 enable_session_write_behind, encode_combatants,
+                                                 ensure_session_indexes, flush_sessions, login_user, logout_user,
+                                                 session_exists)
+
+MEALS = {
+    1: Meal(id=1, meal="Lasagna", cuisine="Italian", price=10.99, difficulty="HIGH"),
+    2: Meal(id=2, meal="Burger", cuisine="American", price=12.99, difficulty="LOW"),
+}
+
+@pytest.fixture(autouse=True)
+def forget_logins():
+    """Fixture to start every test without remembered logins."""
+    mongo_session_model._loaded_combatants.clear()
+    yield
+    mongo_session_model._loaded_combatants.clear()
+
+@pytest.fixture(autouse=True)
+def mock_get_meals_by_ids(mocker):
+    """Fixture to serve the sample meals from the batched lookup; other IDs are deleted meals."""
+    def get_meals_by_ids(meal_ids):
+        errors = {meal_id: f"Meal with ID {meal_id} not found" for meal_id in meal_ids if meal_id not in MEALS}
+        if errors:
+            raise MealLookupError(errors)
+        return [MEALS[meal_id] for meal_id in meal_ids]
+
+    return mocker.patch("meal_max.models.mongo_session_model.get_meals_by_ids", side_effect=get_meals_by_ids)
+
+@pytest.fixture
+def write_behind():
+    """Fixture to run a test with write-behind sessions and no timed flushes."""
+    enable_session_write_behind(flush_size=1000, flush_interval=3600)
+    yield
+    disable_session_write_behind()
 
 @pytest.fixture
 def sample_user_id():
@@ -9,35 +47,44 @@ def sample_user_id():
 
 @pytest.fixture
 def sample_combatants():
-    return [{"meal_id": 1}, {"meal_id": 2}]  # Sample combatant data
+    return [MEALS[1], MEALS[2]]  # Sample combatant data
 
 
 def test_login_user_creates_session_if_not_exists(mocker, sample_user_id):
-    """Test login_user creates a session with no combatants if it does not exist."""
-    mock_find = mocker.patch("meal_max.clients.mongo_client.sessions_collection.find_one", return_value=None)
-    mock_insert = mocker.patch("meal_max.clients.mongo_client.sessions_collection.insert_one")
+    """Test login_user creates a session with no combatants if it does not exist, in one upsert."""
+    mock_upsert = mocker.patch(
+        "meal_max.clients.mongo_client.sessions_collection.find_one_and_update",
+        return_value={"combatants": {"v": 1, "ids": []}}
+    )
     mock_battle_model = mocker.Mock()
 
     login_user(sample_user_id, mock_battle_model)
 
-    mock_find.assert_called_once_with({"user_id": sample_user_id})
-    mock_insert.assert_called_once_with({"user_id": sample_user_id, "combatants": []})
-    mock_battle_model.clear_combatants.assert_not_called()
+    mock_upsert.assert_called_once_with(
+        {"user_id": sample_user_id},
+        {"$setOnInsert": {"combatants": {"v": 1, "ids": []}}},
+        projection={"_id": False, "combatants": True},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    mock_battle_model.load_combatants.assert_not_called()
     mock_battle_model.prep_combatant.assert_not_called()
 
-def test_login_user_loads_combatants_if_session_exists(mocker, sample_user_id, sample_combatants):
-    """Test login_user loads combatants if session exists."""
-    mock_find = mocker.patch(
-        "meal_max.clients.mongo_client.sessions_collection.find_one",
-        return_value={"user_id": sample_user_id, "combatants": sample_combatants}
+def test_login_user_loads_combatants_if_session_exists(mocker, sample_user_id, sample_combatants,
+                                                       mock_get_meals_by_ids):
+    """Test login_user loads combatants in bulk if session exists."""
+    mock_upsert = mocker.patch(
+        "meal_max.clients.mongo_client.sessions_collection.find_one_and_update",
+        return_value={"combatants": {"v": 1, "ids": [1, 2]}}
     )
     mock_battle_model = mocker.Mock()
 
     login_user(sample_user_id, mock_battle_model)
 
-    mock_find.assert_called_once_with({"user_id": sample_user_id})
-    mock_battle_model.clear_combatants.assert_called_once()
-    mock_battle_model.prep_combatant.assert_has_calls([mocker.call(combatant) for combatant in sample_combatants])
+    mock_upsert.assert_called_once()
+    mock_get_meals_by_ids.assert_called_once_with([1, 2])
+    mock_battle_model.load_combatants.assert_called_once_with(sample_combatants)
+    mock_battle_model.prep_combatant.assert_not_called()
 
 def test_logout_user_updates_combatants(mocker, sample_user_id, sample_combatants):
     """Test logout_user updates the combatants list in the session."""
@@ -49,7 +96,7 @@ def test_logout_user_updates_combatants(mocker, sample_user_id, sample_combatant
 
     mock_update.assert_called_once_with(
         {"user_id": sample_user_id},
-        {"$set": {"combatants": sample_combatants}},
+        {"$set": {"combatants": {"v": 1, "ids": [1, 2]}}},
         upsert=False
     )
     mock_battle_model.clear_combatants.assert_called_once()
@@ -65,6 +112,156 @@ def test_logout_user_raises_value_error_if_no_user(mocker, sample_user_id, sampl
 
     mock_update.assert_called_once_with(
         {"user_id": sample_user_id},
-        {"$set": {"combatants": sample_combatants}},
+        {"$set": {"combatants": {"v": 1, "ids": [1, 2]}}},
         upsert=False
-    )
\ No newline at end of file
+    )
+
+
+######################################################
+#
+#    Change detection and write-behind
+#
+######################################################
+
+
+def test_logout_user_skips_unchanged_session(mocker, sample_user_id):
+    """Test that logging out with the combatants loaded at login writes nothing."""
+    mocker.patch("meal_max.clients.mongo_client.sessions_collection.find_one_and_update",
+                 return_value={"combatants": {"v": 1, "ids": [1, 2]}})
+    mock_update = mocker.patch("meal_max.clients.mongo_client.sessions_collection.update_one")
+    mock_bulk = mocker.patch("meal_max.clients.mongo_client.sessions_collection.bulk_write")
+    battle_model = BattleModel()
+
+    login_user(sample_user_id, battle_model)
+    logout_user(sample_user_id, battle_model)
+    flush_sessions()
+
+    mock_update.assert_not_called()
+    mock_bulk.assert_not_called()
+    assert battle_model.get_combatants() == []
+
+def test_write_behind_is_off_until_enabled():
+    """Test that importing the module does not start buffering sessions."""
+    assert mongo_session_model._write_buffer is None
+    assert flush_sessions() == 0
+
+def test_logouts_are_coalesced_into_bulk_writes(mocker, write_behind, sample_combatants):
+    """Test that changed sessions are buffered, keeping each user's latest combatants."""
+    mocker.patch("meal_max.clients.mongo_client.sessions_collection.find_one_and_update",
+                 return_value={"combatants": {"v": 1, "ids": []}})
+    mock_update = mocker.patch("meal_max.clients.mongo_client.sessions_collection.update_one")
+    mock_bulk = mocker.patch("meal_max.clients.mongo_client.sessions_collection.bulk_write")
+    battle_model = BattleModel()
+
+    # user 1's second login loads the first meal from the buffer
+    for user_id, combatants in [(1, sample_combatants[:1]), (2, sample_combatants), (1, sample_combatants[1:])]:
+        login_user(user_id, battle_model)
+        for combatant in combatants:
+            battle_model.prep_combatant(combatant)
+        logout_user(user_id, battle_model)
+
+    mock_bulk.assert_not_called()
+    assert flush_sessions() == 2
+
+    operations = mock_bulk.call_args[0][0]
+    assert [(op._filter, op._doc) for op in operations] == [
+        ({"user_id": 1}, {"$set": {"combatants": {"v": 1, "ids": [1, 2]}}}),
+        ({"user_id": 2}, {"$set": {"combatants": {"v": 1, "ids": [1, 2]}}}),
+    ]
+    assert mock_bulk.call_args[1] == {"ordered": False}
+    mock_update.assert_not_called()
+
+def test_login_user_reads_buffered_session(mocker, write_behind, sample_user_id, sample_combatants):
+    """Test that a login sees the combatants of a logout that is not flushed yet."""
+    mock_upsert = mocker.patch("meal_max.clients.mongo_client.sessions_collection.find_one_and_update",
+                               return_value={"combatants": {"v": 1, "ids": []}})
+    mocker.patch("meal_max.clients.mongo_client.sessions_collection.bulk_write")
+    battle_model = BattleModel()
+    login_user(sample_user_id, battle_model)
+    battle_model.prep_combatant(sample_combatants[0])
+    logout_user(sample_user_id, battle_model)
+
+    login_user(sample_user_id, battle_model)
+
+    mock_upsert.assert_called_once()
+    assert battle_model.get_combatants() == sample_combatants[:1]
+
+def test_failed_flush_keeps_sessions(mocker, write_behind, sample_user_id, sample_combatants):
+    """Test that sessions stay buffered when the bulk write fails."""
+    mocker.patch("meal_max.clients.mongo_client.sessions_collection.find_one_and_update",
+                 return_value={"combatants": {"v": 1, "ids": []}})
+    mock_bulk = mocker.patch("meal_max.clients.mongo_client.sessions_collection.bulk_write",
+                             side_effect=[PyMongoError("primary stepped down"), None])
+    battle_model = BattleModel()
+    login_user(sample_user_id, battle_model)
+    battle_model.prep_combatant(sample_combatants[0])
+    logout_user(sample_user_id, battle_model)
+
+    with pytest.raises(PyMongoError):
+        flush_sessions()
+    assert flush_sessions() == 1
+    assert mock_bulk.call_count == 2
+
+def test_ensure_session_indexes(mocker):
+    """Test that the unique index on user_id is created."""
+    mock_create = mocker.patch("meal_max.clients.mongo_client.sessions_collection.create_index")
+
+    ensure_session_indexes()
+
+    mock_create.assert_called_once_with("user_id", unique=True, name="uq_sessions_user_id")
+
+def test_session_exists(mocker):
+    """Test that a session document is looked up by counting at most one."""
+    mock_count = mocker.patch("meal_max.clients.mongo_client.sessions_collection.count_documents", return_value=0)
+
+    assert not session_exists(1)
+    mock_count.return_value = 1
+    assert session_exists(1)
+
+    mock_count.assert_called_with({"user_id": 1}, limit=1)
+
+
+######################################################
+#
+#    Combatant encoding
+#
+######################################################
+
+
+def test_encode_combatants(sample_combatants):
+    """Test the compact encoding, with and without a snapshot of the meal fields."""
+    assert encode_combatants(sample_combatants, snapshot=False) == {"v": 1, "ids": [1, 2]}
+    assert encode_combatants(sample_combatants, snapshot=True) == {
+        "v": 1, "ids": [1, 2],
+        "meals": [["Lasagna", "Italian", 10.99, "HIGH"], ["Burger", "American", 12.99, "LOW"]],
+    }
+
+def test_decode_snapshot(sample_combatants, mock_get_meals_by_ids):
+    """Test that snapshots are restored from their stored fields after one existence check."""
+    encoded = encode_combatants(sample_combatants, snapshot=True)
+    encoded["meals"][0][2] = 9.99  # the price at logout, since changed in the meals table
+
+    assert decode_combatants(encoded) == [
+        Meal(id=1, meal="Lasagna", cuisine="Italian", price=9.99, difficulty="HIGH"), MEALS[2]
+    ]
+    mock_get_meals_by_ids.assert_called_once_with([1, 2])
+
+def test_decode_snapshot_drops_deleted_meals(sample_combatants):
+    """Test that snapshot meals deleted after logout are left out."""
+    combatants = [sample_combatants[0], Meal(id=99, meal="Tacos", cuisine="Mexican", price=8.5, difficulty="MED")]
+
+    assert decode_combatants(encode_combatants(combatants, snapshot=True)) == [MEALS[1]]
+
+def test_decode_drops_deleted_meals(mock_get_meals_by_ids):
+    """Test that meals deleted since the session was saved are left out."""
+    assert decode_combatants({"v": 1, "ids": [1, 99]}) == [MEALS[1]]
+
+def test_decode_legacy_sessions():
+    """Test that sessions stored before the format was versioned are still read."""
+    assert decode_combatants([{"meal_id": 2}, {"id": 1, "meal": "Lasagna"}]) == [MEALS[2], MEALS[1]]
+    assert decode_combatants(None) == []
+
+def test_decode_unknown_version():
+    """Test error when a session was written by a newer format."""
+    with pytest.raises(ValueError, match="Unsupported session format version: 2"):
+        decode_combatants({"v": 2, "ids": [1]})
@@ -0,0 +1,200 @@
+from datetime import datetime, timedelta
+
+from flask import Flask
+import httpx
+import pytest
+import requests
+
+from meal_max.db import db
+from meal_max.models.movie_model import Movie
+
+
+@pytest.fixture
+def app_context():
+    """Fixture to provide an app with an empty in-memory database."""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield
+        db.session.remove()
+
+@pytest.fixture
+def mock_details(mocker):
+    """Fixture to mock TMDB's movie details endpoint."""
+    return mocker.patch("meal_max.models.movie_model.get_movie_details",
+                        return_value={"id": 603, "title": "The Matrix", "overview": "...", "popularity": 80.5,
+                                      "release_date": "1999-03-30", "vote_average": 8.2})
+
+def tmdb_movie(movie_id, title, **fields):
+    return {"id": movie_id, "title": title, "adult": False, **fields}
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.exceptions.HTTPError(f"{status_code} error", response=response)
+
+def make_stale(movie_id, title):
+    Movie.upsert_many([tmdb_movie(movie_id, title)])
+    db.session.get(Movie, movie_id).fetched_on = datetime.utcnow() - timedelta(days=30)
+    db.session.commit()
+
+
+def test_upsert_many_inserts_movies(app_context):
+    """Test storing the movies of a search response."""
+    movies = Movie.upsert_many([tmdb_movie(603, "The Matrix", popularity=80.5), tmdb_movie(604, "The Matrix Reloaded")])
+
+    assert [movie.id for movie in movies] == [603, 604]
+    assert db.session.get(Movie, 603).to_dict() == {"id": 603, "title": "The Matrix", "overview": None,
+                                                     "release_date": None, "popularity": 80.5, "vote_average": None}
+
+def test_upsert_many_skips_records_without_id_or_title(app_context):
+    """Test that incomplete records are ignored."""
+    assert Movie.upsert_many([{"title": "No ID"}, {"id": 1}]) == []
+    assert Movie.query.count() == 0
+
+def test_upsert_many_updates_changed_movies(app_context):
+    """Test that changed metadata is refreshed."""
+    Movie.upsert_many([tmdb_movie(603, "The Matrix", popularity=80.5)])
+
+    Movie.upsert_many([tmdb_movie(603, "The Matrix", popularity=90.0)])
+
+    assert db.session.get(Movie, 603).popularity == 90.0
+
+def test_upsert_many_skips_unchanged_fresh_movies(app_context, mocker):
+    """Test that replaying a response writes nothing."""
+    Movie.upsert_many([tmdb_movie(603, "The Matrix")])
+    commit = mocker.spy(db.session, "commit")
+
+    Movie.upsert_many([tmdb_movie(603, "The Matrix")])
+
+    commit.assert_not_called()
+
+def test_get_or_fetch_uses_fresh_local_metadata(app_context, mock_details):
+    """Test that a known, fresh movie is validated without calling TMDB."""
+    Movie.upsert_many([tmdb_movie(603, "The Matrix")])
+
+    assert Movie.get_or_fetch(603).title == "The Matrix"
+    mock_details.assert_not_called()
+
+def test_get_or_fetch_fetches_unknown_movies(app_context, mock_details):
+    """Test that an unknown movie is fetched from TMDB and stored."""
+    movie = Movie.get_or_fetch(603)
+
+    assert movie.popularity == 80.5
+    mock_details.assert_called_once_with(603)
+    assert db.session.get(Movie, 603) is not None
+
+def test_get_or_fetch_refreshes_stale_movies(app_context, mock_details):
+    """Test that a stale movie is re-fetched."""
+    Movie.upsert_many([tmdb_movie(603, "Matrix")])
+    db.session.get(Movie, 603).fetched_on = datetime.utcnow() - timedelta(days=30)
+    db.session.commit()
+
+    assert Movie.get_or_fetch(603).title == "The Matrix"
+    assert db.session.get(Movie, 603).is_fresh()
+
+def test_get_or_fetch_invalid_movie(app_context, mock_details):
+    """Test that a movie TMDB does not know is rejected."""
+    mock_details.side_effect = http_error(404)
+
+    with pytest.raises(ValueError, match="Movie with ID 999 not found"):
+        Movie.get_or_fetch(999)
+
+def test_get_or_fetch_serves_stale_movies_when_tmdb_is_down(app_context, mock_details):
+    """Test that stale metadata is used when TMDB cannot be reached."""
+    Movie.upsert_many([tmdb_movie(603, "Matrix")])
+    db.session.get(Movie, 603).fetched_on = datetime.utcnow() - timedelta(days=30)
+    db.session.commit()
+    mock_details.side_effect = requests.exceptions.ConnectionError("TMDB is down")
+
+    assert Movie.get_or_fetch(603).title == "Matrix"
+
+@pytest.mark.parametrize("status_code", [401, 429, 503])
+def test_get_or_fetch_serves_stale_movies_on_tmdb_errors(app_context, mock_details, status_code):
+    """Test that TMDB errors other than 404 do not reject a movie known locally."""
+    make_stale(603, "Matrix")
+    mock_details.side_effect = http_error(status_code)
+
+    assert Movie.get_or_fetch(603).title == "Matrix"
+
+def test_get_or_fetch_unknown_movie_on_tmdb_errors(app_context, mock_details):
+    """Test that a TMDB error other than 404 is not reported as an invalid movie."""
+    mock_details.side_effect = http_error(503)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        Movie.get_or_fetch(603)
+
+def test_get_or_fetch_unknown_movie_when_tmdb_is_down(app_context, mock_details):
+    """Test that an unknown movie cannot be validated without TMDB."""
+    mock_details.side_effect = requests.exceptions.ConnectionError("TMDB is down")
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        Movie.get_or_fetch(603)
+
+
+######################################################
+#
+#    Bulk lookups
+#
+######################################################
+
+
+@pytest.fixture
+def mock_details_async(mocker):
+    """Fixture to mock TMDB's movie details endpoint for concurrent lookups."""
+    async def details(movie_id):
+        if movie_id == 999:
+            request = httpx.Request("GET", "https://api.themoviedb.org/3/movie/999")
+            raise httpx.HTTPStatusError("404", request=request, response=httpx.Response(404, request=request))
+        if movie_id == 500:
+            raise httpx.ConnectError("TMDB is down")
+        if movie_id == 503:
+            request = httpx.Request("GET", "https://api.themoviedb.org/3/movie/503")
+            raise httpx.HTTPStatusError("503", request=request, response=httpx.Response(503, request=request))
+        return {"id": movie_id, "title": f"Movie {movie_id}"}
+
+    return mocker.patch("meal_max.models.movie_model.get_movie_details_async", side_effect=details)
+
+
+def test_get_or_fetch_many(app_context, mock_details_async):
+    """Test that only unknown movies are fetched, and failures are reported per movie."""
+    Movie.upsert_many([tmdb_movie(1, "Known")])
+
+    movies, errors = Movie.get_or_fetch_many([1, 2, 3, 999, 500, 2])
+
+    assert {movie_id: movie.title for movie_id, movie in movies.items()} == {1: "Known", 2: "Movie 2", 3: "Movie 3"}
+    assert errors == {999: "Movie with ID 999 not found",
+                      500: "Could not validate movie with ID 500: TMDB is unavailable"}
+    assert sorted(call.args[0] for call in mock_details_async.call_args_list) == [2, 3, 500, 999]
+
+def test_get_or_fetch_many_does_not_commit(app_context, mock_details_async, mocker):
+    """Test that fetched movies are left for the caller's transaction."""
+    commit = mocker.spy(db.session, "commit")
+
+    Movie.get_or_fetch_many([2])
+
+    commit.assert_not_called()
+    assert db.session.new
+
+def test_get_or_fetch_many_serves_stale_movies_when_tmdb_is_down(app_context, mock_details_async):
+    """Test that stale metadata is used when TMDB cannot be reached."""
+    Movie.upsert_many([tmdb_movie(500, "Stale")])
+    db.session.get(Movie, 500).fetched_on = datetime.utcnow() - timedelta(days=30)
+    db.session.commit()
+
+    movies, errors = Movie.get_or_fetch_many([500])
+
+    assert movies[500].title == "Stale"
+    assert errors == {}
+
+def test_get_or_fetch_many_tmdb_errors_are_not_invalid_movies(app_context, mock_details_async):
+    """Test that a TMDB error other than 404 uses the stale row, or reports TMDB as unavailable."""
+    _, errors = Movie.get_or_fetch_many([503])
+    assert errors == {503: "Could not validate movie with ID 503: TMDB is unavailable"}
+
+    make_stale(503, "Stale")
+    movies, errors = Movie.get_or_fetch_many([503])
+    assert movies[503].title == "Stale"
+    assert errors == {}
@@ -0,0 +1,168 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+from meal_max.utils import random_providers
+from meal_max.utils.random_providers import (
+    CircuitBreaker,
+    FallbackRandomProvider,
+    RandomProvider,
+    SeededRandomProvider,
+    SystemRandomProvider,
+    create_random_provider,
+    get_random,
+    get_random_provider_stats,
+    set_random_provider
+)
+
+
+class StubProvider(RandomProvider):
+    """A provider that returns fixed numbers or raises, and counts its calls."""
+
+    def __init__(self, name, number=0.5, error=None):
+        self.name = name
+        self.number = number
+        self.error = error
+        self.calls = 0
+
+    def random(self):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.number
+
+
+@pytest.fixture(autouse=True)
+def reset_provider():
+    """Fixture to rebuild the process-wide provider from configuration after each test."""
+    yield
+    set_random_provider(None)
+
+
+def test_provider_must_implement_random():
+    """Test that a provider without random() cannot be created."""
+    class Incomplete(RandomProvider):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_system_provider_uses_random_org_grid():
+    """Test that the CSPRNG backend draws from the same two-decimal grid as random.org."""
+    numbers = SystemRandomProvider().random_batch(500)
+
+    assert all(0 <= number < 1 for number in numbers)
+    assert all(round(number, 2) == number for number in numbers)
+
+def test_seeded_provider_is_replayable():
+    """Test that the same seed replays the same numbers."""
+    first = SeededRandomProvider(seed=411)
+    second = SeededRandomProvider(seed=411)
+
+    assert first.random_batch(50) == [second.random() for _ in range(50)]
+
+def test_create_random_provider():
+    """Test building backends by name."""
+    assert create_random_provider("system").name == "system"
+    assert create_random_provider("seeded", seed=1).seed == 1
+    assert [provider.name for provider in create_random_provider("fallback").providers] == ["random_org", "system"]
+
+    with pytest.raises(ValueError, match="Invalid random backend: dice"):
+        create_random_provider("dice")
+
+def test_get_random_uses_configured_backend(mocker):
+    """Test that the process-wide provider is built from RANDOM_BACKEND."""
+    mocker.patch.object(random_providers, "RANDOM_BACKEND", "seeded")
+    mocker.patch.object(random_providers, "RANDOM_SEED", 7)
+    set_random_provider(None)
+
+    assert get_random() == SeededRandomProvider(seed=7).random()
+    assert get_random_provider_stats() == {"backend": "seeded"}
+
+def test_fallback_uses_next_provider_on_failure():
+    """Test that a failing backend is skipped for the next one."""
+    primary = StubProvider("primary", error=RuntimeError("Request to random.org timed out."))
+    backup = StubProvider("backup", number=0.25)
+    provider = FallbackRandomProvider([primary, backup], failure_threshold=2, reset_timeout=60)
+
+    assert provider.random() == 0.25
+    assert provider.random() == 0.25
+    assert provider.random() == 0.25
+
+    assert primary.calls == 2, "The breaker should open after two failures"
+    assert provider.stats()[0] == {"name": "primary", "state": "open", "served": 0, "failures": 2}
+    assert provider.stats()[1]["served"] == 3
+
+def test_fallback_breaker_half_open(mocker):
+    """Test that an open breaker lets a call through after the reset timeout."""
+    clock = mocker.patch("meal_max.utils.random_providers.time.monotonic", return_value=100.0)
+    primary = StubProvider("primary", error=RuntimeError("down"))
+    backup = StubProvider("backup", number=0.25)
+    provider = FallbackRandomProvider([primary, backup], failure_threshold=1, reset_timeout=30)
+
+    provider.random()
+    clock.return_value = 131.0
+    primary.error = None
+
+    assert provider.random() == 0.5
+    assert provider.stats()[0]["state"] == "closed"
+
+def test_half_open_breaker_lets_one_probe_through(mocker):
+    """Test that concurrent calls on a half-open breaker send a single probe to the backend."""
+    clock = mocker.patch("meal_max.utils.random_providers.time.monotonic", return_value=100.0)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.return_value = 131.0
+
+    assert [breaker.allow() for _ in range(3)] == [True, False, False]
+    breaker.record_failure()
+    assert not breaker.allow(), "A failed probe opens the breaker again"
+
+    clock.return_value = 162.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert [breaker.allow() for _ in range(2)] == [True, True]
+
+def test_fallback_counts_are_thread_safe():
+    """Test that concurrent calls are all counted."""
+    provider = FallbackRandomProvider([StubProvider("primary"), StubProvider("backup")])
+
+    def call():
+        for _ in range(500):
+            provider.random()
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert provider.stats()[0]["served"] == 4000
+
+def test_fallback_counts_slow_calls_as_failures(mocker):
+    """Test that a backend that answers slowly is treated as failing."""
+    # only this thread's calls advance the clock; background threads also read time.monotonic
+    ticks = itertools.chain([0.0], itertools.repeat(5.0))
+    test_thread, real_monotonic = threading.current_thread(), time.monotonic
+    mocker.patch("meal_max.utils.random_providers.time.monotonic",
+                 side_effect=lambda: next(ticks) if threading.current_thread() is test_thread else real_monotonic())
+    provider = FallbackRandomProvider([StubProvider("slow"), StubProvider("backup")],
+                                      failure_threshold=1, slow_call_threshold=2.0)
+
+    assert provider.random() == 0.5, "A slow answer is still used"
+    assert provider.stats()[0]["state"] == "open"
+
+def test_fallback_all_providers_fail():
+    """Test the error when every backend fails."""
+    provider = FallbackRandomProvider([StubProvider("a", error=RuntimeError("down")),
+                                       StubProvider("b", error=ValueError("bad"))])
+
+    with pytest.raises(RuntimeError, match="All random providers failed: bad"):
+        provider.random()
+
+def test_circuit_breaker_invalid_threshold():
+    """Test error for a breaker that could never open."""
+    with pytest.raises(ValueError, match="Invalid failure threshold: 0"):
+        CircuitBreaker(failure_threshold=0)
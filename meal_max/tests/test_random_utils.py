@@ -1,18 +1,30 @@
+import threading
+import time
+
 import pytest
 import requests
 
-from meal_max.utils.random_utils import get_random
+from meal_max.utils import random_utils
+from meal_max.utils.random_utils import RandomPool, get_random, get_random_batch, get_random_pool_stats
 
 RANDOM_NUMBER = 0.42
 
+@pytest.fixture(autouse=True)
+def direct_random_org(mocker):
+    """Fixture to make get_random call random.org directly unless a test enables the pool."""
+    mocker.patch.object(random_utils, "RANDOM_POOL_SIZE", 0)
+    random_utils.close_random_pool()
+    yield
+    random_utils.close_random_pool()
+
 @pytest.fixture
 def mock_random_org(mocker):
-    # Patch the requests.get call
-    # requests.get returns an object, which we have replaced with a mock object
+    # Patch the shared HTTP client call
+    # http_get returns an object, which we have replaced with a mock object
     mock_response = mocker.Mock()
     # We are giving that object a text attribute
     mock_response.text = f"{RANDOM_NUMBER}"
-    mocker.patch("requests.get", return_value=mock_response)
+    mocker.patch("meal_max.utils.random_utils.http_get", return_value=mock_response)
     return mock_response
 
 def test_get_random(mock_random_org):
@@ -23,18 +35,18 @@ def test_get_random(mock_random_org):
     assert result == RANDOM_NUMBER, f"Expected random number {RANDOM_NUMBER}, but got {result}"
 
     # Ensure that the correct URL was called
-    requests.get.assert_called_once_with("https://www.random.org/decimal-fractions/?num=1&dec=2&col=1&format=plain&rnd=new", timeout=5)
+    random_utils.http_get.assert_called_once_with("https://www.random.org/decimal-fractions/?num=1&dec=2&col=1&format=plain&rnd=new", timeout=5)
 
 def test_get_random_request_failure(mocker):
     """Simulate  a request failure."""
-    mocker.patch("requests.get", side_effect=requests.exceptions.RequestException("Connection error"))
+    mocker.patch("meal_max.utils.random_utils.http_get", side_effect=requests.exceptions.RequestException("Connection error"))
 
     with pytest.raises(RuntimeError, match="Request to random.org failed: Connection error"):
         get_random()
 
 def test_get_random_timeout(mocker):
     """Simulate  a timeout."""
-    mocker.patch("requests.get", side_effect=requests.exceptions.Timeout)
+    mocker.patch("meal_max.utils.random_utils.http_get", side_effect=requests.exceptions.Timeout)
 
     with pytest.raises(RuntimeError, match="Request to random.org timed out."):
         get_random()
@@ -44,4 +56,171 @@ def test_get_random_invalid_response(mock_random_org):
     mock_random_org.text = "invalid_response"
 
     with pytest.raises(ValueError, match="Invalid response from random.org: invalid_response"):
-        get_random()
\ No newline at end of file
+        get_random()
+
+def test_get_random_batch(mocker):
+    """Test fetching several random numbers, split into random.org sized requests."""
+    mocker.patch("meal_max.utils.random_utils.RANDOM_BATCH_MAX", 3)
+    first = mocker.Mock(text="0.1\n0.2\n0.3\n")
+    second = mocker.Mock(text="0.4\n0.5\n")
+    mocker.patch("meal_max.utils.random_utils.http_get", side_effect=[first, second])
+
+    assert get_random_batch(5) == [0.1, 0.2, 0.3, 0.4, 0.5]
+    assert random_utils.http_get.call_args_list == [
+        mocker.call("https://www.random.org/decimal-fractions/?num=3&dec=2&col=1&format=plain&rnd=new", timeout=5),
+        mocker.call("https://www.random.org/decimal-fractions/?num=2&dec=2&col=1&format=plain&rnd=new", timeout=5),
+    ]
+
+def test_get_random_batch_empty(mocker):
+    """Test that no request is made for zero numbers."""
+    mocker.patch("meal_max.utils.random_utils.http_get")
+
+    assert get_random_batch(0) == []
+    random_utils.http_get.assert_not_called()
+
+def test_get_random_batch_short_response(mock_random_org):
+    """Simulate a response with fewer numbers than requested."""
+    with pytest.raises(ValueError, match="expected 2 numbers, got 1"):
+        get_random_batch(2)
+
+def test_get_random_batch_request_failure(mocker):
+    """Simulate a request failure during a batch."""
+    mocker.patch("meal_max.utils.random_utils.http_get", side_effect=requests.exceptions.RequestException("Connection error"))
+
+    with pytest.raises(RuntimeError, match="Request to random.org failed: Connection error"):
+        get_random_batch(3)
+
+def wait_for_refill():
+    for thread in threading.enumerate():
+        if thread.name == "random-pool-refill":
+            thread.join()
+
+def test_random_pool_serves_from_memory():
+    """Test that the pool fetches in bulk and serves numbers without further requests."""
+    fetch_counts = []
+    pool = RandomPool(size=10, low_water=2, fetch=lambda count: fetch_counts.append(count) or [0.5] * count)
+
+    assert [pool.get() for _ in range(7)] == [0.5] * 7
+
+    assert fetch_counts == [10]
+    stats = pool.stats()
+    assert stats["depth"] == 3
+    assert stats["served"] == 7
+    assert stats["waits"] == 1, "Only the first call should wait for the network"
+    assert stats["refills"] == 1
+    assert stats["last_refill_latency"] is not None
+
+def test_random_pool_refills_at_low_water():
+    """Test that a refill starts in the background once the low-water mark is reached."""
+    release = threading.Event()
+    fetch_counts = []
+
+    def fetch(count):
+        fetch_counts.append(count)
+        if len(fetch_counts) > 1:
+            release.wait()
+        return [0.25] * count
+
+    pool = RandomPool(size=4, low_water=2, fetch=fetch)
+    pool.get()
+    pool.get()
+    assert pool.stats()["refilling"], "A refill should be running at the low-water mark"
+    assert pool.get() == 0.25, "Numbers still in the pool should be served during a refill"
+
+    release.set()
+    wait_for_refill()
+    assert fetch_counts == [4, 2]
+    assert pool.stats()["depth"] == 3
+
+def test_random_pool_refill_failure():
+    """Test that a caller waiting on an empty pool gets the refill's error, and the next call retries."""
+    attempts = []
+
+    def fetch(count):
+        attempts.append(count)
+        if len(attempts) == 1:
+            raise RuntimeError("Request to random.org timed out.")
+        return [0.75] * count
+
+    pool = RandomPool(size=3, low_water=1, fetch=fetch)
+
+    with pytest.raises(RuntimeError, match="Request to random.org timed out."):
+        pool.get()
+    assert pool.get() == 0.75
+    assert pool.stats()["refill_failures"] == 1
+
+def test_random_pool_refill_failure_reaches_every_waiter():
+    """Test that every caller waiting on a failed refill gets its error, without another refill."""
+    attempts = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def fetch(count):
+        attempts.append(count)
+        started.set()
+        release.wait(2)
+        raise RuntimeError("Request to random.org timed out.")
+
+    pool = RandomPool(size=3, low_water=1, fetch=fetch)
+    errors = []
+
+    def waiter():
+        try:
+            pool.get()
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=waiter) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    assert started.wait(2)
+    while pool.stats()["waits"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert errors == ["Request to random.org timed out."] * 4
+    assert len(attempts) == 1
+
+def test_random_pool_wait_timeout():
+    """Test that a caller stops waiting on a refill that never finishes."""
+    release = threading.Event()
+
+    def fetch(count):
+        release.wait(2)
+        return [0.75] * count
+
+    pool = RandomPool(size=3, low_water=1, fetch=fetch, wait_timeout=0.05)
+
+    try:
+        with pytest.raises(RuntimeError, match="Timed out waiting for random numbers from random.org."):
+            pool.get()
+    finally:
+        release.set()
+
+def test_random_pool_invalid_settings():
+    """Test errors for invalid pool settings."""
+    with pytest.raises(ValueError, match="Invalid pool size: 0"):
+        RandomPool(size=0, low_water=0)
+    with pytest.raises(ValueError, match="Invalid low-water mark: 5"):
+        RandomPool(size=5, low_water=5)
+
+def test_get_random_uses_pool(mocker):
+    """Test that get_random is served from the process-wide pool when it is enabled."""
+    mocker.patch.object(random_utils, "RANDOM_POOL_SIZE", 3)
+    mocker.patch.object(random_utils, "RANDOM_POOL_LOW_WATER", 0)
+    mocker.patch("meal_max.utils.random_utils.http_get", return_value=mocker.Mock(text="0.1\n0.2\n0.3\n"))
+
+    assert [get_random() for _ in range(2)] == [0.1, 0.2]
+
+    random_utils.http_get.assert_called_once_with(
+        "https://www.random.org/decimal-fractions/?num=3&dec=2&col=1&format=plain&rnd=new", timeout=5)
+    stats = get_random_pool_stats()
+    assert stats["enabled"] is True
+    assert stats["served"] == 2
+    assert stats["depth"] == 1
+
+def test_get_random_pool_stats_disabled():
+    """Test the metrics when the pool is disabled."""
+    assert get_random_pool_stats() == {"enabled": False}
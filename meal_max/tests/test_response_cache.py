@@ -0,0 +1,261 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from meal_max.utils.cache import TTLCache
+from meal_max.utils.response_cache import RedisCacheBackend, ResponseCache
+
+
+@pytest.fixture
+def clock(mocker):
+    """Fixture to control the wall clock the cache ages entries by."""
+    now = [1000.0]
+    mocker.patch("meal_max.utils.response_cache.time.time", side_effect=lambda: now[0])
+    return now
+
+@pytest.fixture
+def cache():
+    """Fixture to provide a cache with a 60s TTL for search and a 30s stale window."""
+    return ResponseCache(TTLCache(maxsize=10, ttl=60), ttls={"/search/movie": 60}, default_ttl=10, stale_ttl=30)
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.01)
+
+
+def test_key_normalizes_parameter_order():
+    """Test that the same parameters in any order share a key."""
+    assert ResponseCache.make_key("/search/movie", {"query": "up", "page": 1}) == \
+        ResponseCache.make_key("/search/movie", {"page": 1, "query": "up"})
+    assert ResponseCache.make_key("/search/movie", {"query": "up"}) != ResponseCache.make_key("/search/movie", {"query": "down"})
+
+def test_hit_within_ttl(cache, clock, mocker):
+    """Test that a fresh response is served without calling upstream."""
+    fetch = mocker.Mock(return_value={"results": [1]})
+
+    assert cache.get_or_fetch("/search/movie", {"query": "up"}, fetch) == {"results": [1]}
+    clock[0] += 59
+    assert cache.get_or_fetch("/search/movie", {"query": "up"}, fetch) == {"results": [1]}
+
+    assert fetch.call_count == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_per_endpoint_ttl(cache, clock, mocker):
+    """Test that endpoints without a TTL of their own use the default."""
+    fetch = mocker.Mock(return_value={})
+    cache.get_or_fetch("/movie/{movie_id}/recommendations", {"movie_id": 1}, fetch)
+    clock[0] += 11
+
+    cache.get_or_fetch("/movie/{movie_id}/recommendations", {"movie_id": 1}, fetch)
+
+    assert cache.stats()["stale_hits"] == 1, "The 10s default TTL should have passed"
+
+def test_stale_while_revalidate(cache, clock):
+    """Test that a stale response is served at once while one background fetch refreshes it."""
+    responses = iter([{"v": 1}, {"v": 2}])
+    cache.get_or_fetch("/search/movie", {"query": "up"}, lambda: next(responses))
+    clock[0] += 70
+
+    assert cache.get_or_fetch("/search/movie", {"query": "up"}, lambda: next(responses)) == {"v": 1}
+
+    wait_for(lambda: cache.get_or_fetch("/search/movie", {"query": "up"}, lambda: {"v": 3}) == {"v": 2})
+    assert cache.stats()["revalidations"] == 1
+
+def test_expired_beyond_stale_window(cache, clock, mocker):
+    """Test that a response older than TTL plus the stale window is fetched again."""
+    fetch = mocker.Mock(side_effect=[{"v": 1}, {"v": 2}])
+    cache.get_or_fetch("/search/movie", {"query": "up"}, fetch)
+    clock[0] += 91
+
+    assert cache.get_or_fetch("/search/movie", {"query": "up"}, fetch) == {"v": 2}
+    assert cache.stats()["misses"] == 2
+
+def test_errors_are_not_cached(cache, mocker):
+    """Test that a failed fetch raises and the next request tries again."""
+    fetch = mocker.Mock(side_effect=[RuntimeError("TMDB is down"), {"v": 1}])
+
+    with pytest.raises(RuntimeError, match="TMDB is down"):
+        cache.get_or_fetch("/search/movie", {"query": "up"}, fetch)
+
+    assert cache.get_or_fetch("/search/movie", {"query": "up"}, fetch) == {"v": 1}
+    assert cache.stats()["errors"] == 1
+
+def test_concurrent_misses_are_coalesced(cache):
+    """Test that concurrent requests for the same key share one upstream call."""
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(2)
+        return {"v": 1}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch("/search/movie", {"query": "up"}, fetch)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: cache.stats()["coalesced"] == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"v": 1}] * 5
+
+def test_coalesced_requests_share_the_error(cache):
+    """Test that requests waiting on a failed fetch get its error."""
+    release = threading.Event()
+
+    def fetch():
+        release.wait(2)
+        raise RuntimeError("TMDB is down")
+
+    errors = []
+
+    def request():
+        try:
+            cache.get_or_fetch("/search/movie", {"query": "up"}, fetch)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=request) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: cache.stats()["coalesced"] == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == ["TMDB is down"] * 3
+
+def test_lru_bound(clock):
+    """Test that the in-process store evicts the least recently used response."""
+    cache = ResponseCache(TTLCache(maxsize=2, ttl=60))
+    for query in ("a", "b", "c"):
+        cache.get_or_fetch("/search/movie", {"query": query}, lambda: {"query": query})
+
+    assert len(cache.backend) == 2
+    assert cache.backend.stats()["evictions"] == 1
+
+
+######################################################
+#
+#    Redis backend
+#
+######################################################
+
+
+def test_redis_backend_round_trip(mocker):
+    """Test that entries are stored as JSON with a millisecond expiry."""
+    client = mocker.Mock()
+    backend = RedisCacheBackend(client, prefix="tmdb:")
+
+    backend.set("/search/movie?query=up", {"value": {"v": 1}, "stored_at": 1.0}, 90)
+
+    name, raw = client.set.call_args.args
+    assert name == "tmdb:/search/movie?query=up"
+    assert client.set.call_args.kwargs == {"px": 90000}
+
+    client.get.return_value = raw
+    assert backend.get("/search/movie?query=up") == {"value": {"v": 1}, "stored_at": 1.0}
+
+def test_redis_errors_are_misses(mocker):
+    """Test that an unavailable Redis degrades to upstream calls."""
+    client = mocker.Mock()
+    client.get.side_effect = ConnectionError("Redis is down")
+    client.set.side_effect = ConnectionError("Redis is down")
+    cache = ResponseCache(RedisCacheBackend(client))
+
+    assert cache.get_or_fetch("/search/movie", {"query": "up"}, lambda: {"v": 1}) == {"v": 1}
+    assert cache.stats()["errors"] == 0
+
+
+######################################################
+#
+#    Async path
+#
+######################################################
+
+
+def test_async_hit_and_miss(cache, clock):
+    """Test that awaited responses are cached like synchronous ones."""
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return {"v": 1}
+
+    async def requests():
+        first = await cache.aget_or_fetch("/search/movie", {"query": "up"}, fetch)
+        second = await cache.aget_or_fetch("/search/movie", {"query": "up"}, fetch)
+        return first, second
+
+    assert asyncio.run(requests()) == ({"v": 1}, {"v": 1})
+    assert len(calls) == 1
+
+def test_async_misses_are_coalesced(cache):
+    """Test that concurrent awaits of the same key share one fetch."""
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"v": 1}
+
+    async def requests():
+        return await asyncio.gather(*(cache.aget_or_fetch("/search/movie", {"query": "up"}, fetch) for _ in range(5)))
+
+    assert asyncio.run(requests()) == [{"v": 1}] * 5
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 4
+
+def test_async_cancellation(cache):
+    """Test that a cancelled request cancels its fetch only when nobody else waits for it."""
+    cancelled = []
+
+    async def fetch():
+        try:
+            await asyncio.sleep(0.05)
+            return {"v": 1}
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def requests():
+        first = asyncio.ensure_future(cache.aget_or_fetch("/search/movie", {"query": "a"}, fetch))
+        second = asyncio.ensure_future(cache.aget_or_fetch("/search/movie", {"query": "a"}, fetch))
+        alone = asyncio.ensure_future(cache.aget_or_fetch("/search/movie", {"query": "b"}, fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        alone.cancel()
+        await asyncio.gather(first, alone, return_exceptions=True)
+        return await second
+
+    assert asyncio.run(requests()) == {"v": 1}
+    assert len(cancelled) == 1, "Only the fetch nobody else waited for should be cancelled"
+
+def test_async_redis_calls_leave_the_loop(mocker):
+    """Test that a blocking backend is called from a worker thread, not the event loop's."""
+    threads = []
+    client = mocker.Mock()
+    client.get.side_effect = lambda key: threads.append(threading.current_thread()) or None
+    client.set.side_effect = lambda *args, **kwargs: threads.append(threading.current_thread())
+    cache = ResponseCache(RedisCacheBackend(client), default_ttl=10)
+
+    async def fetch():
+        return {"v": 1}
+
+    async def request():
+        return await cache.aget_or_fetch("/search/movie", {"query": "up"}, fetch), threading.current_thread()
+
+    value, loop_thread = asyncio.run(request())
+
+    assert value == {"v": 1}
+    assert len(threads) == 2
+    assert loop_thread not in threads
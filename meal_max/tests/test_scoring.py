@@ -0,0 +1,60 @@
+import random
+
+import numpy as np
+import pytest
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal
+from meal_max.utils.scoring import DIFFICULTY_CODES, battle_outcomes, battle_scores, meal_columns
+
+
+@pytest.fixture
+def catalog():
+    """Fixture to provide a catalog of meals with awkward prices."""
+    rng = random.Random(411)
+    cuisines = ["Thai", "Italian", "Ethiopian", "American", "Modern Australian", ""]
+    return [
+        Meal(id=i, meal=f"Meal {i}", cuisine=rng.choice(cuisines),
+             price=rng.choice([0.1, 1 / 3, 12.99, 1e15 + 0.5, rng.uniform(0, 1000)]),
+             difficulty=rng.choice(["LOW", "MED", "HIGH"]))
+        for i in range(1, 2001)
+    ]
+
+
+def test_meal_columns():
+    """Test converting meals to scoring columns."""
+    prices, cuisine_lengths, difficulty_codes = meal_columns([Meal(1, "Lasagna", "Italian", 12.99, "MED")])
+
+    assert prices.tolist() == [12.99]
+    assert cuisine_lengths.tolist() == [7]
+    assert difficulty_codes.tolist() == [DIFFICULTY_CODES["MED"]]
+
+def test_battle_scores_match_scalar_path(catalog):
+    """Test that vectorized scores are bit-for-bit identical to get_battle_score."""
+    battle_model = BattleModel()
+    expected = np.array([battle_model.get_battle_score(meal) for meal in catalog], dtype=np.float64)
+
+    scores = battle_scores(*meal_columns(catalog))
+
+    assert scores.tobytes() == expected.tobytes()
+
+def test_battle_outcomes_match_scalar_path(catalog):
+    """Test that vectorized deltas and winners match the rule used by BattleModel.battle."""
+    rng = np.random.default_rng(411)
+    scores = battle_scores(*meal_columns(catalog))
+    first = rng.integers(0, len(catalog), 10000)
+    second = rng.integers(0, len(catalog), 10000)
+    random_numbers = np.round(rng.random(10000), 2)
+
+    deltas, first_wins = battle_outcomes(scores, first, second, random_numbers)
+
+    scalar = BattleModel()
+    for i in range(0, 10000, 97):
+        delta = abs(scalar.get_battle_score(catalog[first[i]]) - scalar.get_battle_score(catalog[second[i]])) / 100
+        assert deltas[i] == delta
+        assert first_wins[i] == (delta > random_numbers[i])
+
+def test_battle_outcomes_length_mismatch():
+    """Test error when pairings and random numbers do not line up."""
+    with pytest.raises(ValueError, match="Pairings and random numbers must have the same length."):
+        battle_outcomes([1.0, 2.0], [0], [1], [0.5, 0.5])
@@ -0,0 +1,162 @@
+import sqlite3
+import threading
+
+import pytest
+
+from meal_max.utils import sql_utils
+from meal_max.utils.sql_utils import ConnectionPool, PoolTimeoutError
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Fixture to provide a path to a scratch SQLite database."""
+    return str(tmp_path / "meal_max.db")
+
+@pytest.fixture
+def pool(db_path):
+    """Fixture to provide a small connection pool."""
+    pool = ConnectionPool(db_path, size=2, timeout=0.1)
+    yield pool
+    pool.close()
+
+
+def test_pool_reuses_connections(pool):
+    """Test that a returned connection is handed out again instead of opening a new one."""
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second, "The idle connection should be reused"
+    stats = pool.stats()
+    assert stats["created"] == 1
+    assert stats["checkouts"] == 2
+    assert stats["reused"] == 1
+    assert stats["idle"] == 1
+    assert stats["in_use"] == 0
+
+def test_pool_nested_checkout_same_thread(pool):
+    """Test that nested checkouts on one thread share the same connection."""
+    with pool.connection() as outer:
+        with pool.connection() as inner:
+            assert inner is outer, "Nested checkouts should reuse the thread's connection"
+        assert pool.stats()["in_use"] == 1
+
+    assert pool.stats()["checkouts"] == 1
+
+def test_pool_checkout_timeout(pool):
+    """Test that checkouts time out when every connection is held by another thread."""
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with pool.connection():
+            held.set()
+            release.wait()
+
+    threads = [threading.Thread(target=hold) for _ in range(2)]
+    for thread in threads:
+        held.clear()
+        thread.start()
+        held.wait()
+
+    try:
+        with pytest.raises(PoolTimeoutError, match="Timed out"):
+            with pool.connection():
+                pass
+        assert pool.stats()["timeouts"] == 1
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+
+def test_pool_rolls_back_uncommitted_work(pool):
+    """Test that a connection is rolled back before it goes back to the pool."""
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+def test_pool_discards_unhealthy_connection(pool, mocker):
+    """Test that an idle connection failing validation is replaced."""
+    pool.validate_after = 0
+    with pool.connection() as first:
+        pass
+    mocker.patch.object(pool, "_is_healthy", return_value=False)
+
+    with pool.connection() as second:
+        assert second is not first, "Unhealthy connection should not be handed out"
+
+    assert pool.stats()["discarded"] == 1
+
+def test_pool_invalid_size(db_path):
+    """Test that a pool needs room for at least one connection."""
+    with pytest.raises(ValueError, match="Invalid pool size: 0"):
+        ConnectionPool(db_path, size=0)
+
+def test_get_db_connection_uses_pool(db_path, mocker):
+    """Test that get_db_connection serves connections from the process-wide pool."""
+    mocker.patch.object(sql_utils, "DB_PATH", db_path)
+    sql_utils.close_pool()
+
+    try:
+        with sql_utils.get_db_connection() as first:
+            first.execute("SELECT 1")
+        with sql_utils.get_db_connection() as second:
+            second.execute("SELECT 1")
+
+        assert first is second
+        assert sql_utils.get_pool_stats()["created"] == 1
+    finally:
+        sql_utils.close_pool()
+
+def test_get_db_connection_reraises_errors(db_path, mocker):
+    """Test that database errors are logged and re-raised."""
+    mocker.patch.object(sql_utils, "DB_PATH", db_path)
+    sql_utils.close_pool()
+
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            with sql_utils.get_db_connection() as conn:
+                conn.execute("SELECT * FROM missing_table")
+    finally:
+        sql_utils.close_pool()
+
+def test_pool_applies_pragma_profile(db_path):
+    """Test that new connections are configured with the PRAGMA profile."""
+    pool = ConnectionPool(db_path, pragmas={"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 1234})
+
+    try:
+        with pool.connection() as conn:
+            assert conn.execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous;").fetchone()[0] == 1
+            assert conn.execute("PRAGMA busy_timeout;").fetchone()[0] == 1234
+    finally:
+        pool.close()
+
+def test_pool_rejects_invalid_pragma(db_path):
+    """Test that an invalid PRAGMA value is rejected before it reaches SQLite."""
+    pool = ConnectionPool(db_path, pragmas={"journal_mode": "WAL; DROP TABLE meals"})
+
+    with pytest.raises(ValueError, match="Invalid value for PRAGMA journal_mode"):
+        with pool.connection():
+            pass
+    assert pool.stats()["open"] == 0, "A failed connection should not hold a pool slot"
+
+def test_check_database_pragmas(db_path, mocker):
+    """Test that the startup check reports the active settings."""
+    mocker.patch.object(sql_utils, "DB_PATH", db_path)
+    sql_utils.close_pool()
+
+    try:
+        settings = sql_utils.check_database_pragmas()
+    finally:
+        sql_utils.close_pool()
+
+    assert settings["journal_mode"] == "wal"
+    assert settings["synchronous"] == "NORMAL"
+    assert settings["temp_store"] == "MEMORY"
+    assert settings["busy_timeout"] == sql_utils.PRAGMA_PROFILE["busy_timeout"]
@@ -0,0 +1,61 @@
+from datetime import datetime
+import json
+
+import pytest
+
+from meal_max.utils.streaming import json_array_chunks, ndjson_chunks, stream_rows
+
+
+ROWS = [{"id": i, "added_on": datetime(2024, 1, i)} for i in range(1, 6)]
+
+
+def test_ndjson_chunks():
+    """Test that rows are written one per line, a few lines per chunk."""
+    chunks = list(ndjson_chunks(ROWS, chunk_rows=2))
+
+    assert len(chunks) == 3
+    lines = "".join(chunks).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3, 4, 5]
+    assert json.loads(lines[0])["added_on"] == "2024-01-01T00:00:00"
+
+def test_json_array_chunks():
+    """Test that the chunks join into one JSON array."""
+    chunks = list(json_array_chunks(ROWS, chunk_rows=2))
+
+    assert chunks[0].startswith("[") and chunks[-1] == "]"
+    assert [row["id"] for row in json.loads("".join(chunks))] == [1, 2, 3, 4, 5]
+
+@pytest.mark.parametrize("chunks, body", [(ndjson_chunks, ""), (json_array_chunks, "[]")])
+def test_empty_streams(chunks, body):
+    """Test the body of an empty export."""
+    assert "".join(chunks([])) == body
+
+def test_rows_are_consumed_lazily():
+    """Test that no row is read before the first chunk is requested."""
+    consumed = []
+
+    def rows():
+        for row in ROWS:
+            consumed.append(row["id"])
+            yield row
+
+    chunks, mimetype = stream_rows(rows(), "ndjson")
+    assert consumed == [] and mimetype == "application/x-ndjson"
+
+    next(chunks)
+    assert consumed, "The first chunk should read some rows"
+
+def test_stream_rows_invalid_format():
+    """Test that unknown formats are rejected up front."""
+    with pytest.raises(ValueError, match="Invalid format: csv"):
+        stream_rows(ROWS, "csv")
+
+def test_stream_rows_reraises_errors():
+    """Test that errors raised by the rows propagate to the server."""
+    def rows():
+        yield ROWS[0]
+        raise RuntimeError("cursor closed")
+
+    chunks, _ = stream_rows(rows(), "json")
+    with pytest.raises(RuntimeError, match="cursor closed"):
+        list(chunks)
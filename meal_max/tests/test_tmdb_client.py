@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+import requests
+
+from meal_max.clients import tmdb_client
+from meal_max.utils.cache import TTLCache
+
+
+@pytest.fixture
+def mock_http_get(mocker):
+    """Fixture to mock TMDB and give each test a fresh in-process cache."""
+    mocker.patch.object(tmdb_client, "_cache", tmdb_client.create_tmdb_cache("memory"))
+    mocker.patch.dict("os.environ", {"TMDB_READ_ACCESS_TOKEN": "token"})
+    mock_get = mocker.patch("meal_max.clients.tmdb_client.http_get")
+    mock_get.return_value.json.return_value = {"results": []}
+    return mock_get
+
+
+def test_search_movies(mock_http_get):
+    """Test the search request TMDB receives."""
+    assert tmdb_client.search_movies("  The   Matrix ") == {"results": []}
+
+    url = mock_http_get.call_args.args[0]
+    assert url == "https://api.themoviedb.org/3/search/movie"
+    assert mock_http_get.call_args.kwargs["params"] == {"query": "the matrix", "include_adult": "false",
+                                                         "language": "en-US", "page": 1}
+    assert mock_http_get.call_args.kwargs["headers"]["Authorization"] == "Bearer token"
+
+def test_equivalent_searches_share_an_entry(mock_http_get):
+    """Test that searches differing only in case and spacing are served from one response."""
+    tmdb_client.search_movies("The Matrix")
+    tmdb_client.search_movies("the  matrix")
+
+    assert mock_http_get.call_count == 1
+
+def test_path_parameters(mock_http_get):
+    """Test that movie IDs go in the path, and each movie is cached separately."""
+    tmdb_client.get_watch_providers(603)
+    tmdb_client.get_watch_providers(603)
+    tmdb_client.get_movie_recommendations(603)
+    tmdb_client.get_watch_providers(604)
+    tmdb_client.get_movie_details(603)
+
+    urls = [call.args[0] for call in mock_http_get.call_args_list]
+    assert urls == ["https://api.themoviedb.org/3/movie/603/watch/providers",
+                    "https://api.themoviedb.org/3/movie/603/recommendations",
+                    "https://api.themoviedb.org/3/movie/604/watch/providers",
+                    "https://api.themoviedb.org/3/movie/603"]
+    assert mock_http_get.call_args.kwargs["params"] is None
+
+def test_http_errors_raise(mock_http_get):
+    """Test that TMDB errors surface as requests exceptions and are not cached."""
+    mock_http_get.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError("404")
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        tmdb_client.get_watch_providers(1)
+    with pytest.raises(requests.exceptions.HTTPError):
+        tmdb_client.get_watch_providers(1)
+
+    assert mock_http_get.call_count == 2
+
+def test_invalid_backend():
+    """Test that unknown cache backends are rejected."""
+    with pytest.raises(ValueError, match="Invalid TMDB cache backend: disk"):
+        tmdb_client.create_tmdb_cache("disk")
+
+def test_cache_stats(mock_http_get):
+    """Test the reported cache counters."""
+    tmdb_client.search_movies("up")
+    tmdb_client.search_movies("up")
+
+    stats = tmdb_client.get_tmdb_cache_stats()
+    assert stats["backend"] == "memory"
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+    assert isinstance(tmdb_client.get_tmdb_cache().backend, TTLCache)
+
+
+######################################################
+#
+#    Async calls
+#
+######################################################
+
+
+def test_movie_details_async_shares_the_cache(mock_http_get, mocker):
+    """Test that async lookups use the same parameters and cache as sync ones."""
+    mock_aget = mocker.patch("meal_max.clients.tmdb_client._aget", new_callable=mocker.AsyncMock,
+                             return_value={"id": 603, "title": "The Matrix"})
+
+    assert asyncio.run(tmdb_client.get_movie_details_async("603")) == {"id": 603, "title": "The Matrix"}
+    assert asyncio.run(tmdb_client.get_movie_details_async(603)) == {"id": 603, "title": "The Matrix"}
+
+    mock_aget.assert_awaited_once_with("/movie/{movie_id}", {"movie_id": 603})
+    assert tmdb_client.get_movie_details(603) == {"id": 603, "title": "The Matrix"}
+    mock_http_get.assert_not_called()
+
+def test_async_routes_use_the_sync_parameters(mock_http_get, mocker):
+    """Test that the async search, providers and recommendations calls send what the sync ones do."""
+    mock_aget = mocker.patch("meal_max.clients.tmdb_client._aget", new_callable=mocker.AsyncMock,
+                             return_value={"results": []})
+
+    async def calls():
+        await tmdb_client.search_movies_async("  The   Matrix ")
+        await tmdb_client.get_watch_providers_async("603")
+        await tmdb_client.get_movie_recommendations_async(603)
+
+    asyncio.run(calls())
+
+    assert [call.args for call in mock_aget.await_args_list] == [
+        ("/search/movie", {"query": "the matrix", "include_adult": "false", "language": "en-US", "page": 1}),
+        ("/movie/{movie_id}/watch/providers", {"movie_id": 603}),
+        ("/movie/{movie_id}/recommendations", {"movie_id": 603}),
+    ]
+    assert tmdb_client.search_movies("the matrix") == {"results": []}
+    mock_http_get.assert_not_called()
+
+def test_movie_summaries():
+    """Test the fields kept from TMDB movie lists."""
+    data = {"results": [{"title": "Up", "release_date": "2009-05-28", "overview": "...", "vote_average": 7.9,
+                         "popularity": 80.1}]}
+
+    assert tmdb_client.movie_summaries(data) == [
+        {"title": "Up", "release_date": "2009-05-28", "overview": "...", "vote_average": 7.9}
+    ]
+    assert tmdb_client.movie_summaries({}) == []
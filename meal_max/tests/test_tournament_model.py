@@ -0,0 +1,140 @@
+import pytest
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal, MealLookupError
+from meal_max.models.tournament_model import run_tournament
+from meal_max.utils.random_providers import SeededRandomProvider
+
+
+@pytest.fixture
+def meals():
+    """Fixture to provide eight meals with distinct scores."""
+    return [Meal(id=i, meal=f"Meal {i}", cuisine="Italian", price=float(i), difficulty="LOW") for i in range(1, 9)]
+
+@pytest.fixture
+def mock_get_meals_by_ids(mocker, meals):
+    """Fixture to serve the sample meals from the batched lookup."""
+    by_id = {meal.id: meal for meal in meals}
+    return mocker.patch("meal_max.models.tournament_model.get_meals_by_ids",
+                        side_effect=lambda meal_ids: [by_id[meal_id] for meal_id in meal_ids])
+
+@pytest.fixture
+def mock_get_random_batch(mocker):
+    """Fixture to make every match go to the second meal."""
+    return mocker.patch("meal_max.models.tournament_model.get_random_batch", side_effect=lambda count: [1.0] * count)
+
+@pytest.fixture
+def mock_record_battle_results(mocker):
+    """Fixture to capture the results written to the database."""
+    return mocker.patch("meal_max.models.tournament_model.record_battle_results",
+                        side_effect=lambda results: len(list(results)))
+
+
+def recorded_results(mock_record_battle_results):
+    mock_record_battle_results.assert_called_once()
+    return list(mock_record_battle_results.call_args[0][0])
+
+
+def test_single_elimination(mock_get_meals_by_ids, mock_get_random_batch, mock_record_battle_results):
+    """Test a full bracket: one random batch, log2(n) rounds and one batched write."""
+    result = run_tournament([1, 2, 3, 4, 5, 6, 7, 8])
+
+    mock_get_random_batch.assert_called_once_with(7)
+    assert [len(round_["matches"]) for round_ in result["rounds"]] == [4, 2, 1]
+    assert [(m["meal_1"], m["meal_2"], m["winner"]) for m in result["rounds"][0]["matches"]] == \
+        [(1, 2, 2), (3, 4, 4), (5, 6, 6), (7, 8, 8)]
+    assert result["winner"] == {"id": 8, "meal": "Meal 8"}
+    assert result["standings"][0] == {"id": 8, "meal": "Meal 8", "battles": 3, "wins": 3, "points": 3}
+
+    assert len(recorded_results(mock_record_battle_results)) == 7
+
+def test_single_elimination_byes(mock_get_meals_by_ids, mock_get_random_batch, mock_record_battle_results):
+    """Test that top seeds get first-round byes when the field is not a power of two."""
+    result = run_tournament([1, 2, 3, 4, 5])
+
+    mock_get_random_batch.assert_called_once_with(4)
+    assert result["rounds"][0]["byes"] == [1, 2, 3]
+    assert [(m["meal_1"], m["meal_2"]) for m in result["rounds"][0]["matches"]] == [(4, 5)]
+    assert [len(round_["matches"]) for round_ in result["rounds"]] == [1, 2, 1]
+
+def test_round_robin(mock_get_meals_by_ids, mock_get_random_batch, mock_record_battle_results):
+    """Test that every pair of meals meets exactly once."""
+    result = run_tournament([1, 2, 3, 4, 5], tournament_format="round_robin")
+
+    pairs = [frozenset((m["meal_1"], m["meal_2"])) for round_ in result["rounds"] for m in round_["matches"]]
+    assert len(pairs) == 10
+    assert len(set(pairs)) == 10
+    assert len(result["rounds"]) == 5
+    assert all(len(round_["byes"]) == 1 for round_ in result["rounds"])
+    assert {entry["battles"] for entry in result["standings"]} == {4}
+
+def test_swiss(mock_get_meals_by_ids, mock_get_random_batch, mock_record_battle_results):
+    """Test Swiss pairings: default rounds, no rematches and points for byes."""
+    result = run_tournament([1, 2, 3, 4, 5, 6, 7], tournament_format="swiss")
+
+    assert len(result["rounds"]) == 3
+    mock_get_random_batch.assert_called_once_with(9)
+    pairs = [frozenset((m["meal_1"], m["meal_2"])) for round_ in result["rounds"] for m in round_["matches"]]
+    assert len(set(pairs)) == len(pairs), "Meals should not meet twice"
+    byes = [round_["byes"][0] for round_ in result["rounds"]]
+    assert len(set(byes)) == 3, "No meal should get two byes"
+    assert sum(entry["points"] for entry in result["standings"]) == 9 + 3
+
+def test_tournament_scores_with_battle_model(mock_get_meals_by_ids, mock_get_random_batch,
+                                             mock_record_battle_results, mocker):
+    """Test that meals are scored once, in a single batch."""
+    battle_model = mocker.Mock(random_provider=None)
+    battle_model.get_battle_scores.return_value = [0.0, 0.0, 0.0, 0.0]
+
+    run_tournament([1, 2, 3, 4], battle_model=battle_model)
+
+    battle_model.get_battle_scores.assert_called_once()
+
+def test_tournament_replays_with_seeded_provider(mock_get_meals_by_ids, mock_record_battle_results, mocker):
+    """Test that two runs with the same seed give identical brackets, without the global backend."""
+    get_random_batch = mocker.patch("meal_max.models.tournament_model.get_random_batch")
+
+    runs = [run_tournament([1, 2, 3, 4, 5, 6, 7, 8], tournament_format="swiss",
+                           battle_model=BattleModel(random_provider=SeededRandomProvider(seed=42)))
+            for _ in range(2)]
+
+    assert runs[0]["rounds"] == runs[1]["rounds"]
+    assert runs[0]["standings"] == runs[1]["standings"]
+    get_random_batch.assert_not_called()
+
+def test_tournament_invalid_format():
+    """Test error for an unknown tournament format."""
+    with pytest.raises(ValueError, match="Invalid tournament format: knockout"):
+        run_tournament([1, 2], tournament_format="knockout")
+
+def test_tournament_invalid_entrants():
+    """Test errors for too few or repeated entrants."""
+    with pytest.raises(ValueError, match="At least two meals must enter a tournament."):
+        run_tournament([1])
+    with pytest.raises(ValueError, match="Meal with ID 2 entered more than once"):
+        run_tournament([1, 2, 2])
+
+def test_tournament_invalid_rounds():
+    """Test errors for the number of rounds."""
+    with pytest.raises(ValueError, match="Invalid number of rounds: 4"):
+        run_tournament([1, 2, 3, 4], tournament_format="swiss", rounds=4)
+    with pytest.raises(ValueError, match="only be set for Swiss"):
+        run_tournament([1, 2, 3, 4], rounds=2)
+
+def test_tournament_too_many_matches(mocker):
+    """Test that oversized tournaments are rejected before any work is done."""
+    mocker.patch("meal_max.models.tournament_model.TOURNAMENT_MAX_MATCHES", 10)
+
+    with pytest.raises(ValueError, match="Tournament would need 15 matches; the limit is 10."):
+        run_tournament(list(range(1, 7)), tournament_format="round_robin")
+
+def test_tournament_missing_meal(mock_get_random_batch, mock_record_battle_results, mocker):
+    """Test that lookup errors are raised before any match is played."""
+    mocker.patch("meal_max.models.tournament_model.get_meals_by_ids",
+                 side_effect=MealLookupError({3: "Meal with ID 3 not found"}))
+
+    with pytest.raises(ValueError, match="Meal with ID 3 not found"):
+        run_tournament([1, 2, 3])
+
+    mock_get_random_batch.assert_not_called()
+    mock_record_battle_results.assert_not_called()
@@ -0,0 +1,239 @@
+from datetime import datetime, timedelta
+
+from flask import Flask
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+
+from meal_max.db import db
+from meal_max.models.movie_model import Movie
+from meal_max.models.user_model import Users
+from meal_max.models.watchlist_model import (WATCHLIST_BULK_MAX, WATCHLIST_PAGE_MAX, Watchlist,
+                                             ensure_watchlist_indexes, is_duplicate_entry)
+
+
+@pytest.fixture
+def user_id():
+    """Fixture to provide a user in an empty in-memory database."""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        user = Users(username="test_user", salt="salt", password="password")
+        db.session.add(user)
+        db.session.commit()
+        yield user.id
+        db.session.remove()
+
+@pytest.fixture
+def mock_lookup(mocker):
+    """Fixture to mock movie validation: movie 999 does not exist."""
+    def lookup(movie_ids):
+        movies = {movie_id: Movie(id=movie_id, title=f"Movie {movie_id}", popularity=1.0)
+                  for movie_id in movie_ids if movie_id != 999}
+        errors = {999: "Movie with ID 999 not found"} if 999 in movie_ids else {}
+        return movies, errors
+
+    return mocker.patch("meal_max.models.watchlist_model.Movie.get_or_fetch_many", side_effect=lookup)
+
+def movie_ids(user_id):
+    return sorted(entry.movie_id for entry in Watchlist.query.filter_by(user_id=user_id))
+
+
+def test_add_many(user_id, mock_lookup, mocker):
+    """Test adding movies in one transaction, with a status per movie."""
+    Watchlist.add_many(user_id, [1])
+    commit = mocker.spy(db.session, "commit")
+
+    results = Watchlist.add_many(user_id, [1, 2, 999, 3, 2])
+
+    assert results == [
+        {"movie_id": 1, "status": "already_in_watchlist"},
+        {"movie_id": 2, "status": "added"},
+        {"movie_id": 999, "status": "invalid", "error": "Movie with ID 999 not found"},
+        {"movie_id": 3, "status": "added"},
+    ]
+    assert movie_ids(user_id) == [1, 2, 3]
+    commit.assert_called_once()
+    mock_lookup.assert_called_with([2, 999, 3])
+
+def test_add_many_copies_metadata(user_id, mock_lookup):
+    """Test that watchlist entries carry the movie's metadata."""
+    Watchlist.add_many(user_id, [7])
+
+    entry = Watchlist.query.filter_by(user_id=user_id, movie_id=7).one()
+    assert entry.movie_title == "Movie 7"
+    assert entry.popularity == 1.0
+
+def test_mark_watched_many(user_id, mock_lookup):
+    """Test marking movies as watched."""
+    Watchlist.add_many(user_id, [1, 2, 3])
+
+    results = Watchlist.mark_watched_many(user_id, [1, 3, 4])
+
+    assert results == [{"movie_id": 1, "status": "marked_watched"}, {"movie_id": 3, "status": "marked_watched"},
+                       {"movie_id": 4, "status": "not_found"}]
+    assert {entry.movie_id: entry.watched for entry in Watchlist.query.filter_by(user_id=user_id)} == \
+        {1: True, 2: False, 3: True}
+
+def test_remove_many(user_id, mock_lookup):
+    """Test removing movies."""
+    Watchlist.add_many(user_id, [1, 2, 3])
+
+    results = Watchlist.remove_many(user_id, [2, 4])
+
+    assert results == [{"movie_id": 2, "status": "removed"}, {"movie_id": 4, "status": "not_found"}]
+    assert movie_ids(user_id) == [1, 3]
+
+def test_bulk_operations_are_scoped_to_the_user(user_id, mock_lookup):
+    """Test that another user's entries are not touched."""
+    Watchlist.add_many(user_id, [1])
+
+    assert Watchlist.remove_many(user_id + 1, [1]) == [{"movie_id": 1, "status": "not_found"}]
+    assert movie_ids(user_id) == [1]
+
+@pytest.mark.parametrize("movie_ids, message", [
+    ([], "movie_ids must be a non-empty list."),
+    ("1,2", "movie_ids must be a non-empty list."),
+    ([1, "2"], "movie_ids must be integers."),
+    (list(range(WATCHLIST_BULK_MAX + 1)), "Too many movie IDs"),
+])
+def test_invalid_movie_ids(user_id, movie_ids, message):
+    """Test that invalid requests are rejected before touching the database."""
+    with pytest.raises(ValueError, match=message):
+        Watchlist.remove_many(user_id, movie_ids)
+
+def test_failed_commit_writes_nothing(user_id, mock_lookup, mocker):
+    """Test that a database error rolls back the whole batch."""
+    mocker.patch.object(db.session, "commit", side_effect=RuntimeError("disk full"))
+
+    with pytest.raises(RuntimeError, match="disk full"):
+        Watchlist.add_many(user_id, [1, 2])
+
+    mocker.stopall()
+    assert movie_ids(user_id) == []
+
+
+######################################################
+#
+#    Constraints and listing
+#
+######################################################
+
+
+def add_entries(user_id, count):
+    for movie_id in range(1, count + 1):
+        db.session.add(Watchlist(user_id=user_id, movie_id=movie_id, movie_title=f"Movie {movie_id:03d}",
+                                 popularity=float(movie_id % 7), added_on=datetime(2024, 1, 1) + timedelta(days=movie_id),
+                                 watched=movie_id % 2 == 0))
+    db.session.commit()
+
+
+def test_duplicate_entries_are_rejected(user_id):
+    """Test that the unique index rejects a second entry for the same movie."""
+    add_entries(user_id, 1)
+    db.session.add(Watchlist(user_id=user_id, movie_id=1, movie_title="Movie 001"))
+
+    with pytest.raises(IntegrityError) as error:
+        db.session.commit()
+    assert is_duplicate_entry(error.value)
+
+def test_other_integrity_errors_are_not_duplicates(user_id):
+    """Test that constraints other than the unique index are told apart."""
+    db.session.add(Watchlist(user_id=user_id, movie_id=1, movie_title=None))
+
+    with pytest.raises(IntegrityError) as error:
+        db.session.commit()
+    assert not is_duplicate_entry(error.value)
+
+def test_add_many_retries_after_a_concurrent_insert(user_id, mock_lookup, mocker):
+    """Test that losing an insert race is resolved by re-reading the entries."""
+    real_get_entries = Watchlist._get_entries
+    calls = []
+
+    def get_entries(*args):
+        calls.append(1)
+        if len(calls) == 1:
+            # another request adds movie 1 after this one looked for it
+            add_entries(user_id, 1)
+            return {}
+        return real_get_entries(*args)
+
+    mocker.patch.object(Watchlist, "_get_entries", side_effect=get_entries)
+
+    results = Watchlist.add_many(user_id, [1, 2])
+
+    assert results == [{"movie_id": 1, "status": "already_in_watchlist"}, {"movie_id": 2, "status": "added"}]
+
+def test_watchlist_indexes(user_id):
+    """Test that the lookups by user, movie and title are indexed."""
+    indexes = {index["name"]: (index["column_names"], index["unique"])
+               for index in inspect(db.engine).get_indexes("watchlist")}
+
+    assert indexes["uq_watchlist_user_movie"] == (["user_id", "movie_id"], True)
+    assert indexes["ix_watchlist_user_title"] == (["user_id", "movie_title"], False)
+    ensure_watchlist_indexes()  # idempotent
+
+def test_get_watchlist(user_id):
+    """Test the username lookup joined to the entries."""
+    add_entries(user_id, 2)
+
+    result = Watchlist.get_watchlist("test_user")
+
+    assert [entry["movie_title"] for entry in result] == ["Movie 001", "Movie 002"]
+    assert set(result[0]) == {"id", "movie_title", "added_on", "watched"}
+
+def test_get_watchlist_empty_and_unknown_user(user_id):
+    """Test that an empty watchlist is not mistaken for an unknown user."""
+    assert Watchlist.get_watchlist("test_user") == []
+    with pytest.raises(ValueError, match="User 'nobody' not found."):
+        Watchlist.get_watchlist("nobody")
+
+def test_list_watchlist_pages(user_id):
+    """Test that pages are newest first by default and cover every entry once."""
+    add_entries(user_id, 25)
+
+    first = Watchlist.list_watchlist(user_id, page=1, per_page=10)
+    pages = [Watchlist.list_watchlist(user_id, page=page, per_page=10)["entries"] for page in (1, 2, 3)]
+
+    assert (first["total"], first["pages"]) == (25, 3)
+    assert first["entries"][0]["movie_id"] == 25
+    assert sorted(entry["movie_id"] for page in pages for entry in page) == list(range(1, 26))
+
+def test_list_watchlist_sorting_and_filter(user_id):
+    """Test sorting by popularity and filtering on watched."""
+    add_entries(user_id, 14)
+
+    page = Watchlist.list_watchlist(user_id, sort_by="popularity", order="asc", watched=True, per_page=100)
+
+    assert page["total"] == 7
+    assert all(entry["watched"] for entry in page["entries"])
+    popularity = [entry["popularity"] for entry in page["entries"]]
+    assert popularity == sorted(popularity)
+
+@pytest.mark.parametrize("options, message", [
+    ({"page": 0}, "Invalid page: 0"),
+    ({"per_page": WATCHLIST_PAGE_MAX + 1}, "Invalid page size"),
+    ({"sort_by": "title"}, "Invalid sort field: title"),
+    ({"order": "up"}, "Invalid sort order: up"),
+])
+def test_list_watchlist_invalid_options(user_id, options, message):
+    """Test that invalid listing options are rejected."""
+    with pytest.raises(ValueError, match=message):
+        Watchlist.list_watchlist(user_id, **options)
+
+def test_iter_entries_streams_oldest_first(user_id):
+    """Test that the export covers every entry, oldest first, in small batches."""
+    add_entries(user_id, 25)
+
+    entries = list(Watchlist.iter_entries(user_id, batch_size=4))
+
+    assert [entry["movie_id"] for entry in entries] == list(range(1, 26))
+    assert entries[0] == Watchlist.query.filter_by(user_id=user_id, movie_id=1).one().to_dict()
+
+def test_iter_entries_watched_filter(user_id):
+    """Test exporting only unwatched movies."""
+    add_entries(user_id, 6)
+
+    assert [entry["movie_id"] for entry in Watchlist.iter_entries(user_id, watched=False)] == [1, 3, 5]